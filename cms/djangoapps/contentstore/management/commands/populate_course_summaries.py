@@ -0,0 +1,33 @@
+"""
+Script for filling in the course summary of every course in the modulestore.
+
+Courses keep their summaries up to date once they have one, so this only needs to be
+run once on a given environment, before the course summary catalog is enabled.
+"""
+from django.core.management.base import BaseCommand
+
+from contentstore.models import CourseSummary
+from xmodule.error_module import ErrorDescriptor
+from xmodule.modulestore.django import modulestore
+
+#------------ to run: ./manage.py cms populate_course_summaries --settings=dev
+
+
+class Command(BaseCommand):
+    """
+    Script for filling in the course summary of every course in the modulestore.
+    """
+    help = 'Creates or updates the course summaries which Studio lists courses from'
+
+    def handle(self, *args, **options):
+        """
+        The logic of the command.
+        """
+        count = 0
+        for course in modulestore().get_courses():
+            if isinstance(course, ErrorDescriptor):
+                print u'Skipping errored course {}'.format(course.location)
+                continue
+            CourseSummary.update_for_course(course)
+            count += 1
+        print u'Updated the summaries of {} courses'.format(count)
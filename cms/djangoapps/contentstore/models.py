@@ -0,0 +1,87 @@
+"""
+Models for contentstore
+
+If you make changes to this model, be sure to create an appropriate migration
+file and check it in at the same time as your model changes. To do that,
+
+1. Go to the edx-platform dir
+2. ./manage.py cms schemamigration contentstore --auto description_of_your_change
+3. It adds the migration file to edx-platform/cms/djangoapps/contentstore/migrations/
+
+"""
+from django.db import models
+from django.dispatch import receiver
+
+from xmodule_django.models import CourseKeyField
+from xmodule.error_module import ErrorDescriptor
+from xmodule.modulestore.django import modulestore, course_changed
+
+
+class CourseSummary(models.Model):
+    """
+    What Studio lists about a course, so that course listings are one query of this table
+    rather than loading every course from the modulestore.
+
+    Summaries are updated whenever a course is created, rerun or deleted, and whenever its
+    course block is updated or published (see update_course_summary). The
+    populate_course_summaries management command fills in the summaries of existing courses.
+    """
+    course_id = CourseKeyField(max_length=255, unique=True)
+    org = models.CharField(max_length=255, db_index=True)
+    course = models.CharField(max_length=255)
+    run = models.CharField(max_length=255)
+    # block_id of the course block, to make its location
+    block_id = models.CharField(max_length=255)
+
+    display_name = models.TextField(blank=True)
+    display_org = models.CharField(max_length=255)
+    display_number = models.CharField(max_length=255)
+    start = models.DateTimeField(null=True)
+    end = models.DateTimeField(null=True)
+
+    # ModuleStoreEnum.Type of the store the course is in
+    store_type = models.CharField(max_length=32)
+    modified = models.DateTimeField(auto_now=True)
+
+    @property
+    def location(self):
+        """The location of the course block"""
+        return self.course_id.make_usage_key('course', self.block_id)
+
+    @classmethod
+    def update_for_course(cls, course):
+        """
+        Create or update the summary of the course descriptor `course`
+        """
+        try:
+            summary = cls.objects.get(course_id=course.id)
+        except cls.DoesNotExist:
+            summary = cls(course_id=course.id)
+
+        summary.org = course.id.org
+        summary.course = course.id.course
+        summary.run = course.id.run
+        summary.block_id = course.location.block_id
+        summary.display_name = course.display_name or u''
+        summary.display_org = course.display_org_with_default
+        summary.display_number = course.display_number_with_default
+        summary.start = course.start
+        summary.end = course.end
+        summary.store_type = modulestore().get_modulestore_type(course.id)
+        summary.save()
+        return summary
+
+
+@receiver(course_changed)
+def update_course_summary(sender, course_key, deleted=False, **kwargs):  # pylint: disable=unused-argument
+    """
+    Keep the summary of a course up to date with the course in the modulestore
+    """
+    if deleted:
+        CourseSummary.objects.filter(course_id=course_key).delete()
+        return
+
+    course = modulestore().get_course(course_key)
+    if course is None or isinstance(course, ErrorDescriptor):
+        return
+    CourseSummary.update_for_course(course)
@@ -3,17 +3,35 @@ This file contains celery tasks for contentstore views
 """
 
 from celery.task import task
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.exceptions import SuspiciousOperation
 import json
 import logging
+import os
+import shutil
+import tarfile
+import time
+from path import path
+from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.xml_importer import import_from_xml
 from xmodule.course_module import CourseFields
 
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
-from course_action_state.models import CourseRerunState
+from course_action_state.managers import CourseActionStateItemNotFoundError
+from course_action_state.models import CourseRerunState, CourseImportState
 from contentstore.utils import initialize_permissions
+from extract_tar import safetar_extractall
 from opaque_keys.edx.keys import CourseKey
 
+log = logging.getLogger(__name__)
+
+# The stages of a course import, as reported by the import status handler
+IMPORT_STAGE_UNPACKING = 1
+IMPORT_STAGE_VERIFYING = 2
+IMPORT_STAGE_IMPORTING = 3
+
 
 @task()
 def rerun_course(source_course_key_string, destination_course_key_string, user_id, fields=None):
@@ -66,3 +84,121 @@ def deserialize_fields(json_fields):
     for field_name, value in fields.iteritems():
         fields[field_name] = getattr(CourseFields, field_name).from_json(value)
     return fields
+
+
+class CourseImportError(Exception):
+    """
+    An import failed for a reason the user should be told about.
+    """
+    pass
+
+
+class ImportStepStats(object):
+    """
+    Keeps how long each step of an import took, and how many items it handled,
+    in the CourseImportState of the course.
+    """
+    def __init__(self, course_key, stage, step_stats):
+        self.course_key = course_key
+        self.stage = stage
+        self.step_stats = step_stats
+        self.mark = time.time()
+
+    def start_stage(self, stage):
+        """
+        Record that the import reached `stage`.
+        """
+        self.stage = stage
+        self.mark = time.time()
+        CourseImportState.objects.update_stage(self.course_key, stage)
+
+    def step_done(self, step, count=None):
+        """
+        Record that `step` is done. Its time is counted from the end of the
+        previous step, or the start of the current stage.
+        """
+        now = time.time()
+        self.step_stats[step] = {'seconds': round(now - self.mark, 3), 'count': count}
+        self.mark = now
+        CourseImportState.objects.update_stage(self.course_key, self.stage, self.step_stats)
+
+
+def _find_course_xml_dir(directory):
+    """
+    Returns the path of the first directory under `directory` containing a
+    course.xml file, or None if there is none.
+    """
+    for dirpath, _dirnames, filenames in os.walk(directory):
+        if "course.xml" in filenames:
+            return dirpath
+    return None
+
+
+@task(acks_late=True)
+def import_course(course_key_string, user_id, course_dir, filename):
+    """
+    Imports the course uploaded as `filename` into `course_dir`, a directory
+    under GITHUB_REPO_ROOT, and removes the directory when done.
+
+    The stage of the import, and how long its steps took, are kept in the
+    CourseImportState of the course. The task is only acknowledged once it
+    is done, so a lost worker's import is run again; steps already done
+    (unpacking and verifying the file) are then skipped.
+    """
+    course_key = CourseKey.from_string(course_key_string)
+    course_dir = path(course_dir)
+    stats = ImportStepStats(course_key, IMPORT_STAGE_UNPACKING, {})
+    try:
+        state = CourseImportState.objects.find_first(course_key=course_key)
+        stats.step_stats = json.loads(state.step_stats)
+        dirpath = _find_course_xml_dir(course_dir) if 'verifying' in stats.step_stats else None
+        if dirpath is None:
+            stats.start_stage(IMPORT_STAGE_UNPACKING)
+            with tarfile.open(course_dir / filename) as tar_file:
+                safetar_extractall(tar_file, (course_dir + '/').encode('utf-8'))
+                stats.step_done('unpacking', len(tar_file.getmembers()))
+            log.info(u"Course import %s: Uploaded file extracted", course_key)
+
+            stats.start_stage(IMPORT_STAGE_VERIFYING)
+            dirpath = _find_course_xml_dir(course_dir)
+            if not dirpath:
+                raise CourseImportError(u'Could not find the course.xml file in the package.')
+            stats.step_done('verifying')
+            log.info(u"Course import %s: Extracted file verified", course_key)
+
+        stats.start_stage(IMPORT_STAGE_IMPORTING)
+        import_from_xml(
+            modulestore(),
+            user_id,
+            settings.GITHUB_REPO_ROOT,
+            [os.path.relpath(dirpath, settings.GITHUB_REPO_ROOT)],
+            load_error_modules=False,
+            static_content_store=contentstore(),
+            target_course_id=course_key,
+            static_content_workers=settings.COURSE_IMPORT_STATIC_CONTENT_WORKERS,
+            step_callback=stats.step_done,
+        )
+        CourseImportState.objects.succeeded(course_key, stats.step_stats)
+        log.info(u"Course import %s: Course import successful", course_key)
+        return "succeeded"
+
+    except SuspiciousOperation as exc:
+        CourseImportState.objects.failed(
+            course_key, stats.stage, u'Unsafe tar file. Aborting import. {}'.format(exc.args[0])
+        )
+        return "unsafe file"
+
+    except CourseActionStateItemNotFoundError:
+        log.exception(u"Course import %s: no import state found", course_key)
+        return "no import state"
+
+    # catch all exceptions so we can update the state and properly cleanup the files.
+    except Exception as exc:  # pylint: disable=broad-except
+        log.exception(u"Course import %s: error importing course", course_key)
+        CourseImportState.objects.failed(course_key, stats.stage, unicode(exc))
+        return "exception: " + unicode(exc)
+
+    finally:
+        if course_dir.isdir():
+            shutil.rmtree(course_dir)
+            log.info(u"Course import %s: Temp data cleared", course_key)
@@ -6,10 +6,11 @@ from mock import patch
 import shutil
 import lxml
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 from fs.osfs import OSFS
 from json import loads
 from path import path
+from pytz import UTC
 from tempdir import mkdtemp_clean
 from textwrap import dedent
 from uuid import uuid4
@@ -30,7 +31,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.inheritance import own_metadata
 from opaque_keys.edx.keys import UsageKey, CourseKey
 from opaque_keys.edx.locations import SlashSeparatedCourseKey, AssetLocation, CourseLocator
-from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, check_mongo_calls
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, check_mongo_calls, check_number_of_calls
 from xmodule.modulestore.xml_exporter import export_to_xml
 from xmodule.modulestore.xml_importer import import_from_xml, perform_xlint
 
@@ -1412,6 +1413,63 @@ class ContentStoreTest(ContentStoreTestCase):
         # is this test too strict? i.e., it requires the dicts to be ==
         self.assertEqual(course.checklists, fetched_course.checklists)
 
+    def test_incremental_metadata_inheritance(self):
+        """
+        Edits patch the cached metadata inheritance tree in place of recomputing it, and leave it the
+        same as a full recompute would.
+        """
+        mongo_store = self.store._get_modulestore_by_type(ModuleStoreEnum.Type.mongo)
+        with self.store.default_store(ModuleStoreEnum.Type.mongo):
+            course = CourseFactory.create()
+            chapter = ItemFactory.create(parent_location=course.location, category='chapter')
+            sequential = ItemFactory.create(parent_location=chapter.location, category='sequential')
+            vertical = ItemFactory.create(parent_location=sequential.location, category='vertical')
+            ItemFactory.create(parent_location=vertical.location, category='problem')
+
+        # prime the cache
+        mongo_store._get_cached_metadata_inheritance_tree(course.id)
+
+        due = datetime(2014, 9, 1, tzinfo=UTC)
+        with check_number_of_calls(mongo_store, '_compute_metadata_inheritance_tree', 0, 0):
+            sequential = self.store.get_item(sequential.location)
+            sequential.due = due
+            self.store.update_item(sequential, self.user.id)
+            new_block = self.store.create_child(self.user.id, vertical.location, 'html', 'new_component')
+            other_block = self.store.create_child(self.user.id, vertical.location, 'html', 'other_component')
+            self.store.delete_item(other_block.location, self.user.id)
+
+        self.assertEqual(due, self.store.get_item(new_block.location).due)
+        self.assertEqual(
+            mongo_store._compute_metadata_inheritance_tree(course.id),
+            mongo_store._get_cached_metadata_inheritance_tree(course.id)
+        )
+
+    def test_concurrent_metadata_inheritance_update(self):
+        """
+        A cached metadata inheritance tree isn't patched and written back over an update made by another
+        process since it was cached, it is recomputed instead.
+        """
+        mongo_store = self.store._get_modulestore_by_type(ModuleStoreEnum.Type.mongo)
+        with self.store.default_store(ModuleStoreEnum.Type.mongo):
+            course = CourseFactory.create()
+            chapter = ItemFactory.create(parent_location=course.location, category='chapter')
+            sequential = ItemFactory.create(parent_location=chapter.location, category='sequential')
+
+        mongo_store._get_cached_metadata_inheritance_tree(course.id)
+        # another process updates the tree
+        mongo_store.metadata_inheritance_cache_subsystem.incr(u'{}.generation'.format(course.id))
+        self.assertIsNone(mongo_store._find_cached_metadata_inheritance_tree(course.id, skip_request_cache=True))
+
+        due = datetime(2014, 9, 1, tzinfo=UTC)
+        with check_number_of_calls(mongo_store, '_compute_metadata_inheritance_tree', 1, 1):
+            sequential = self.store.get_item(sequential.location)
+            sequential.due = due
+            self.store.update_item(sequential, self.user.id)
+        self.assertEqual(
+            mongo_store._compute_metadata_inheritance_tree(course.id),
+            mongo_store._find_cached_metadata_inheritance_tree(course.id, skip_request_cache=True)
+        )
+
     def test_image_import(self):
         """Test backwards compatibilty of course image."""
         content_store = contentstore()
@@ -10,7 +10,10 @@ import ddt
 
 from django.test import RequestFactory
 
-from contentstore.views.course import _accessible_courses_list, _accessible_courses_list_from_groups, AccessListFallback
+from contentstore.models import CourseSummary
+from contentstore.views.course import (
+    _accessible_courses_list, _accessible_courses_list_from_groups, _accessible_course_summaries, AccessListFallback
+)
 from contentstore.utils import delete_course_and_groups, reverse_course_url
 from contentstore.tests.utils import AjaxEnabledTestClient
 from student.tests.factories import UserFactory
@@ -266,6 +269,40 @@ class TestCourseListing(ModuleStoreTestCase):
         courses_list, __ = _accessible_courses_list(self.request)
         self.assertEqual(len(courses_list), 2)
 
+    def test_course_summaries(self):
+        """
+        Test that course summaries are kept up to date, and listed by course and org roles
+        without reading any course from the modulestore
+        """
+        course_key = SlashSeparatedCourseKey('Org1', 'Course1', 'Run1')
+        self._create_course_with_access_groups(course_key, self.user)
+        self._create_course_with_access_groups(SlashSeparatedCourseKey('Org1', 'Course2', 'Run1'))
+        self._create_course_with_access_groups(SlashSeparatedCourseKey('Org2', 'Course3', 'Run1'))
+        OrgStaffRole('Org2').add_users(self.user)
+
+        with check_mongo_calls(0):
+            summaries, __ = _accessible_course_summaries(self.request)
+        self.assertEqual(
+            sorted(unicode(summary.course_id) for summary in summaries),
+            [u'Org1/Course1/Run1', u'Org2/Course3/Run1']
+        )
+
+        course = modulestore().get_course(course_key)
+        course.display_name = u'Renamed'
+        modulestore().update_item(course, self.user.id)
+        summary = CourseSummary.objects.get(course_id=course_key)
+        self.assertEqual(summary.display_name, u'Renamed')
+        self.assertEqual(summary.location, course.location)
+
+        delete_course_and_groups(course_key, self.user.id)
+        self.assertFalse(CourseSummary.objects.filter(course_id=course_key).exists())
+
+        with patch.dict('django.conf.settings.FEATURES', {'ENABLE_COURSE_SUMMARY_CATALOG': True}):
+            response = self.client.get('/course/', HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Course3', response.content)
+        self.assertNotIn('Course2', response.content)
+
     def test_course_listing_with_actions_in_progress(self):
         sourse_course_key = CourseLocator('source-Org', 'source-Course', 'source-Run')
 
@@ -12,6 +12,7 @@ from django.conf import settings
 from django.views.decorators.http import require_http_methods
 from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
+from django.db.models import Q
 from django.http import HttpResponseBadRequest, HttpResponseNotFound, HttpResponse, Http404
 from util.json_request import JsonResponse, JsonResponseBadRequest
 from util.date_utils import get_default_time_display
@@ -31,6 +32,7 @@ from opaque_keys.edx.keys import CourseKey
 
 from django_future.csrf import ensure_csrf_cookie
 from contentstore.course_info_model import get_course_updates, update_course_updates, delete_course_update
+from contentstore.models import CourseSummary
 from contentstore.utils import (
     add_instructor,
     initialize_permissions,
@@ -63,6 +65,7 @@ from student.roles import (
     CourseInstructorRole, CourseStaffRole, CourseCreatorRole, GlobalStaff, UserBasedRole
 )
 from student import auth
+from student.models import CourseAccessRole
 from course_action_state.models import CourseRerunState, CourseRerunUIStateManager
 from course_action_state.managers import CourseActionStateItemNotFoundError
 from microsite_configuration import microsite
@@ -303,6 +306,36 @@ def _accessible_courses_list(request):
     return courses, in_process_course_actions
 
 
+def _accessible_course_summaries(request):
+    """
+    List the summaries of all courses available to the logged in user, from one query of the
+    course summaries of the courses and orgs the user has a role in
+    """
+    summaries = CourseSummary.objects.exclude(course='templates')
+    if not GlobalStaff().has_user(request.user):
+        course_ids = []
+        orgs = []
+        access_roles = CourseAccessRole.objects.filter(
+            user=request.user, role__in=[CourseInstructorRole.ROLE, CourseStaffRole.ROLE]
+        )
+        for access_role in access_roles:
+            if access_role.course_id is None:
+                # org-based role: the user has access to all of the org's courses
+                orgs.append(access_role.org)
+            else:
+                course_ids.append(access_role.course_id)
+        summaries = summaries.filter(Q(course_id__in=course_ids) | Q(org__in=orgs))
+
+    in_process_course_actions = [
+        course for course in
+        CourseRerunState.objects.find_all(
+            exclude_args={'state': CourseRerunUIStateManager.State.SUCCEEDED}, should_display=True
+        )
+        if has_course_access(request.user, course.course_key)
+    ]
+    return list(summaries), in_process_course_actions
+
+
 def _accessible_courses_list_from_groups(request):
     """
     List all courses available to the logged in user by reversing access group names
@@ -349,7 +382,9 @@ def course_listing(request):
     Try to get all courses by first reversing django groups and fallback to old method if it fails
     Note: overhead of pymongo reads will increase if getting courses from django groups fails
     """
-    if GlobalStaff().has_user(request.user):
+    if settings.FEATURES.get('ENABLE_COURSE_SUMMARY_CATALOG', False):
+        courses, in_process_course_actions = _accessible_course_summaries(request)
+    elif GlobalStaff().has_user(request.user):
         # user has global access so no need to get courses from django groups
         courses, in_process_course_actions = _accessible_courses_list(request)
     else:
@@ -375,6 +410,21 @@ def course_listing(request):
             'run': course.location.run
         }
 
+    def format_course_summary_for_view(summary):
+        """
+        Return the same dict as format_course_for_view, for a course summary
+        """
+        return {
+            'display_name': summary.display_name,
+            'course_key': unicode(summary.course_id),
+            'url': reverse_course_url('course_handler', summary.course_id),
+            'lms_link': get_lms_link_for_item(summary.location),
+            'rerun_link': _get_rerun_link_for_item(summary.course_id),
+            'org': summary.display_org,
+            'number': summary.display_number,
+            'run': summary.run
+        }
+
     def format_in_process_course_view(uca):
         """
         Return a dict of the data which the view requires for each unsucceeded course
@@ -398,11 +448,18 @@ def course_listing(request):
 
     # remove any courses in courses that are also in the in_process_course_actions list
     in_process_action_course_keys = [uca.course_key for uca in in_process_course_actions]
-    courses = [
-        format_course_for_view(c)
-        for c in courses
-        if not isinstance(c, ErrorDescriptor) and (c.id not in in_process_action_course_keys)
-    ]
+    if settings.FEATURES.get('ENABLE_COURSE_SUMMARY_CATALOG', False):
+        courses = [
+            format_course_summary_for_view(summary)
+            for summary in courses
+            if summary.course_id not in in_process_action_course_keys
+        ]
+    else:
+        courses = [
+            format_course_for_view(c)
+            for c in courses
+            if not isinstance(c, ErrorDescriptor) and (c.id not in in_process_action_course_keys)
+        ]
 
     in_process_course_actions = [format_in_process_course_view(uca) for uca in in_process_course_actions]
 
@@ -2,19 +2,20 @@
 These views handle all actions in Studio related to import and exporting of
 courses
 """
+import json
 import logging
 import os
+import Queue
 import re
 import shutil
-import tarfile
+import sys
+import threading
 from path import path
-from tempfile import mkdtemp
 
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import SuspiciousOperation, PermissionDenied
-from django.core.files.temp import NamedTemporaryFile
-from django.core.servers.basehttp import FileWrapper
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
 from django.http import HttpResponse, HttpResponseNotFound
 from django.utils.translation import ugettext as _
 from django.views.decorators.http import require_http_methods, require_GET
@@ -25,15 +26,17 @@ from xmodule.contentstore.django import contentstore
 from xmodule.exceptions import SerializationError
 from xmodule.modulestore.django import modulestore
 from opaque_keys.edx.keys import CourseKey
-from xmodule.modulestore.xml_importer import import_from_xml
-from xmodule.modulestore.xml_exporter import export_to_xml
+from xmodule.modulestore.xml_exporter import export_to_tar
 
 from .access import has_course_access
 
-from extract_tar import safetar_extractall
+from course_action_state.managers import CourseActionStateItemNotFoundError
+from course_action_state.models import CourseImportState
+from request_cache.middleware import RequestCache
 from util.json_request import JsonResponse
 from util.views import ensure_valid_course_key
 
+from contentstore.tasks import import_course
 from contentstore.utils import reverse_course_url, reverse_usage_url
 
 
@@ -46,6 +49,9 @@ log = logging.getLogger(__name__)
 # Regex to capture Content-Range header ranges.
 CONTENT_RE = re.compile(r"(?P<start>\d{1,11})-(?P<stop>\d{1,11})/(?P<end>\d{1,11})")
 
+# How many chunks of an exported tar.gz may be waiting on a slow download
+EXPORT_STREAM_MAX_CHUNKS = 16
+
 
 # pylint: disable=unused-argument
 @login_required
@@ -77,12 +83,20 @@ def import_handler(request, course_key_string):
                 course_dir = data_root / course_subdir
                 filename = request.FILES['course-data'].name
 
-                # Use sessions to keep info about import progress
-                session_status = request.session.setdefault("import_status", {})
-                key = unicode(course_key) + filename
-                _save_request_status(request, key, 0)
+                # Get upload chunks byte ranges
+                try:
+                    matches = CONTENT_RE.search(request.META["HTTP_CONTENT_RANGE"])
+                    content_range = matches.groupdict()
+                except KeyError:    # Single chunk
+                    # no Content-Range header, so make one that will work
+                    content_range = {'start': 0, 'stop': 1, 'end': 2}
+
+                # Keep the import progress in the course's CourseImportState
+                if int(content_range['start']) == 0:
+                    CourseImportState.objects.initiated(course_key, request.user, filename)
+
                 if not filename.endswith('.tar.gz'):
-                    _save_request_status(request, key, -1)
+                    CourseImportState.objects.failed(course_key, 1, _('We only support uploading a .tar.gz file.'))
                     return JsonResponse(
                         {
                             'ErrMsg': _('We only support uploading a .tar.gz file.'),
@@ -97,14 +111,6 @@ def import_handler(request, course_key_string):
 
                 logging.debug('importing course to {0}'.format(temp_filepath))
 
-                # Get upload chunks byte ranges
-                try:
-                    matches = CONTENT_RE.search(request.META["HTTP_CONTENT_RANGE"])
-                    content_range = matches.groupdict()
-                except KeyError:    # Single chunk
-                    # no Content-Range header, so make one that will work
-                    content_range = {'start': 0, 'stop': 1, 'end': 2}
-
                 # stream out the uploaded files in chunks to disk
                 if int(content_range['start']) == 0:
                     mode = "wb+"
@@ -115,7 +121,7 @@ def import_handler(request, course_key_string):
                     # This shouldn't happen, even if different instances are handling
                     # the same session, but it's always better to catch errors earlier.
                     if size < int(content_range['start']):
-                        _save_request_status(request, key, -1)
+                        CourseImportState.objects.failed(course_key, 1, _('File upload corrupted. Please try again'))
                         log.warning(
                             "Reported range %s does not match size downloaded so far %s",
                             content_range['start'],
@@ -151,9 +157,18 @@ def import_handler(request, course_key_string):
                             "thumbnailUrl": ""
                         }]
                     })
+
+                # This was the last chunk.
+                log.info("Course import {0}: Upload complete".format(course_key))
+                CourseImportState.objects.update_stage(course_key, 1)
+                # The task looks up the import state, so it must not start before that commits
+                if transaction.is_managed():
+                    transaction.commit()
+                import_course.delay(unicode(course_key), request.user.id, course_dir, filename)
+
             # Send errors to client with stage at which error occurred.
             except Exception as exception:   # pylint: disable=broad-except
-                _save_request_status(request, key, -1)
+                CourseImportState.objects.failed(course_key, 1, unicode(exception))
                 if course_dir.isdir():
                     shutil.rmtree(course_dir)
                     log.info("Course import {0}: Temp data cleared".format(course_key))
@@ -169,109 +184,10 @@ def import_handler(request, course_key_string):
                     status=400
                 )
 
-            # try-finally block for proper clean up after receiving last chunk.
-            try:
-                # This was the last chunk.
-                log.info("Course import {0}: Upload complete".format(course_key))
-                _save_request_status(request, key, 1)
-
-                tar_file = tarfile.open(temp_filepath)
-                try:
-                    safetar_extractall(tar_file, (course_dir + '/').encode('utf-8'))
-                except SuspiciousOperation as exc:
-                    _save_request_status(request, key, -1)
-                    return JsonResponse(
-                        {
-                            'ErrMsg': 'Unsafe tar file. Aborting import.',
-                            'SuspiciousFileOperationMsg': exc.args[0],
-                            'Stage': -1
-                        },
-                        status=400
-                    )
-                finally:
-                    tar_file.close()
-
-                log.info("Course import {0}: Uploaded file extracted".format(course_key))
-                _save_request_status(request, key, 2)
-
-                # find the 'course.xml' file
-                def get_all_files(directory):
-                    """
-                    For each file in the directory, yield a 2-tuple of (file-name,
-                    directory-path)
-                    """
-                    for dirpath, _dirnames, filenames in os.walk(directory):
-                        for filename in filenames:
-                            yield (filename, dirpath)
-
-                def get_dir_for_fname(directory, filename):
-                    """
-                    Returns the dirpath for the first file found in the directory
-                    with the given name.  If there is no file in the directory with
-                    the specified name, return None.
-                    """
-                    for fname, dirpath in get_all_files(directory):
-                        if fname == filename:
-                            return dirpath
-                    return None
-
-                fname = "course.xml"
-                dirpath = get_dir_for_fname(course_dir, fname)
-                if not dirpath:
-                    _save_request_status(request, key, -2)
-                    return JsonResponse(
-                        {
-
-                            'ErrMsg': _('Could not find the course.xml file in the package.'),
-                            'Stage': -2
-                        },
-                        status=415
-                    )
-
-                dirpath = os.path.relpath(dirpath, data_root)
-                logging.debug('found course.xml at {0}'.format(dirpath))
-
-                log.info("Course import {0}: Extracted file verified".format(course_key))
-                _save_request_status(request, key, 3)
-
-                course_items = import_from_xml(
-                    modulestore(),
-                    request.user.id,
-                    settings.GITHUB_REPO_ROOT,
-                    [dirpath],
-                    load_error_modules=False,
-                    static_content_store=contentstore(),
-                    target_course_id=course_key,
-                )
-
-                new_location = course_items[0].location
-                logging.debug('new course at {0}'.format(new_location))
-
-                log.info("Course import {0}: Course import successful".format(course_key))
-                _save_request_status(request, key, 4)
-
-            # Send errors to client with stage at which error occurred.
-            except Exception as exception:   # pylint: disable=broad-except
-                log.exception(
-                    "error importing course"
-                )
-                return JsonResponse(
-                    {
-                        'ErrMsg': str(exception),
-                        'Stage': -session_status[key]
-                    },
-                    status=400
-                )
-
-            finally:
-                if course_dir.isdir():
-                    shutil.rmtree(course_dir)
-                    log.info("Course import {0}: Temp data cleared".format(course_key))
-                # set failed stage number with negative sign in case of unsuccessful import
-                if session_status[key] != 4:
-                    _save_request_status(request, key, -abs(session_status[key]))
-
-            return JsonResponse({'Status': 'OK'})
+            # The rest of the import happens in the import_course task, whose
+            # progress the client follows through import_status_handler.
+            state = CourseImportState.objects.find_first(course_key=course_key)
+            return JsonResponse({'ImportStatus': state.stage})
     elif request.method == 'GET':  # assume html
         course_module = modulestore().get_course(course_key)
         return render_to_response('import.html', {
@@ -283,18 +199,6 @@ def import_handler(request, course_key_string):
         return HttpResponseNotFound()
 
 
-def _save_request_status(request, key, status):
-    """
-    Save import status for a course in request session
-    """
-    session_status = request.session.get('import_status')
-    if session_status is None:
-        session_status = request.session.setdefault("import_status", {})
-
-    session_status[key] = status
-    request.session.save()
-
-
 # pylint: disable=unused-argument
 @require_GET
 @ensure_csrf_cookie
@@ -311,18 +215,26 @@ def import_status_handler(request, course_key_string, filename=None):
         3 : Importing to mongo
         4 : Import successful
 
+    along with the error message of a failed import, and for each step of
+    the import that is done, how long it took and how many items per
+    second it handled.
     """
     course_key = CourseKey.from_string(course_key_string)
     if not has_course_access(request.user, course_key):
         raise PermissionDenied()
 
     try:
-        session_status = request.session["import_status"]
-        status = session_status[course_key_string + filename]
-    except KeyError:
-        status = 0
+        state = CourseImportState.objects.find_first(course_key=course_key, filename=filename)
+    except CourseActionStateItemNotFoundError:
+        return JsonResponse({"ImportStatus": 0})
 
-    return JsonResponse({"ImportStatus": status})
+    steps = {}
+    for step, stats in json.loads(state.step_stats).iteritems():
+        steps[step] = dict(stats)
+        if stats.get('count') is not None and stats['seconds'] > 0:
+            steps[step]['per_second'] = round(stats['count'] / stats['seconds'], 1)
+
+    return JsonResponse({"ImportStatus": state.stage, "Message": state.message, "Steps": steps})
 
 
 # pylint: disable=unused-argument
@@ -357,15 +269,9 @@ def export_handler(request, course_key_string):
     export_url = reverse_course_url('export_handler', course_key) + '?_accept=application/x-tgz'
     if 'application/x-tgz' in requested_format:
         name = course_module.url_name
-        export_file = NamedTemporaryFile(prefix=name + '.', suffix=".tar.gz")
-        root_dir = path(mkdtemp())
 
         try:
-            export_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
-
-            logging.debug(u'tar file being generated at {0}'.format(export_file.name))
-            with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-                tar_file.add(root_dir / name, arcname=name)
+            export_stream = ExportStream(course_module.id, name).start()
         except SerializationError as exc:
             log.exception(u'There was an error exporting course %s', course_module.id)
             unit = None
@@ -403,13 +309,10 @@ def export_handler(request, course_key_string):
                 'course_home_url': reverse_course_url("course_handler", course_key),
                 'export_url': export_url
             })
-        finally:
-            shutil.rmtree(root_dir / name)
 
-        wrapper = FileWrapper(export_file)
-        response = HttpResponse(wrapper, content_type='application/x-tgz')
-        response['Content-Disposition'] = 'attachment; filename=%s' % os.path.basename(export_file.name.encode('utf-8'))
-        response['Content-Length'] = os.path.getsize(export_file.name)
+        # The tar.gz is sent as it is written, so its length isn't known up front.
+        response = HttpResponse(export_stream, content_type='application/x-tgz')
+        response['Content-Disposition'] = 'attachment; filename=%s.tar.gz' % name.encode('utf-8')
         return response
 
     elif 'text/html' in requested_format:
@@ -421,3 +324,91 @@ def export_handler(request, course_key_string):
     else:
         # Only HTML or x-tgz request formats are supported (no JSON).
         return HttpResponse(status=406)
+
+
+class ExportStream(object):
+    """
+    Exports a course as a tar.gz in a thread of its own, and iterates over the chunks of the
+    tar.gz as the export writes them, so the download starts while the export is still running.
+
+    An exception the export raises before it writes anything is raised again by `start`, so
+    it can still be shown to the user; one raised after the download began is logged and
+    raised again while iterating, so the server aborts the response instead of ending it
+    cleanly, and the client sees a failed download rather than a truncated tar.gz.
+    """
+    _END = object()
+
+    def __init__(self, course_key, course_dir):
+        self.course_key = course_key
+        self.course_dir = course_dir
+        self._chunks = Queue.Queue(maxsize=EXPORT_STREAM_MAX_CHUNKS)
+        self._abandoned = threading.Event()
+        self._first = None
+
+    def start(self):
+        """
+        Start the export, and wait for its first chunk (or for it to fail)
+        """
+        thread = threading.Thread(target=self._export, name=u'export {}'.format(self.course_key))
+        thread.daemon = True
+        thread.start()
+        self._first = self._chunks.get()
+        if isinstance(self._first, tuple):
+            exc_type, exc_value, exc_traceback = self._first
+            raise exc_type, exc_value, exc_traceback
+        return self
+
+    def _export(self):
+        """
+        Run the export, then queue up how it ended: the end marker, or its exc_info
+        """
+        # this thread doesn't go through the middleware which sets up the request cache
+        RequestCache().clear_request_cache()
+        try:
+            export_to_tar(modulestore(), contentstore(), self.course_key, self.course_dir, self)
+            outcome = self._END
+        except Exception:  # pylint: disable=broad-except
+            outcome = sys.exc_info()
+        try:
+            self._put(outcome)
+        except IOError:
+            pass
+
+    def _put(self, item):
+        """
+        Queue up item, giving up with an IOError if the download has been abandoned
+        """
+        while True:
+            if self._abandoned.is_set():
+                raise IOError(u'The download of the export of {} was abandoned'.format(self.course_key))
+            try:
+                self._chunks.put(item, timeout=1)
+                return
+            except Queue.Full:
+                pass
+
+    def write(self, data):
+        """
+        Called by the export with each chunk of the tar.gz
+        """
+        if data:
+            self._put(data)
+
+    def close(self):
+        """
+        Called once the response is done with, whether or not the download finished
+        """
+        self._abandoned.set()
+
+    def __iter__(self):
+        item = self._first
+        try:
+            while item is not self._END:
+                if isinstance(item, tuple):
+                    log.error(u'Export of course %s failed after its download began', self.course_key, exc_info=item)
+                    exc_type, exc_value, exc_traceback = item
+                    raise exc_type, exc_value, exc_traceback
+                yield item
+                item = self._chunks.get()
+        finally:
+            self.close()
@@ -9,14 +9,18 @@ import shutil
 import tarfile
 import tempfile
 from path import path
+from StringIO import StringIO
 from uuid import uuid4
 
+from mock import patch
 from django.test.utils import override_settings
 from django.conf import settings
 from contentstore.utils import reverse_course_url
 
+from xmodule.exceptions import SerializationError
 from xmodule.modulestore.tests.factories import ItemFactory
 
+from contentstore.tasks import import_course
 from contentstore.tests.utils import CourseTestCase
 from student import auth
 from student.roles import CourseInstructorRole, CourseStaffRole
@@ -70,6 +74,19 @@ class ImportTestCase(CourseTestCase):
     def tearDown(self):
         shutil.rmtree(self.content_dir)
 
+    def get_import_status(self, tar_path):
+        """
+        Returns the response of `import_status` for the import of `tar_path`.
+        """
+        resp_status = self.client.get(
+            reverse_course_url(
+                'import_status_handler',
+                self.course.id,
+                kwargs={'filename': os.path.split(tar_path)[1]}
+            )
+        )
+        return json.loads(resp_status.content)
+
     def test_no_coursexml(self):
         """
         Check that the response for a tar.gz import without a course.xml is
@@ -82,18 +99,14 @@ class ImportTestCase(CourseTestCase):
                     "name": self.bad_tar,
                     "course-data": [btar]
                 })
-        self.assertEquals(resp.status_code, 415)
+        # The import task runs eagerly in tests, so it is already done
+        self.assertEquals(resp.status_code, 200)
+        self.assertEquals(json.loads(resp.content)["ImportStatus"], -2)
         # Check that `import_status` returns the appropriate stage (i.e., the
         # stage at which import failed).
-        resp_status = self.client.get(
-            reverse_course_url(
-                'import_status_handler',
-                self.course.id,
-                kwargs={'filename': os.path.split(self.bad_tar)[1]}
-            )
-        )
-
-        self.assertEquals(json.loads(resp_status.content)["ImportStatus"], -2)
+        status = self.get_import_status(self.bad_tar)
+        self.assertEquals(status["ImportStatus"], -2)
+        self.assertIn("course.xml", status["Message"])
 
     def test_with_coursexml(self):
         """
@@ -105,6 +118,35 @@ class ImportTestCase(CourseTestCase):
             resp = self.client.post(self.url, args)
 
         self.assertEquals(resp.status_code, 200)
+        self.assertEquals(json.loads(resp.content)["ImportStatus"], 4)
+
+    def test_import_without_state(self):
+        """
+        Check that the import task removes the uploaded files even when it
+        can't find the state of the import.
+        """
+        course_dir = path(tempfile.mkdtemp(dir=self.content_dir))
+        shutil.copy(self.good_tar, course_dir)
+        result = import_course(unicode(self.course.id), self.user.id, course_dir, "good.tar.gz")
+        self.assertEquals(result, "no import state")
+        self.assertFalse(course_dir.exists())
+
+    def test_import_step_stats(self):
+        """
+        Check that `import_status` reports each step of a successful import.
+        """
+        with open(self.good_tar) as gtar:
+            args = {"name": self.good_tar, "course-data": [gtar]}
+            self.client.post(self.url, args)
+
+        status = self.get_import_status(self.good_tar)
+        self.assertEquals(status["ImportStatus"], 4)
+        self.assertItemsEqual(
+            status["Steps"].keys(),
+            ['unpacking', 'verifying', 'parse', 'static_content', 'modules', 'drafts']
+        )
+        self.assertEquals(status["Steps"]["static_content"]["count"], 0)
+        self.assertGreater(status["Steps"]["modules"]["count"], 0)
 
     def test_import_in_existing_course(self):
         """
@@ -221,8 +263,9 @@ class ImportTestCase(CourseTestCase):
             with open(tarpath) as tar:
                 args = {"name": tarpath, "course-data": [tar]}
                 resp = self.client.post(self.url, args)
-            self.assertEquals(resp.status_code, 400)
-            self.assertTrue("SuspiciousFileOperation" in resp.content)
+            self.assertEquals(resp.status_code, 200)
+            self.assertEquals(json.loads(resp.content)["ImportStatus"], -1)
+            self.assertIn("Unsafe tar file", self.get_import_status(tarpath)["Message"])
 
         try_tar(self._fifo_tar())
         try_tar(self._symlink_tar())
@@ -231,14 +274,7 @@ class ImportTestCase(CourseTestCase):
         # Check that `import_status` returns the appropriate stage (i.e.,
         # either 3, indicating all previous steps are completed, or 0,
         # indicating no upload in progress)
-        resp_status = self.client.get(
-            reverse_course_url(
-                'import_status_handler',
-                self.course.id,
-                kwargs={'filename': os.path.split(self.good_tar)[1]}
-            )
-        )
-        import_status = json.loads(resp_status.content)["ImportStatus"]
+        import_status = self.get_import_status(self.good_tar)["ImportStatus"]
         self.assertIn(import_status, (0, 3))
 
 
@@ -287,6 +323,10 @@ class ExportTestCase(CourseTestCase):
         """ Export success helper method. """
         self.assertEquals(resp.status_code, 200)
         self.assertTrue(resp.get('Content-Disposition').startswith('attachment'))
+        tar_file = tarfile.open(fileobj=StringIO(resp.content), mode='r:gz')
+        names = tar_file.getnames()
+        self.assertIn('{}/course.xml'.format(self.course.location.name), names)
+        self.assertIn('{}/policies/assets.json'.format(self.course.location.name), names)
 
     def test_export_failure_top_level(self):
         """
@@ -315,3 +355,18 @@ class ExportTestCase(CourseTestCase):
         self.assertIsNone(resp.get('Content-Disposition'))
         self.assertContains(resp, 'Unable to create xml for module')
         self.assertContains(resp, expected_text)
+
+    def test_export_failure_after_download_began(self):
+        """
+        An export failing after the first chunk of the tar.gz was sent aborts the download,
+        rather than ending it as if the truncated tar.gz were complete.
+        """
+        def failing_export(modulestore, contentstore, course_key, course_dir, fileobj):
+            """ Writes a chunk of the tar.gz, then fails """
+            fileobj.write('partial tar.gz')
+            raise SerializationError(self.course.location, 'Unable to create xml for module')
+
+        with patch('contentstore.views.import_export.export_to_tar', failing_export):
+            with self.assertRaises(SerializationError):
+                resp = self.client.get(self.url, HTTP_ACCEPT='application/x-tgz')
+                resp.content  # pylint: disable=pointless-statement
@@ -107,6 +107,10 @@ FEATURES = {
 
     # Modulestore to use for new courses
     'DEFAULT_STORE_FOR_NEW_COURSE': None,
+
+    # List courses on the Studio home page from the course summary table rather than the
+    # modulestore. Run the populate_course_summaries management command before turning it on.
+    'ENABLE_COURSE_SUMMARY_CATALOG': False,
 }
 ENABLE_JASMINE = False
 
@@ -120,6 +124,11 @@ ENV_ROOT = REPO_ROOT.dirname()  # virtualenv dir /edx-platform is in
 
 GITHUB_REPO_ROOT = ENV_ROOT / "data"
 
+# Number of threads saving the static content of a course being imported.
+# Imports run in celery tasks, so GITHUB_REPO_ROOT, where uploaded course
+# files are put, must be shared with the celery workers.
+COURSE_IMPORT_STATIC_CONTENT_WORKERS = 4
+
 sys.path.append(REPO_ROOT)
 sys.path.append(PROJECT_ROOT / 'djangoapps')
 sys.path.append(COMMON_ROOT / 'djangoapps')
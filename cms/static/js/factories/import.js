@@ -54,11 +54,11 @@ define([
                                 else {
                                     alert(gettext('Your import has failed.') + '\n\n' + errMsg);
                                 }
+                                CourseImport.stopGetStatus = true;
                                 chooseBtn.html(gettext('Choose new file')).show();
-                                bar.hide();
                             }
-                            CourseImport.stopGetStatus = true;
-                            chooseBtn.html(gettext('Choose new file')).show();
+                            // Otherwise the import goes on in the background,
+                            // and getStatus follows it to the end.
                             bar.hide();
                         });
                     });
@@ -81,7 +81,7 @@ define([
                 }
                 if (percentInt >= doneAt) {
                     bar.hide();
-                    // Start feedback with delay so that current stage of import properly updates in session
+                    // Start feedback with delay so that the import status is updated for this upload
                     setTimeout(
                         function () { CourseImport.startServerFeedback(feedbackUrl.replace('fillerName', file.name));},
                         3000
@@ -94,7 +94,6 @@ define([
             done: function(event, data){
                 bar.hide();
                 window.onbeforeunload = null;
-                CourseImport.displayFinishedImport();
             },
             start: function(event) {
                 window.onbeforeunload = function() {
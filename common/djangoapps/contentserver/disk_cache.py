@@ -0,0 +1,206 @@
+"""
+A local disk cache for course assets which are too large to keep in memcached.
+
+Files are named after a digest of the asset's location and last_modified_at, so
+a new version of an asset is simply a new file and nothing ever has to be
+invalidated; stale versions age out like everything else once the cache grows
+beyond its maximum size, least recently served first.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+
+from xmodule.contentstore.content import StaticContent, STREAM_DATA_CHUNK_SIZE
+
+log = logging.getLogger(__name__)
+
+# Read cached files in bigger chunks than GridFS streams, they come from local disk
+DISK_CACHE_CHUNK_SIZE = 64 * STREAM_DATA_CHUNK_SIZE
+
+# Once the cache is over its maximum size, evict down to this fraction of it, so that
+# each new file doesn't trigger another eviction
+EVICTION_LOW_WATER_MARK = 0.9
+
+TEMP_FILE_PREFIX = '.tmp'
+
+
+def content_digest(location, last_modified_at):
+    """
+    Return a digest which changes whenever the content of the asset at location does.
+    Used both as the name of the cached file and as the asset's ETag.
+    """
+    version = last_modified_at.isoformat() if last_modified_at is not None else ''
+    return hashlib.sha1(u'{}@{}'.format(location, version).encode('utf-8')).hexdigest()
+
+
+class DiskCachedContent(StaticContent):
+    """
+    An asset whose data is read from a file in the disk cache.
+    """
+    def __init__(self, content, path):
+        super(DiskCachedContent, self).__init__(
+            content.location, content.name, content.content_type, None,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked
+        )
+        self.path = path
+
+    @property
+    def data(self):
+        with open(self.path, 'rb') as cached_file:
+            return cached_file.read()
+
+    def stream_data(self):
+        return self.stream_data_in_range(0, self.length - 1)
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        with open(self.path, 'rb') as cached_file:
+            cached_file.seek(first_byte)
+            remaining = last_byte - first_byte + 1
+            while remaining > 0:
+                chunk = cached_file.read(min(remaining, DISK_CACHE_CHUNK_SIZE))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class AssetDiskCache(object):
+    """
+    A size bounded directory of asset files, shared by all the processes on a host.
+    """
+    def __init__(self, root, max_size, accel_redirect_prefix=None):
+        self.root = root
+        self.max_size = max_size
+        # if set, the web server serves the cached files from an internal location with this prefix
+        self.accel_redirect_prefix = accel_redirect_prefix
+        self._lock = threading.Lock()
+        # an estimate of the size of the directory, corrected on each eviction pass
+        self._size = None
+
+    def _path(self, digest):
+        """
+        The cached files are spread over 256 subdirectories to keep directories small
+        """
+        return os.path.join(self.root, digest[:2], digest)
+
+    def accel_redirect_path(self, content):
+        """
+        The path to give the web server in X-Accel-Redirect to have it send content (a DiskCachedContent)
+        itself, or None if it isn't set up to.
+        """
+        if self.accel_redirect_prefix is None:
+            return None
+        return self.accel_redirect_prefix.rstrip('/') + '/' + os.path.relpath(content.path, self.root)
+
+    def get(self, content):
+        """
+        Return a DiskCachedContent for the current version of content, or None if it isn't cached.
+        """
+        path = self._path(content_digest(content.location, content.last_modified_at))
+        try:
+            # mark the file as recently used
+            os.utime(path, None)
+        except OSError:
+            return None
+        return DiskCachedContent(content, path)
+
+    def put(self, content):
+        """
+        Copy content (a StaticContentStream) to the cache and return a DiskCachedContent for it, or None
+        if it can't be cached.
+        """
+        if content.length is None or content.length > self.max_size:
+            return None
+
+        path = self._path(content_digest(content.location, content.last_modified_at))
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            # write to a temporary file and move it in place, so no process ever sees a partial file
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=TEMP_FILE_PREFIX)
+            try:
+                with os.fdopen(fd, 'wb') as temp_file:
+                    for chunk in content.stream_data_in_range(0, content.length - 1):
+                        temp_file.write(chunk)
+                os.rename(temp_path, path)
+            except Exception:
+                os.remove(temp_path)
+                raise
+        except (IOError, OSError):
+            log.exception(u"Could not write %s to the asset disk cache", content.location)
+            return None
+
+        self._added(content.length)
+        return DiskCachedContent(content, path)
+
+    def _added(self, size):
+        """
+        Account for a new file of the given size, evicting old ones if the cache is now too big.
+        """
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            if self._size is None or self._size > self.max_size:
+                self._size = self._evict()
+
+    def _evict(self):
+        """
+        Delete the least recently used files until the cache is below its low water mark.
+        Returns the size of what is left.
+        """
+        files = []
+        for dirpath, __, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.startswith(TEMP_FILE_PREFIX):
+                    # still being written
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # removed by another process
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(file_size for __, file_size, __ in files)
+        if size <= self.max_size:
+            return size
+
+        target = self.max_size * EVICTION_LOW_WATER_MARK
+        for __, file_size, path in sorted(files):
+            if size <= target:
+                break
+            try:
+                # processes which are serving the file keep their handle on it
+                os.remove(path)
+            except OSError:
+                continue
+            size -= file_size
+        return size
+
+
+_DISK_CACHES = {}
+
+
+def get_asset_disk_cache():
+    """
+    Return the process wide AssetDiskCache configured by settings.STATIC_CONTENT_DISK_CACHE, or None
+    if there is no disk cache.
+    """
+    config = getattr(settings, 'STATIC_CONTENT_DISK_CACHE', None)
+    if not config:
+        return None
+
+    key = (config['ROOT'], config['MAX_SIZE'], config.get('ACCEL_REDIRECT_PREFIX'))
+    if key not in _DISK_CACHES:
+        _DISK_CACHES[key] = AssetDiskCache(*key)
+    return _DISK_CACHES[key]
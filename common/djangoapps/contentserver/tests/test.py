@@ -4,7 +4,12 @@ Tests for StaticContentServer
 import copy
 import ddt
 import logging
+import os
+import shutil
 import unittest
+from datetime import datetime, timedelta
+from mock import patch
+from tempfile import mkdtemp
 from uuid import uuid4
 
 from django.conf import settings
@@ -17,7 +22,10 @@ from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.xml_importer import import_from_xml
 
+from cache_toolbox.core import del_cached_content
+from contentserver.disk_cache import AssetDiskCache
 from contentserver.middleware import parse_range_header
+from xmodule.contentstore.content import StaticContent
 from student.models import CourseEnrollment
 
 log = logging.getLogger(__name__)
@@ -145,7 +153,7 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart message with a part for each range.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
@@ -153,10 +161,79 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
             first=first_byte, last=last_byte)
         )
 
-        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
         self.assertNotIn('Content-Range', resp)
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        body = resp.content
+        self.assertEqual(resp['Content-Length'], str(len(body)))
+
+        data = self.contentstore.find(self.unlocked_asset).data
+        boundary = resp['Content-Type'].split('boundary=')[1]
+        parts = body.split('--{}'.format(boundary))
+        self.assertEqual(parts[-1], '--\r\n')
+        expected = [
+            (first_byte, last_byte),
+            (self.length_unlocked - 100, self.length_unlocked - 1),
+        ]
+        for part, (first, last) in zip(parts[1:-1], expected):
+            headers, part_data = part.split('\r\n\r\n', 1)
+            self.assertIn('Content-Range: bytes {first}-{last}/{length}'.format(
+                first=first, last=last, length=self.length_unlocked), headers)
+            self.assertEqual(part_data, data[first:last + 1] + '\r\n')
+
+    def test_range_request_overlapping_ranges(self):
+        """
+        Test that overlapping ranges are sent once, as a single range.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-99, 50-199, 200-299')
+
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertEqual(resp['Content-Range'], 'bytes 0-299/{length}'.format(length=self.length_unlocked))
+        self.assertEqual(resp['Content-Length'], '300')
+
+    def test_etag(self):
+        """
+        Test that the ETag of an asset can be used to revalidate it, and to make range requests conditional.
+        """
+        resp = self.client.get(self.url_unlocked)
+        etag = resp['ETag']
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"another-version"')
+        self.assertEqual(resp.status_code, 200)
+
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(resp.status_code, 206)
+
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"another-version"')
+        self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
 
+    def test_disk_cache(self):
+        """
+        Test that assets too big for memcached are served from the disk cache.
+        """
+        cache_root = mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_root)
+        config = {'ROOT': cache_root, 'MAX_SIZE': 1024 * 1024}
+        data = self.contentstore.find(self.unlocked_asset).data
+        del_cached_content(self.unlocked_asset)
+
+        with override_settings(STATIC_CONTENT_DISK_CACHE=config):
+            with patch('contentserver.middleware.MAX_MEMCACHED_ASSET_SIZE', 0):
+                resp = self.client.get(self.url_unlocked)
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(resp.content, data)
+                cached_files = [filenames for __, __, filenames in os.walk(cache_root) if filenames]
+                self.assertEqual(1, len(cached_files))
+
+                resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=10-19')
+                self.assertEqual(resp.status_code, 206)
+                self.assertEqual(resp.content, data[10:20])
+
     @ddt.data(
         'bytes 0-',
         'bits=0-',
@@ -235,3 +312,56 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         self.assertRaisesRegexp(
             exception_class, exception_message_regex, parse_range_header, header_value, self.content_length
         )
+
+
+class AssetDiskCacheTestCase(unittest.TestCase):
+    """
+    Tests for AssetDiskCache
+    """
+    def setUp(self):
+        super(AssetDiskCacheTestCase, self).setUp()
+        self.root = mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.course_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+
+    def make_content(self, name, size, last_modified_at=None):
+        """
+        Return an in memory asset of the given size
+        """
+        return StaticContent(
+            self.course_key.make_asset_key('asset', name), name, 'application/octet-stream', 'x' * size,
+            last_modified_at=last_modified_at or datetime(2015, 1, 1), length=size
+        )
+
+    def test_get_and_put(self):
+        cache = AssetDiskCache(self.root, 1000)
+        content = self.make_content('handout.pdf', 100)
+        self.assertIsNone(cache.get(content))
+
+        cached = cache.put(content)
+        self.assertEqual(content.data, cached.data)
+        self.assertEqual(content.data[10:20], ''.join(cached.stream_data_in_range(10, 19)))
+        self.assertEqual(cached.path, cache.get(content).path)
+
+        # a new version of the asset is a different file
+        newer = self.make_content('handout.pdf', 100, last_modified_at=datetime(2015, 1, 2))
+        self.assertIsNone(cache.get(newer))
+
+    def test_too_big(self):
+        cache = AssetDiskCache(self.root, 1000)
+        self.assertIsNone(cache.put(self.make_content('video.mp4', 1001)))
+
+    def test_eviction(self):
+        cache = AssetDiskCache(self.root, 1000)
+        contents = [self.make_content('handout{}.pdf'.format(index), 400) for index in range(3)]
+        cache.put(contents[0])
+        second = cache.put(contents[1])
+        # make the first file the most recently used one
+        past = (datetime.utcnow() - timedelta(minutes=1) - datetime(1970, 1, 1)).total_seconds()
+        os.utime(second.path, (past, past))
+        cache.get(contents[0])
+
+        cache.put(contents[2])
+        self.assertIsNotNone(cache.get(contents[0]))
+        self.assertIsNone(cache.get(contents[1]))
+        self.assertIsNotNone(cache.get(contents[2]))
@@ -1,6 +1,7 @@
 """
 Model Managers for Course Actions
 """
+import json
 import traceback
 from django.db import models, transaction
 
@@ -147,6 +148,74 @@ class CourseRerunUIStateManager(CourseActionUIStateManager):
         )
 
 
+class CourseImportUIStateManager(CourseActionUIStateManager):
+    """
+    A concrete model Manager for the Import Action.
+    """
+    ACTION = "import"
+
+    class State(object):
+        """
+        An Enum class for maintaining the list of possible states for Imports.
+        """
+        IN_PROGRESS = "in_progress"
+        FAILED = "failed"
+        SUCCEEDED = "succeeded"
+
+    # The stage of a succeeded import
+    STAGE_SUCCEEDED = 4
+
+    def initiated(self, course_key, user, filename):
+        """
+        To be called when the upload of a file to import into the given course starts.
+        """
+        return self.update_state(
+            course_key=course_key,
+            new_state=self.State.IN_PROGRESS,
+            user=user,
+            allow_not_found=True,
+            filename=filename,
+            stage=0,
+            step_stats="{}",
+        )
+
+    def update_stage(self, course_key, stage, step_stats=None):
+        """
+        To be called when an import in progress for the given course reaches
+        the given stage. step_stats, if given, replaces the stats of the steps done.
+        """
+        fields = {'stage': stage}
+        if step_stats is not None:
+            fields['step_stats'] = json.dumps(step_stats)
+        return self.update_state(
+            course_key=course_key,
+            new_state=self.State.IN_PROGRESS,
+            **fields
+        )
+
+    def succeeded(self, course_key, step_stats):
+        """
+        To be called when an import in progress for the given course has successfully completed.
+        """
+        return self.update_state(
+            course_key=course_key,
+            new_state=self.State.SUCCEEDED,
+            stage=self.STAGE_SUCCEEDED,
+            step_stats=json.dumps(step_stats),
+        )
+
+    def failed(self, course_key, stage, message):
+        """
+        To be called when an import in progress for the given course has failed at the given stage.
+        """
+        return self.update_state(
+            course_key=course_key,
+            new_state=self.State.FAILED,
+            message=message[:1000],
+            stage=-abs(stage),
+        )
+
+
 class CourseActionStateItemNotFoundError(Exception):
     """An exception class for errors specific to Course Action states."""
     pass
@@ -12,7 +12,9 @@ file and check it in at the same time as your model changes. To do that,
 from django.contrib.auth.models import User
 from django.db import models
 from xmodule_django.models import CourseKeyField
-from course_action_state.managers import CourseActionStateManager, CourseRerunUIStateManager
+from course_action_state.managers import (
+    CourseActionStateManager, CourseRerunUIStateManager, CourseImportUIStateManager
+)
 
 
 class CourseActionState(models.Model):
@@ -115,3 +117,30 @@ class CourseRerunState(CourseActionUIState):
     # MANAGERS
     # Override the abstract class' manager with a Rerun-specific manager that inherits from the base class' manager.
     objects = CourseRerunUIStateManager()
+
+
+class CourseImportState(CourseActionUIState):
+    """
+    A concrete django model for maintaining state specifically for the Action Course Imports.
+    """
+    class Meta:
+        """
+        Only a single import can be in progress for a course_key.
+        """
+        unique_together = ("course_key", "action")
+
+    # FIELDS
+    # Name of the uploaded file being imported
+    filename = models.CharField(max_length=255, default="", blank=True)
+
+    # Stage of the import, as reported by the import status handler: 0 while
+    # uploading, 1 unpacking, 2 verifying, 3 importing, 4 done, and minus the
+    # stage at which the import failed.
+    stage = models.IntegerField(default=0)
+
+    # JSON dict of step name -> {"seconds": ..., "count": ...} for the steps
+    # of the import that are done
+    step_stats = models.TextField(default="{}", blank=True)
+
+    # MANAGERS
+    objects = CourseImportUIStateManager()
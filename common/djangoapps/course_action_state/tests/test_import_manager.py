@@ -0,0 +1,65 @@
+"""
+Tests specific to the CourseImportState Model and Manager.
+"""
+import json
+
+from django.test import TestCase
+from opaque_keys.edx.locations import CourseLocator
+from course_action_state.models import CourseImportState
+from course_action_state.managers import CourseImportUIStateManager
+from student.tests.factories import UserFactory
+
+
+class TestCourseImportStateManager(TestCase):
+    """
+    Test class for testing the CourseImportUIStateManager.
+    """
+    def setUp(self):
+        self.course_key = CourseLocator("test_org", "test_course_num", "test_run")
+        self.created_user = UserFactory()
+        CourseImportState.objects.initiated(self.course_key, self.created_user, "course.tar.gz")
+
+    def get_state(self):
+        """
+        Returns the import state of self.course_key.
+        """
+        return CourseImportState.objects.find_first(course_key=self.course_key, filename="course.tar.gz")
+
+    def test_initiated(self):
+        state = self.get_state()
+        self.assertEqual(state.action, CourseImportUIStateManager.ACTION)
+        self.assertEqual(state.state, CourseImportUIStateManager.State.IN_PROGRESS)
+        self.assertEqual(state.created_user, self.created_user)
+        self.assertEqual(state.stage, 0)
+        self.assertEqual(json.loads(state.step_stats), {})
+
+    def test_update_stage_and_succeed(self):
+        step_stats = {'unpacking': {'seconds': 1.5, 'count': 12}}
+        CourseImportState.objects.update_stage(self.course_key, 2, step_stats)
+        state = self.get_state()
+        self.assertEqual(state.stage, 2)
+        self.assertEqual(json.loads(state.step_stats), step_stats)
+
+        # Updating the stage alone keeps the stats
+        CourseImportState.objects.update_stage(self.course_key, 3)
+        self.assertEqual(json.loads(self.get_state().step_stats), step_stats)
+
+        CourseImportState.objects.succeeded(self.course_key, step_stats)
+        state = self.get_state()
+        self.assertEqual(state.state, CourseImportUIStateManager.State.SUCCEEDED)
+        self.assertEqual(state.stage, CourseImportUIStateManager.STAGE_SUCCEEDED)
+
+    def test_failed(self):
+        CourseImportState.objects.failed(self.course_key, 2, "no course.xml")
+        state = self.get_state()
+        self.assertEqual(state.state, CourseImportUIStateManager.State.FAILED)
+        self.assertEqual(state.stage, -2)
+        self.assertEqual(state.message, "no course.xml")
+
+    def test_new_import_resets_state(self):
+        CourseImportState.objects.failed(self.course_key, 2, "no course.xml")
+        CourseImportState.objects.initiated(self.course_key, self.created_user, "other.tar.gz")
+        state = CourseImportState.objects.find_first(course_key=self.course_key)
+        self.assertEqual(state.filename, "other.tar.gz")
+        self.assertEqual(state.stage, 0)
+        self.assertEqual(state.message, "")
@@ -5,19 +5,108 @@ forums, and to the cohort admin views.
 
 import logging
 import random
+import threading
 
-from django.db.models.signals import post_save, m2m_changed
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, m2m_changed
 from django.dispatch import receiver
 from django.http import Http404
 from django.utils.translation import ugettext as _
 
 from courseware import courses
 from eventtracking import tracker
+from request_cache.middleware import RequestCache
 from student.models import get_user_by_username_or_email
 from .models import CourseUserGroup
 
 log = logging.getLogger(__name__)
 
+# Key of the dict in the request cache holding the cohorts looked up during the request
+MEMBERSHIP_REQUEST_CACHE_KEY = 'course_groups.cohorts.membership'
+
+# The membership cache keys to forget again when the current request finishes
+_pending_invalidation = threading.local()
+
+
+def _membership_cache_key(user_id, course_key):
+    """
+    The key of the cohort of the user with id `user_id` in the course `course_key`, in both
+    the request cache and the django cache.
+    """
+    return u'course_groups.cohorts.membership.{}.{}'.format(course_key, user_id)
+
+
+def _request_membership_cache():
+    """
+    Returns the dict of cohorts looked up during the current request, by membership cache key.
+    """
+    request_cache = RequestCache.get_request_cache()
+    if not hasattr(request_cache, 'data'):
+        request_cache.data = {}
+    return request_cache.data.setdefault(MEMBERSHIP_REQUEST_CACHE_KEY, {})
+
+
+def _get_cached_cohort(user_id, course_key):
+    """
+    Returns the cached cohort of the user in the course, or None if it isn't cached.
+    """
+    key = _membership_cache_key(user_id, course_key)
+    request_cache = _request_membership_cache()
+    cohort = request_cache.get(key)
+    if cohort is None and getattr(settings, 'COHORT_MEMBERSHIP_CACHE_TIMEOUT', 0):
+        cohort = cache.get(key)
+        if cohort is not None:
+            request_cache[key] = cohort
+    return cohort
+
+
+def _set_cached_cohort(user_id, course_key, cohort):
+    """
+    Caches `cohort` as the cohort of the user in the course.
+    """
+    key = _membership_cache_key(user_id, course_key)
+    _request_membership_cache()[key] = cohort
+    cache_timeout = getattr(settings, 'COHORT_MEMBERSHIP_CACHE_TIMEOUT', 0)
+    if cache_timeout:
+        cache.set(key, cohort, cache_timeout)
+
+
+def _invalidate_cached_cohorts(user_ids, course_keys):
+    """
+    Forgets the cached cohorts of the given users in the given courses.
+
+    The django cache entries are deleted even where COHORT_MEMBERSHIP_CACHE_TIMEOUT isn't set,
+    since they are shared with the environments where it is. Inside a transaction, another
+    request can still read the old cohorts, and cache them again, until it commits, so the
+    entries are deleted again when the request finishes, after TransactionMiddleware commits.
+    """
+    keys = [
+        _membership_cache_key(user_id, course_key)
+        for user_id in user_ids
+        for course_key in set(course_keys)
+    ]
+    request_cache = _request_membership_cache()
+    for key in keys:
+        request_cache.pop(key, None)
+    if keys:
+        cache.delete_many(keys)
+        if transaction.is_managed():
+            if not hasattr(_pending_invalidation, 'keys'):
+                _pending_invalidation.keys = set()
+            _pending_invalidation.keys.update(keys)
+
+
+@receiver(request_finished)
+def _invalidate_pending_cached_cohorts(sender, **kwargs):
+    """Forgets again the cached cohorts which changed during the request, now that it has committed"""
+    keys = getattr(_pending_invalidation, 'keys', None)
+    _pending_invalidation.keys = set()
+    if keys:
+        cache.delete_many(list(keys))
+
 
 @receiver(post_save, sender=CourseUserGroup)
 def _cohort_added(sender, **kwargs):
@@ -30,9 +119,22 @@ def _cohort_added(sender, **kwargs):
         )
 
 
+@receiver(post_save, sender=CourseUserGroup)
+@receiver(pre_delete, sender=CourseUserGroup)
+def _cohort_changed(sender, **kwargs):
+    """Forgets the cached cohorts of the members of a cohort each time it is modified or deleted"""
+    instance = kwargs["instance"]
+    if not kwargs.get("created") and instance.group_type == CourseUserGroup.COHORT:
+        user_ids = list(instance.users.values_list('id', flat=True))
+        _invalidate_cached_cohorts(user_ids, [instance.course_id])
+
+
 @receiver(m2m_changed, sender=CourseUserGroup.users.through)
 def _cohort_membership_changed(sender, **kwargs):
-    """Emits a tracking log event each time cohort membership is modified"""
+    """
+    Emits a tracking log event, and forgets the cached cohorts of the affected users, each time
+    cohort membership is modified
+    """
     def get_event_iter(user_id_iter, cohort_iter):
         return (
             {"cohort_id": cohort.id, "cohort_name": cohort.name, "user_id": user_id}
@@ -55,16 +157,18 @@ def _cohort_membership_changed(sender, **kwargs):
     if reverse:
         user_id_iter = [instance.id]
         if action == "pre_clear":
-            cohort_iter = instance.course_groups.filter(group_type=CourseUserGroup.COHORT)
+            cohort_iter = list(instance.course_groups.filter(group_type=CourseUserGroup.COHORT))
         else:
-            cohort_iter = CourseUserGroup.objects.filter(pk__in=pk_set, group_type=CourseUserGroup.COHORT)
+            cohort_iter = list(CourseUserGroup.objects.filter(pk__in=pk_set, group_type=CourseUserGroup.COHORT))
     else:
         cohort_iter = [instance] if instance.group_type == CourseUserGroup.COHORT else []
         if action == "pre_clear":
-            user_id_iter = (user.id for user in instance.users.all())
+            user_id_iter = [user.id for user in instance.users.all()]
         else:
             user_id_iter = pk_set
 
+    _invalidate_cached_cohorts(user_id_iter, [cohort.course_id for cohort in cohort_iter])
+
     for event in get_event_iter(user_id_iter, cohort_iter):
         tracker.emit(event_name, event)
 
@@ -203,7 +307,9 @@ def get_cohort(user, course_key):
 
     Returns:
         A CourseUserGroup object if the course is cohorted and the User has a
-        cohort, else None.
+        cohort, else None.  The cohort is cached for the rest of the request, and
+        for COHORT_MEMBERSHIP_CACHE_TIMEOUT seconds across requests, until the
+        User's cohorts change.
 
     Raises:
        ValueError if the CourseKey doesn't exist.
@@ -218,12 +324,18 @@ def get_cohort(user, course_key):
     if not course.is_cohorted:
         return None
 
+    cohort = _get_cached_cohort(user.id, course_key)
+    if cohort is not None:
+        return cohort
+
     try:
-        return CourseUserGroup.objects.get(
+        cohort = CourseUserGroup.objects.get(
             course_id=course_key,
             group_type=CourseUserGroup.COHORT,
             users__id=user.id,
         )
+        _set_cached_cohort(user.id, course_key, cohort)
+        return cohort
     except CourseUserGroup.DoesNotExist:
         # Didn't find the group.  We'll go on to create one if needed.
         pass
@@ -242,9 +354,35 @@ def get_cohort(user, course_key):
         name=group_name
     )
     user.course_groups.add(group)
+    _set_cached_cohort(user.id, course_key, group)
     return group
 
 
+def get_cohorts_for_users(course_key, user_ids=None):
+    """
+    Given a CourseKey, return the cohorts of many users in that course with one query.
+
+    Unlike get_cohort, this doesn't check whether the course is cohorted, and doesn't assign
+    users who have no cohort to one.
+
+    Arguments:
+        course_key: CourseKey
+        user_ids: ids of the users whose cohorts to return, or None for every user with a
+            cohort in the course
+
+    Returns:
+        A dict of CourseUserGroup objects by user id.  Users who don't have a cohort in the
+        course are left out.
+    """
+    memberships = CourseUserGroup.users.through.objects.filter(
+        courseusergroup__course_id=course_key,
+        courseusergroup__group_type=CourseUserGroup.COHORT,
+    ).select_related('courseusergroup')
+    if user_ids is not None:
+        memberships = memberships.filter(user_id__in=user_ids)
+    return dict((membership.user_id, membership.courseusergroup) for membership in memberships)
+
+
 def get_course_cohorts(course):
     """
     Get a list of all the cohorts in the given course. This will include auto cohorts,
@@ -1,5 +1,7 @@
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.signals import request_finished
 from django.http import Http404
 from django.test import TestCase
 from django.test.utils import override_settings
@@ -9,6 +11,7 @@ from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from course_groups import cohorts
 from course_groups.models import CourseUserGroup
 from course_groups.tests.helpers import topic_name_to_id, config_course_cohorts, CohortFactory
+from request_cache.middleware import RequestCache
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
 from xmodule.modulestore.django import modulestore, clear_existing_modulestores
@@ -125,6 +128,7 @@ class TestCohorts(TestCase):
         Make sure that course is reloaded every time--clear out the modulestore.
         """
         clear_existing_modulestores()
+        RequestCache().clear_request_cache()
         self.toy_course_key = SlashSeparatedCourseKey("edX", "toy", "2012_Fall")
 
     def test_is_course_cohorted(self):
@@ -296,6 +300,100 @@ class TestCohorts(TestCase):
             self.assertGreater(num_users, 1)
             self.assertLess(num_users, 50)
 
+    @override_settings(COHORT_MEMBERSHIP_CACHE_TIMEOUT=60)
+    def test_get_cohort_cached(self):
+        """
+        Make sure cohorts.get_cohort() caches users' cohorts across requests, until they change.
+        """
+        cache.clear()
+        course = modulestore().get_course(self.toy_course_key)
+        config_course_cohorts(course, discussions=[], cohorted=True)
+        user = UserFactory(username="test", email="a@b.com")
+        first_cohort = CohortFactory(course_id=course.id, name="FirstCohort")
+        second_cohort = CohortFactory(course_id=course.id, name="SecondCohort")
+        first_cohort.users.add(user)
+
+        self.assertEqual(cohorts.get_cohort(user, course.id), first_cohort)
+        with self.assertNumQueries(0):
+            self.assertEqual(cohorts.get_cohort(user, course.id), first_cohort)
+        RequestCache().clear_request_cache()
+        with self.assertNumQueries(0):
+            self.assertEqual(cohorts.get_cohort(user, course.id), first_cohort)
+
+        # Moving the user forgets their cached cohort, in this request and the next ones
+        cohorts.add_user_to_cohort(second_cohort, user.username)
+        self.assertEqual(cohorts.get_cohort(user, course.id), second_cohort)
+        RequestCache().clear_request_cache()
+        self.assertEqual(cohorts.get_cohort(user, course.id), second_cohort)
+
+        # So does deleting their cohort
+        second_cohort.delete()
+        RequestCache().clear_request_cache()
+        self.assertEqual(cohorts.get_cohort(user, course.id).name, cohorts.DEFAULT_COHORT_NAME)
+
+    @override_settings(COHORT_MEMBERSHIP_CACHE_TIMEOUT=60)
+    def test_cached_cohort_forgotten_after_commit(self):
+        """
+        Make sure a cohort cached again by another request before the change committed is
+        forgotten when the request making the change finishes.
+        """
+        cache.clear()
+        course = modulestore().get_course(self.toy_course_key)
+        config_course_cohorts(course, discussions=[], cohorted=True)
+        user = UserFactory(username="test", email="a@b.com")
+        first_cohort = CohortFactory(course_id=course.id, name="FirstCohort")
+        second_cohort = CohortFactory(course_id=course.id, name="SecondCohort")
+        first_cohort.users.add(user)
+
+        cohorts.add_user_to_cohort(second_cohort, user.username)
+        # Another request reads the membership before the change commits, and caches it
+        cache.set(cohorts._membership_cache_key(user.id, course.id), first_cohort)
+        request_finished.send(sender=self.__class__)
+        RequestCache().clear_request_cache()
+        self.assertEqual(cohorts.get_cohort(user, course.id), second_cohort)
+
+    def test_cached_cohort_forgotten_without_cache_timeout(self):
+        """
+        Make sure changing a user's cohort forgets the cohort cached by environments which
+        do cache it, even where COHORT_MEMBERSHIP_CACHE_TIMEOUT isn't set.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        user = UserFactory(username="test", email="a@b.com")
+        first_cohort = CohortFactory(course_id=course.id, name="FirstCohort")
+        second_cohort = CohortFactory(course_id=course.id, name="SecondCohort")
+        first_cohort.users.add(user)
+        key = cohorts._membership_cache_key(user.id, course.id)
+        cache.set(key, first_cohort)
+
+        cohorts.add_user_to_cohort(second_cohort, user.username)
+        self.assertIsNone(cache.get(key))
+
+    def test_get_cohorts_for_users(self):
+        """
+        Make sure cohorts.get_cohorts_for_users() finds the cohorts of many users with one query.
+        """
+        course = modulestore().get_course(self.toy_course_key)
+        cohort = CohortFactory(course_id=course.id, name="MyCohort")
+        other_cohort = CohortFactory(course_id=course.id, name="MyOtherCohort")
+        other_course_cohort = CohortFactory(course_id=SlashSeparatedCourseKey("a", "b", "c"), name="MyCohort")
+        cohorted_users = [UserFactory() for _ in range(3)]
+        other_user = UserFactory()
+        uncohorted_user = UserFactory()
+        cohort.users.add(*cohorted_users)
+        other_cohort.users.add(other_user)
+        other_course_cohort.users.add(uncohorted_user)
+
+        with self.assertNumQueries(1):
+            cohorts_by_user_id = cohorts.get_cohorts_for_users(
+                course.id, [user.id for user in cohorted_users + [uncohorted_user]]
+            )
+        self.assertEqual(cohorts_by_user_id, dict((user.id, cohort) for user in cohorted_users))
+
+        with self.assertNumQueries(1):
+            cohorts_by_user_id = cohorts.get_cohorts_for_users(course.id)
+        self.assertEqual(len(cohorts_by_user_id), 4)
+        self.assertEqual(cohorts_by_user_id[other_user.id], other_cohort)
+
     def test_get_course_cohorts_noop(self):
         """
         Tests get_course_cohorts returns an empty list when no cohorts exist.
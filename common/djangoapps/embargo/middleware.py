@@ -30,9 +30,10 @@ EMBARGO_SITE_REDIRECT_URL = 'https://www.edx.org/'
 # if EMBARGO_SITE_REDIRECT_URL is missing, a HttpResponseForbidden is returned.
 
 """
+from collections import OrderedDict
 from functools import partial
 import logging
-import pygeoip
+import threading
 from lazy import lazy
 
 from django.core.exceptions import MiddlewareNotUsed
@@ -45,9 +46,17 @@ from util.request import course_id_from_url
 
 from student.models import unique_id_for_user
 from embargo.models import EmbargoedCourse, EmbargoedState, IPFilter
+from geoinfo import geoip
 
 log = logging.getLogger(__name__)
 
+# Number of IP addresses whose verdict is kept in memory by each process
+IP_VERDICT_CACHE_SIZE = 10000
+
+# Maps (IP address, what the verdict depends on) to the verdict, least recently used first
+_ip_verdicts = OrderedDict()
+_ip_verdicts_lock = threading.Lock()
+
 
 class EmbargoMiddleware(object):
     """
@@ -122,30 +131,65 @@ class EmbargoMiddleware(object):
         Returns:
             A unicode message if the user is embargoed, otherwise `None`
 
+        """
+        ip_filter = IPFilter.current()
+        verdict_key = (
+            ip_addr,
+            ip_filter.whitelist,
+            ip_filter.blacklist,
+            tuple(self._embargoed_countries),
+            geoip.database_generation(),
+        )
+        with _ip_verdicts_lock:
+            verdict = _ip_verdicts.pop(verdict_key, None)
+            if verdict is not None:
+                _ip_verdicts[verdict_key] = verdict
+
+        if verdict is None:
+            verdict = self._ip_verdict(ip_addr, ip_filter)
+            with _ip_verdicts_lock:
+                _ip_verdicts[verdict_key] = verdict
+                while len(_ip_verdicts) > IP_VERDICT_CACHE_SIZE:
+                    _ip_verdicts.popitem(last=False)
+
+        reason, ip_country = verdict
+        if reason is None:
+            return None
+        return self.REASONS[reason].format(
+            ip_addr=ip_addr,
+            ip_country=ip_country,
+            from_course=self._from_course_msg(course_id, course_is_embargoed)
+        )
+
+    def _ip_verdict(self, ip_addr, ip_filter):
+        """
+        Check whether an IP address is embargoed.
+
+        Args:
+            ip_addr (str): The IP address the request originated from.
+            ip_filter (IPFilter): The current IP whitelist and blacklist.
+
+        Returns:
+            A tuple of the key of the reason in `REASONS` the IP address is
+            embargoed for, or None if it isn't, and the country of the IP
+            address, or None if it wasn't looked up.
+
         """
         # If blacklisted, immediately fail
-        if ip_addr in IPFilter.current().blacklist_ips:
-            return self.REASONS['ip_blacklist'].format(
-                ip_addr=ip_addr,
-                from_course=self._from_course_msg(course_id, course_is_embargoed)
-            )
+        if ip_addr in ip_filter.blacklist_ips:
+            return ('ip_blacklist', None)
 
         # If we're white-listed, then allow access
-        if ip_addr in IPFilter.current().whitelist_ips:
-            return None
+        if ip_addr in ip_filter.whitelist_ips:
+            return (None, None)
 
         # Retrieve the country code from the IP address
         # and check it against the list of embargoed countries
         ip_country = self._country_code_from_ip(ip_addr)
         if ip_country in self._embargoed_countries:
-            return self.REASONS['ip_country'].format(
-                ip_addr=ip_addr,
-                ip_country=ip_country,
-                from_course=self._from_course_msg(course_id, course_is_embargoed)
-            )
+            return ('ip_country', ip_country)
 
-        # If none of the other checks caught anything,
-        # implicitly return None to indicate that the user can access the course
+        return (None, ip_country)
 
     def _is_embargoed_by_profile_country(self, user, course_id="", course_is_embargoed=False):
         """
@@ -193,10 +237,7 @@ class EmbargoMiddleware(object):
             str: A 2-letter country code.
 
         """
-        if ip_addr.find(':') >= 0:
-            return pygeoip.GeoIP(settings.GEOIPV6_PATH).country_code_by_addr(ip_addr)
-        else:
-            return pygeoip.GeoIP(settings.GEOIP_PATH).country_code_by_addr(ip_addr)
+        return geoip.country_code_by_addr(ip_addr)
 
     @property
     def _embargo_redirect_response(self):
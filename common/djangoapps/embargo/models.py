@@ -11,6 +11,9 @@ file and check it in at the same time as your model changes. To do that,
 3. Add the migration file created in edx-platform/common/djangoapps/embargo/migrations/
 """
 
+from bisect import bisect_right
+from collections import defaultdict
+
 import ipaddr
 
 from django.db import models
@@ -89,11 +92,33 @@ class IPFilter(ConfigurationModel):
     class IPFilterList(object):
         """
         Represent a list of IP addresses with support of networks.
+
+        The networks are compiled into sorted, non-overlapping ranges of
+        addresses for each IP version, which are searched by bisection.
         """
 
         def __init__(self, ips):
             self.networks = [ipaddr.IPNetwork(ip) for ip in ips]
 
+            ranges = defaultdict(list)
+            for network in self.networks:
+                ranges[network.version].append((int(network.network), int(network.broadcast)))
+
+            # Maps each IP version to the sorted starts and ends of its ranges
+            self._starts = {}
+            self._ends = {}
+            for version, version_ranges in ranges.iteritems():
+                starts = []
+                ends = []
+                for start, end in sorted(version_ranges):
+                    if ends and start <= ends[-1] + 1:
+                        ends[-1] = max(ends[-1], end)
+                    else:
+                        starts.append(start)
+                        ends.append(end)
+                self._starts[version] = starts
+                self._ends[version] = ends
+
         def __iter__(self):
             for network in self.networks:
                 yield network
@@ -104,26 +129,47 @@ class IPFilter(ConfigurationModel):
             except ValueError:
                 return False
 
-            for network in self.networks:
-                if network.Contains(ip):
-                    return True
+            starts = self._starts.get(ip.version)
+            if not starts:
+                return False
 
-            return False
+            index = bisect_right(starts, int(ip)) - 1
+            return index >= 0 and int(ip) <= self._ends[ip.version][index]
 
     @property
     def whitelist_ips(self):
         """
         Return a list of valid IP addresses to whitelist
         """
-        if self.whitelist == '':
-            return []
-        return self.IPFilterList([addr.strip() for addr in self.whitelist.split(',')])  # pylint: disable=no-member
+        return self._ip_filter_list(self.whitelist)  # pylint: disable=no-member
 
     @property
     def blacklist_ips(self):
         """
         Return a list of valid IP addresses to blacklist
         """
-        if self.blacklist == '':
+        return self._ip_filter_list(self.blacklist)  # pylint: disable=no-member
+
+    @classmethod
+    def _ip_filter_list(cls, ips):
+        """
+        Return the IPFilterList of the comma-separated `ips`. Lists are compiled
+        once per process, and kept for as long as their text is in use.
+        """
+        if ips == '':
             return []
-        return self.IPFilterList([addr.strip() for addr in self.blacklist.split(',')])  # pylint: disable=no-member
+
+        filter_list = _compiled_ip_filter_lists.get(ips)
+        if filter_list is None:
+            filter_list = cls.IPFilterList([addr.strip() for addr in ips.split(',')])
+            if len(_compiled_ip_filter_lists) >= MAX_COMPILED_IP_FILTER_LISTS:
+                _compiled_ip_filter_lists.clear()
+            _compiled_ip_filter_lists[ips] = filter_list
+        return filter_list
+
+
+# Most IPFilterLists kept compiled; the current whitelist and blacklist are all that's needed
+MAX_COMPILED_IP_FILTER_LISTS = 8
+
+# Maps the text of IP filter lists to their compiled IPFilterList
+_compiled_ip_filter_lists = {}
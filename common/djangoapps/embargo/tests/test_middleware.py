@@ -21,6 +21,7 @@ from xmodule.modulestore.tests.django_utils import (
 
 # Explicitly import the cache from ConfigurationModel so we can reset it after each test
 from config_models.models import cache
+from embargo import middleware
 from embargo.models import EmbargoedCourse, EmbargoedState, IPFilter
 
 
@@ -58,6 +59,7 @@ class EmbargoMiddlewareTests(ModuleStoreTestCase):
 
         self.patcher = mock.patch.object(pygeoip.GeoIP, 'country_code_by_addr', self.mock_country_code_by_addr)
         self.patcher.start()
+        middleware._ip_verdicts.clear()  # pylint: disable=protected-access
 
     def tearDown(self):
         # Explicitly clear ConfigurationModel's cache so tests have a clear cache
@@ -165,6 +167,22 @@ class EmbargoMiddlewareTests(ModuleStoreTestCase):
         response = self.client.get(self.regular_page, HTTP_X_FORWARDED_FOR='5.0.0.0', REMOTE_ADDR='5.0.0.0')
         self.assertEqual(response.status_code, 200)
 
+    def test_ip_verdict_cached(self):
+        with mock.patch('embargo.middleware.geoip.country_code_by_addr', return_value='US') as mock_lookup:
+            for _ in range(2):
+                response = self.client.get(self.embargoed_page, HTTP_X_FORWARDED_FOR='3.0.0.0', REMOTE_ADDR='3.0.0.0')
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_lookup.call_count, 1)
+
+        # Blacklisting the IP address applies right away
+        IPFilter(
+            blacklist='3.0.0.0',
+            changed_by=self.user,
+            enabled=True
+        ).save()
+        response = self.client.get(self.embargoed_page, HTTP_X_FORWARDED_FOR='3.0.0.0', REMOTE_ADDR='3.0.0.0')
+        self.assertEqual(response.status_code, 302)
+
     def test_ip_network_exceptions(self):
         # Explicitly whitelist/blacklist some IP networks
         IPFilter(
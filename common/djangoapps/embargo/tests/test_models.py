@@ -95,3 +95,18 @@ class EmbargoModelsTest(TestCase):
         self.assertTrue('1.1.0.1' in cblacklist)
         self.assertTrue('1.1.1.0' in cblacklist)
         self.assertFalse('1.2.0.0' in cblacklist)
+
+    def test_ip_overlapping_networks(self):
+        whitelist = '1.0.0.0/16, 1.0.4.0/24, 1.1.0.0/24, 2001:250::/32'
+
+        IPFilter(whitelist=whitelist).save()
+
+        cwhitelist = IPFilter.current().whitelist_ips
+        self.assertTrue('1.0.255.255' in cwhitelist)
+        self.assertTrue('1.0.4.1' in cwhitelist)
+        self.assertTrue('1.1.0.255' in cwhitelist)
+        self.assertFalse('1.1.1.0' in cwhitelist)
+        self.assertFalse('0.255.255.255' in cwhitelist)
+        self.assertTrue('2001:250::1' in cwhitelist)
+        self.assertFalse('2001:251::' in cwhitelist)
+        self.assertFalse('not an ip' in cwhitelist)
@@ -0,0 +1,70 @@
+"""
+Country lookups by IP address, with GeoIP databases which are opened once per
+process, memory-mapped, and opened again when their file changes.
+"""
+
+import os
+import threading
+import time
+
+import pygeoip
+from django.conf import settings
+
+# Seconds between checks of whether a GeoIP database file has changed
+GEOIP_RELOAD_CHECK_INTERVAL = 60
+
+# Maps the path of each database opened to (reader, mtime of the file, time of the last check)
+_readers = {}
+_readers_lock = threading.Lock()
+
+# Incremented whenever a database is opened, so that callers caching lookups can tell
+_generation = [0]
+
+
+def get_reader(path):
+    """
+    Return the pygeoip.GeoIP reader for the database at `path`, opening it
+    if it hasn't been opened yet, or if its file has changed since.
+    """
+    now = time.time()
+    entry = _readers.get(path)
+    if entry is not None and now - entry[2] < GEOIP_RELOAD_CHECK_INTERVAL:
+        return entry[0]
+
+    with _readers_lock:
+        entry = _readers.get(path)
+        if entry is None or now - entry[2] >= GEOIP_RELOAD_CHECK_INTERVAL:
+            mtime = os.stat(path).st_mtime
+            if entry is None or entry[1] != mtime:
+                reader = pygeoip.GeoIP(path, pygeoip.MMAP_CACHE)
+                _generation[0] += 1
+            else:
+                reader = entry[0]
+            entry = (reader, mtime, now)
+            _readers[path] = entry
+    return entry[0]
+
+
+def database_generation():
+    """
+    Return a number which changes whenever a GeoIP database is opened again.
+    """
+    return _generation[0]
+
+
+def country_code_by_addr(ip_addr):
+    """
+    Return the country code associated with an IP address.
+    Handles both IPv4 and IPv6 addresses.
+
+    Args:
+        ip_addr (str): The IP address to look up.
+
+    Returns:
+        str: A 2-letter country code.
+
+    """
+    if ip_addr.find(':') >= 0:
+        return get_reader(settings.GEOIPV6_PATH).country_code_by_addr(ip_addr)
+    else:
+        return get_reader(settings.GEOIP_PATH).country_code_by_addr(ip_addr)
@@ -1,5 +1,8 @@
+import hashlib
 import logging
 import re
+import threading
+from collections import OrderedDict
 
 from staticfiles.storage import staticfiles_storage
 from staticfiles import finders
@@ -11,6 +14,13 @@ from xmodule.contentstore.content import StaticContent
 
 log = logging.getLogger(__name__)
 
+# How many rewritten texts replace_urls remembers, per process
+REPLACED_URLS_CACHE_SIZE = 500
+
+_url_regexes = {}
+_replaced_urls = OrderedDict()
+_replaced_urls_lock = threading.Lock()
+
 
 def _url_replace_regex(prefix):
     """
@@ -28,6 +38,26 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+def _compiled_url_regex(prefix):
+    """
+    The compiled _url_replace_regex(prefix), compiling it the first time it is needed
+    """
+    regex = _url_regexes.get(prefix)
+    if regex is None:
+        regex = _url_regexes[prefix] = re.compile(_url_replace_regex(prefix))
+    return regex
+
+
+def _static_prefix_regex(data_dir):
+    """
+    Match the prefix of static urls, unless they are already in data_dir
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -69,7 +99,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _compiled_url_regex('/jump_to_id/').sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -89,7 +119,7 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compiled_url_regex('/course/').sub(replace_course_url, text)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -108,14 +138,7 @@ def process_static_urls(text, replacement_function, data_dir=None):
         rest = match.group('rest')
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return _compiled_url_regex(_static_prefix_regex(data_dir)).sub(wrap_part_extraction, text)
 
 
 def make_static_urls_absolute(request, html):
@@ -147,6 +170,93 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
     course_id: The course identifier used to distinguish static content for this course in studio
     static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
     """
+    return process_static_urls(
+        text,
+        _static_url_replacer(data_directory, course_id, static_asset_path),
+        data_dir=static_asset_path or data_directory
+    )
+
+
+def replace_urls(text, data_directory=None, course_id=None, static_asset_path='',
+                 replace_course_urls=False, jump_to_id_base_url=None):
+    """
+    Does what replace_static_urls does, and also what replace_course_urls does if
+    replace_course_urls is True, and what replace_jump_to_id_urls does if
+    jump_to_id_base_url is given, in a single pass over text.
+
+    The result is remembered, so rendering the same content for the same course again
+    doesn't rewrite it again. (Except in DEBUG mode, where static files come and go.)
+    """
+    if not settings.DEBUG:
+        content = text.encode('utf-8') if isinstance(text, unicode) else text
+        cache_key = (
+            hashlib.md5(content).hexdigest(),
+            course_id,
+            # the course's urls change if it moves between modulestores
+            modulestore().get_modulestore_type(course_id) if course_id is not None else None,
+            data_directory,
+            static_asset_path,
+            replace_course_urls,
+            jump_to_id_base_url,
+        )
+        with _replaced_urls_lock:
+            replaced = _replaced_urls.pop(cache_key, None)
+            if replaced is not None:
+                # Move it to the end, as the most recently used
+                _replaced_urls[cache_key] = replaced
+                return replaced
+
+    replace_static_url = _static_url_replacer(data_directory, course_id, static_asset_path)
+    prefixes = [u'(?P<static>{})'.format(_static_prefix_regex(static_asset_path or data_directory))]
+    if replace_course_urls:
+        course_prefix = '/courses/' + course_id.to_deprecated_string() + '/'
+        prefixes.append(u'(?P<course>/course/)')
+    if jump_to_id_base_url is not None:
+        prefixes.append(u'(?P<jump_to_id>/jump_to_id/)')
+
+    def replace_url(match):
+        """
+        Replace a single matched url, depending on which prefix it matched
+        """
+        groups = match.groupdict()
+        quote = groups['quote']
+        rest = groups['rest']
+        if groups['static'] is not None:
+            return replace_static_url(match.group(0), groups['prefix'], quote, rest)
+        elif groups.get('course') is not None:
+            return "".join([quote, course_prefix, rest, quote])
+        else:
+            return "".join([quote, jump_to_id_base_url + rest, quote])
+
+    replaced = _compiled_url_regex(u'|'.join(prefixes)).sub(replace_url, text)
+
+    if not settings.DEBUG:
+        with _replaced_urls_lock:
+            _replaced_urls[cache_key] = replaced
+            while len(_replaced_urls) > REPLACED_URLS_CACHE_SIZE:
+                _replaced_urls.popitem(last=False)
+    return replaced
+
+
+def _static_url_replacer(data_directory, course_id, static_asset_path):
+    """
+    Return the function replace_static_urls uses to replace each static url it finds
+    """
+    # Whether to use studio style urls, which is only looked up if a url needs it
+    use_contentstore = []
+
+    def in_contentstore():
+        """
+        Whether the course's static content is in the contentstore (as opposed to the
+        data directory), in which case studio style urls are used
+        """
+        if not use_contentstore:
+            use_contentstore.append(
+                (not static_asset_path)
+                and course_id is not None
+                and modulestore().get_modulestore_type(course_id) != ModuleStoreEnum.Type.xml
+            )
+        return use_contentstore[0]
 
     def replace_static_url(original, prefix, quote, rest):
         """
@@ -161,9 +271,7 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
         if settings.DEBUG and finders.find(rest, True):
             return original
         # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) \
-                and course_id \
-                and modulestore().get_modulestore_type(course_id) != ModuleStoreEnum.Type.xml:
+        elif in_contentstore():
             # first look in the static file pipeline and see if we are trying to reference
             # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
 
@@ -197,4 +305,4 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
 
         return "".join([quote, url, quote])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    return replace_static_url
@@ -1,9 +1,12 @@
 import re
 
 from nose.tools import assert_equals, assert_true, assert_false  # pylint: disable=no-name-in-module
+import static_replace
 from static_replace import (
     replace_static_urls,
     replace_course_urls,
+    replace_jump_to_id_urls,
+    replace_urls,
     _url_replace_regex,
     process_static_urls,
     make_static_urls_absolute
@@ -161,3 +164,49 @@ def test_regex():
     for s in no:
         print 'Should not match: {0!r}'.format(s)
         assert_false(re.match(regex, s))
+
+
+@patch('static_replace.staticfiles_storage')
+@patch('static_replace.modulestore')
+def test_replace_urls(mock_modulestore, mock_storage):
+    """
+    Make sure replace_urls does what replace_static_urls, replace_course_urls and
+    replace_jump_to_id_urls do one after the other
+    """
+    static_replace._replaced_urls.clear()  # pylint: disable=protected-access
+    mock_storage.exists.return_value = False
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+    jump_to_id_base_url = '/courses/org/course/run/jump_to_id/'
+
+    text = '"/static/file.png" "/course/info" "/jump_to_id/abc" \'/static/foo.png?raw\''
+    expected = replace_jump_to_id_urls(
+        replace_course_urls(replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY),
+        COURSE_KEY,
+        jump_to_id_base_url
+    )
+    assert_equals(
+        expected,
+        replace_urls(text, DATA_DIRECTORY, COURSE_KEY, replace_course_urls=True, jump_to_id_base_url=jump_to_id_base_url)
+    )
+    assert_equals(
+        replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY),
+        replace_urls(text, DATA_DIRECTORY, COURSE_KEY)
+    )
+
+
+@patch('static_replace.staticfiles_storage')
+@patch('static_replace.modulestore')
+def test_replace_urls_memoized(mock_modulestore, mock_storage):
+    static_replace._replaced_urls.clear()  # pylint: disable=protected-access
+    mock_storage.exists.return_value = False
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+
+    first = replace_urls(STATIC_SOURCE, DATA_DIRECTORY, COURSE_KEY)
+    assert_equals(mock_storage.exists.call_count, 1)
+    assert_equals(first, replace_urls(STATIC_SOURCE, DATA_DIRECTORY, COURSE_KEY))
+    assert_equals(mock_storage.exists.call_count, 1)
+
+    # A different course gets its own urls
+    other_course_key = SlashSeparatedCourseKey('org', 'other', 'run')
+    replace_urls(STATIC_SOURCE, DATA_DIRECTORY, other_course_key)
+    assert_equals(mock_storage.exists.call_count, 2)
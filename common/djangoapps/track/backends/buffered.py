@@ -0,0 +1,226 @@
+"""
+Event tracker backend that queues events in memory and hands them to
+another backend in batches, from a background thread.
+
+The backend it wraps is configured the same way as the tracker's own
+backends, for example::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'track.backends.buffered.BufferedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {...},
+              },
+              'batch_size': 100,
+              'flush_interval': 1,
+              'max_queue_size': 10000,
+              'overflow': 'spill',
+              'spill_file': '/var/tmp/tracking-mongo.spill',
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import cPickle as pickle
+import logging
+import os
+import threading
+import time
+from Queue import Queue, Empty, Full
+
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend
+
+
+log = logging.getLogger(__name__)
+
+OVERFLOW_DROP = 'drop'
+OVERFLOW_BLOCK = 'block'
+OVERFLOW_SPILL = 'spill'
+OVERFLOW_POLICIES = (OVERFLOW_DROP, OVERFLOW_BLOCK, OVERFLOW_SPILL)
+
+
+class BufferedBackend(BaseBackend):
+    """
+    Event tracker backend that puts events on a bounded queue, which a
+    background thread empties into the wrapped backend's `send_batch`.
+
+    The thread sends a batch once it has `batch_size` events, or once
+    the oldest event has waited `flush_interval` seconds. When the
+    queue is full, `overflow` says what happens to a new event: it is
+    dropped, the caller blocks until there is room, or it is appended
+    to `spill_file` (suffixed with the process id), which the thread
+    sends on once it has caught up.
+
+    """
+
+    def __init__(self, backend, batch_size=100, flush_interval=1, max_queue_size=10000,
+                 overflow=OVERFLOW_DROP, spill_file=None, name=None, **kwargs):
+        """
+        :Parameters:
+
+          - `backend`: dict with the `ENGINE` and `OPTIONS` of the
+            backend the events are sent to
+          - `batch_size`: most events sent to the backend at once
+          - `flush_interval`: most seconds an event waits for its batch
+            to fill up
+          - `max_queue_size`: most events waiting to be sent
+          - `overflow`: one of 'drop', 'block' or 'spill'
+          - `spill_file`: path of the file events are spilled to
+          - `name`: tag for the metrics of this backend; defaults to
+            the class name of the wrapped backend
+
+        """
+        super(BufferedBackend, self).__init__(**kwargs)
+
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('Invalid overflow policy {0}'.format(overflow))
+        if overflow == OVERFLOW_SPILL and not spill_file:
+            raise ValueError('The spill overflow policy needs a spill_file')
+
+        # Imported here, since the tracker instantiates its backends when it is imported.
+        from track.tracker import _instantiate_backend_from_name  # pylint: disable=protected-access
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self.spill_file = spill_file
+        self.metric_tags = [u'backend:{0}'.format(name or self.backend.__class__.__name__)]
+
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._send_spilled_lock = threading.Lock()
+        self._pid = None
+        self.queue = None
+        self._thread = None
+
+        atexit.register(self.flush)
+
+    def send(self, event):
+        """Queue the event, to be sent with the next batch."""
+        queue = self._get_queue()
+        if self.overflow == OVERFLOW_BLOCK:
+            queue.put(event)
+            return
+        try:
+            queue.put_nowait(event)
+        except Full:
+            if self.overflow == OVERFLOW_SPILL:
+                self._spill(event)
+                dog_stats_api.increment('track.buffered.spilled', tags=self.metric_tags)
+            else:
+                dog_stats_api.increment('track.buffered.dropped', tags=self.metric_tags)
+
+    def send_batch(self, events):
+        for event in events:
+            self.send(event)
+
+    def flush(self):
+        """Send every queued and spilled event now, from the calling thread."""
+        if self.queue is None or self._pid != os.getpid():
+            return
+        while True:
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except Empty:
+                pass
+            if not batch:
+                break
+            self._send_batch(batch)
+        self._send_spilled()
+
+    def _get_queue(self):
+        """
+        Return the queue, starting the thread that empties it if it is
+        not running in this process yet (for instance, after a fork).
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self.queue = Queue(self.max_queue_size)
+                    self._thread = threading.Thread(target=self._run, name='track.buffered')
+                    self._thread.daemon = True
+                    self._thread.start()
+                    self._pid = os.getpid()
+        return self.queue
+
+    def _run(self):
+        """Send batches from the queue for as long as the process runs."""
+        queue = self.queue
+        while True:
+            try:
+                batch = [queue.get(timeout=self.flush_interval)]
+            except Empty:
+                self._send_spilled()
+                continue
+
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(queue.get(timeout=remaining))
+                except Empty:
+                    break
+
+            dog_stats_api.gauge('track.buffered.queue_depth', queue.qsize(), tags=self.metric_tags)
+            self._send_batch(batch)
+
+    def _send_batch(self, batch):
+        try:
+            with dog_stats_api.timer('track.buffered.send_batch', tags=self.metric_tags):
+                self.backend.send_batch(batch)
+        except Exception:  # pylint: disable=broad-except
+            # The thread must keep going, whatever the backend does.
+            log.exception('Error sending a batch of %d events to the event tracker backend', len(batch))
+        dog_stats_api.histogram('track.buffered.batch_size', len(batch), tags=self.metric_tags)
+
+    def _spill_path(self):
+        """Each process spills to its own file, so their events don't get interleaved."""
+        return u'{0}.{1}'.format(self.spill_file, os.getpid())
+
+    def _spill(self, event):
+        with self._spill_lock:
+            with open(self._spill_path(), 'ab') as spill_file:
+                pickle.dump(event, spill_file, pickle.HIGHEST_PROTOCOL)
+
+    def _send_spilled(self):
+        """Send the events spilled while the queue was full."""
+        if self.spill_file is None:
+            return
+        with self._send_spilled_lock:
+            self._send_spill_file()
+
+    def _send_spill_file(self):
+        spill_path = self._spill_path()
+        sending_file = spill_path + u'.sending'
+        with self._spill_lock:
+            if not os.path.exists(spill_path):
+                return
+            os.rename(spill_path, sending_file)
+
+        with open(sending_file, 'rb') as spilled:
+            batch = []
+            while True:
+                try:
+                    batch.append(pickle.load(spilled))
+                except EOFError:
+                    break
+                if len(batch) == self.batch_size:
+                    self._send_batch(batch)
+                    batch = []
+            if batch:
+                self._send_batch(batch)
+        os.remove(sending_file)
@@ -0,0 +1,71 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import time
+
+from mock import patch
+
+from django.test import TestCase
+
+from track.backends.buffered import BufferedBackend
+
+
+DUMMY_BACKEND = {'ENGINE': 'track.tests.test_tracker.DummyBackend'}
+
+
+class TestBufferedBackend(TestCase):
+    def test_batches_sent_from_thread(self):
+        backend = BufferedBackend(backend=DUMMY_BACKEND, batch_size=2, flush_interval=0.1)
+        with patch.object(backend.backend, 'send_batch', wraps=backend.backend.send_batch) as send_batch:
+            for i in xrange(3):
+                backend.send({'test': i})
+
+            deadline = time.time() + 5
+            while backend.backend.count < 3 and time.time() < deadline:
+                time.sleep(0.01)
+
+        self.assertEqual(backend.backend.count, 3)
+        sent = [event for call in send_batch.call_args_list for event in call[0][0]]
+        self.assertEqual(sent, [{'test': 0}, {'test': 1}, {'test': 2}])
+        self.assertTrue(all(len(call[0][0]) <= 2 for call in send_batch.call_args_list))
+
+    def test_invalid_overflow(self):
+        with self.assertRaises(ValueError):
+            BufferedBackend(backend=DUMMY_BACKEND, overflow='sometimes')
+        with self.assertRaises(ValueError):
+            BufferedBackend(backend=DUMMY_BACKEND, overflow='spill')
+
+
+@patch('track.backends.buffered.threading.Thread')
+class TestBufferedBackendOverflow(TestCase):
+    """
+    Tests of full queues, with the thread that empties the queue not started.
+    """
+    def setUp(self):
+        self.spill_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spill_dir)
+
+    @patch('track.backends.buffered.dog_stats_api')
+    def test_drop(self, mock_stats, _mock_thread):
+        backend = BufferedBackend(backend=DUMMY_BACKEND, max_queue_size=2)
+        for i in xrange(3):
+            backend.send({'test': i})
+        mock_stats.increment.assert_called_once_with('track.buffered.dropped', tags=['backend:DummyBackend'])
+
+        backend.flush()
+        self.assertEqual(backend.backend.count, 2)
+
+    def test_spill(self, _mock_thread):
+        spill_file = os.path.join(self.spill_dir, 'events.spill')
+        backend = BufferedBackend(
+            backend=DUMMY_BACKEND, batch_size=2, max_queue_size=1, overflow='spill', spill_file=spill_file
+        )
+        for i in xrange(5):
+            backend.send({'test': i})
+        self.assertEqual(os.listdir(self.spill_dir), ['events.spill.{0}'.format(os.getpid())])
+
+        backend.flush()
+        self.assertEqual(backend.backend.count, 5)
+        self.assertEqual(os.listdir(self.spill_dir), [])
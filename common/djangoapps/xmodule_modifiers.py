@@ -143,17 +143,24 @@ def replace_course_urls(course_id, block, view, frag, context):  # pylint: disab
     return wrap_fragment(frag, static_replace.replace_course_urls(frag.content, course_id))
 
 
-def replace_static_urls(data_dir, block, view, frag, context, course_id=None, static_asset_path=''):  # pylint: disable=unused-argument
+def replace_static_urls(data_dir, block, view, frag, context, course_id=None, static_asset_path='',  # pylint: disable=unused-argument
+                        replace_course_urls=False, jump_to_id_base_url=None):
     """
     Updates the supplied module with a new get_html function that wraps
     the old get_html function and substitutes urls of the form /static/...
     with urls that are /static/<prefix>/...
+
+    If replace_course_urls is True, it also does what the replace_course_urls wrapper
+    does, and if jump_to_id_base_url is given, what the replace_jump_to_id_urls wrapper
+    does, in the same pass over the content. See static_replace.replace_urls.
     """
-    return wrap_fragment(frag, static_replace.replace_static_urls(
+    return wrap_fragment(frag, static_replace.replace_urls(
         frag.content,
         data_dir,
         course_id,
-        static_asset_path=static_asset_path
+        static_asset_path=static_asset_path,
+        replace_course_urls=replace_course_urls,
+        jump_to_id_base_url=jump_to_id_base_url,
     ))
 
 
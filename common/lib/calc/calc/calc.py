@@ -1,12 +1,15 @@
 """
 Parser and evaluator for FormulaResponse and NumericalResponse
 
-Uses pyparsing to parse. Main function as of now is evaluator().
+Uses pyparsing to parse. Main function as of now is evaluator(); use
+compile_expression() to evaluate the same expression many times.
 """
 
 import math
 import operator
-import numbers
+import threading
+from collections import OrderedDict
+
 import numpy
 import scipy.constants
 import functions
@@ -73,6 +76,21 @@ SUFFIXES = {
 }
 
 
+# Number of parsed expressions kept by compile_expression()
+COMPILED_EXPRESSION_CACHE_SIZE = 1000
+
+# The functions which work elementwise on arrays, as evaluate_samples() needs
+VECTORIZED_FUNCTIONS = set(
+    function for function in DEFAULT_FUNCTIONS.values()
+    if isinstance(function, numpy.ufunc)
+) | set([
+    functions.sec, functions.csc, functions.cot,
+    functions.arcsec, functions.arccsc,
+    functions.sech, functions.csch, functions.coth,
+    functions.arcsech, functions.arccsch, functions.arccoth,
+])
+
+
 class UndefinedVariable(Exception):
     """
     Indicate when a student inputs a variable which was not expected.
@@ -115,6 +133,14 @@ def eval_number(parse_result):
     return super_float("".join(parse_result))
 
 
+def is_operand(token):
+    """
+    Whether token is a (previously calculated) number, or an array of them,
+    rather than an operator or a parenthesis.
+    """
+    return not isinstance(token, basestring)
+
+
 def eval_atom(parse_result):
     """
     Return the value wrapped by the atom.
@@ -122,7 +148,7 @@ def eval_atom(parse_result):
     In the case of parenthesis, ignore them.
     """
     # Find first number in the list
-    result = next(k for k in parse_result if isinstance(k, numbers.Number))
+    result = next(k for k in parse_result if is_operand(k))
     return result
 
 
@@ -136,7 +162,7 @@ def eval_power(parse_result):
     # `reduce` will go from left to right; reverse the list.
     parse_result = reversed(
         [k for k in parse_result
-         if isinstance(k, numbers.Number)]  # Ignore the '^' marks.
+         if is_operand(k)]  # Ignore the '^' marks.
     )
     # Having reversed it, raise `b` to the power of `a`.
     power = reduce(lambda a, b: b ** a, parse_result)
@@ -158,10 +184,27 @@ def eval_parallel(parse_result):
     if 0 in parse_result:
         return float('nan')
     reciprocals = [1. / e for e in parse_result
-                   if isinstance(e, numbers.Number)]
+                   if is_operand(e)]
     return 1. / sum(reciprocals)
 
 
+def eval_parallel_vectorized(parse_result):
+    """
+    Like `eval_parallel`, for inputs which may be arrays.
+
+    NaN is returned wherever there is a zero among the inputs.
+    """
+    operands = [k for k in parse_result if is_operand(k)]
+    if len(operands) == 1:
+        return operands[0]
+    has_zero = reduce(numpy.logical_or, [numpy.equal(k, 0) for k in operands])
+    # use 1 in place of the zeros for now, their results are replaced by NaN afterwards
+    reciprocals = [1. / numpy.where(numpy.equal(k, 0), 1., k) for k in operands]
+    result = numpy.where(has_zero, float('nan'), 1. / sum(reciprocals))
+    # unwrap the 0-d array numpy.where returns for numbers
+    return result[()] if result.ndim == 0 else result
+
+
 def eval_sum(parse_result):
     """
     Add the inputs, keeping in mind their sign.
@@ -173,12 +216,12 @@ def eval_sum(parse_result):
     total = 0.0
     current_op = operator.add
     for token in parse_result:
-        if token == '+':
+        if is_operand(token):
+            total = current_op(total, token)
+        elif token == '+':
             current_op = operator.add
         elif token == '-':
             current_op = operator.sub
-        else:
-            total = current_op(total, token)
     return total
 
 
@@ -191,12 +234,12 @@ def eval_product(parse_result):
     prod = 1.0
     current_op = operator.mul
     for token in parse_result:
-        if token == '*':
+        if is_operand(token):
+            prod = current_op(prod, token)
+        elif token == '*':
             current_op = operator.mul
         elif token == '/':
             current_op = operator.truediv
-        else:
-            prod = current_op(prod, token)
     return prod
 
 
@@ -228,34 +271,132 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     if math_expr.strip() == "":
         return float('nan')
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
+_compiled_expressions = OrderedDict()
+_compiled_expressions_lock = threading.Lock()
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
-
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
-
-    return math_interpreter.reduce_tree(evaluate_actions)
+
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Return a CompiledExpression for `math_expr`.
+
+    The most recently used expressions are kept, so that evaluating the same
+    answer again doesn't parse it again.
+    """
+    key = (math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        compiled = _compiled_expressions.pop(key, None)
+        if compiled is not None:
+            _compiled_expressions[key] = compiled
+            return compiled
+
+    # Parse outside of the lock, it is the slow part.
+    compiled = CompiledExpression(math_expr, case_sensitive)
+    with _compiled_expressions_lock:
+        _compiled_expressions[key] = compiled
+        while len(_compiled_expressions) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
+    return compiled
+
+
+class CompiledExpression(object):
+    """
+    A math expression, parsed once to be evaluated with any number of sets of
+    variables.
+
+    Raises a `pyparsing.ParseException` if the expression can't be parsed.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        if math_expr.strip() == "":
+            self.math_interpreter = None
+        else:
+            self.math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+            self.math_interpreter.parse_algebra()
+
+    def _evaluate_actions(self, all_variables, all_functions, vectorized=False):
+        """
+        Return the actions for `ParseAugmenter.reduce_tree` which evaluate the
+        tree with the given variables and functions.
+        """
+        # Create a recursion to evaluate the tree.
+        if self.case_sensitive:
+            casify = lambda x: x
+        else:
+            casify = lambda x: x.lower()  # Lowercase for case insens.
+
+        return {
+            'number': eval_number,
+            'variable': lambda x: all_variables[casify(x[0])],
+            'function': lambda x: all_functions[casify(x[0])](x[1]),
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel_vectorized if vectorized else eval_parallel,
+            'product': eval_product,
+            'sum': eval_sum
+        }
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression, as `evaluator` does.
+        """
+        if self.math_interpreter is None:
+            return float('nan')
+
+        # Get our variables together.
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+
+        # ...and check them
+        self.math_interpreter.check_variables(all_variables, all_functions)
+
+        return self.math_interpreter.reduce_tree(self._evaluate_actions(all_variables, all_functions))
+
+    def evaluate_samples(self, samples, functions):
+        """
+        Evaluate the expression for each dictionary of variables in `samples`,
+        and return the list of results.
+
+        When every function used works on arrays, all the samples are evaluated
+        at once, with each variable holding the array of its values. Anything
+        that goes wrong that way (a floating point error, or anything else)
+        means evaluating the samples one at a time instead, so the results,
+        and the exceptions raised, are those `evaluate` gives.
+        """
+        if not samples:
+            return []
+        if self.math_interpreter is None:
+            return [float('nan')] * len(samples)
+
+        names = set(samples[0])
+        vectorize = all(set(sample) == names for sample in samples)
+        if vectorize:
+            arrays = {name: numpy.array([sample[name] for sample in samples]) for name in names}
+            all_variables, all_functions = add_defaults(arrays, functions, self.case_sensitive)
+            self.math_interpreter.check_variables(all_variables, all_functions)
+            casify = (lambda x: x) if self.case_sensitive else (lambda x: x.lower())
+            vectorize = all(
+                all_functions[casify(function)] in VECTORIZED_FUNCTIONS
+                for function in self.math_interpreter.functions_used
+            )
+
+        if vectorize:
+            try:
+                with numpy.errstate(divide='raise', over='raise', invalid='raise'):
+                    results = self.math_interpreter.reduce_tree(
+                        self._evaluate_actions(all_variables, all_functions, vectorized=True)
+                    )
+            except Exception:  # pylint: disable=broad-except
+                pass
+            else:
+                if numpy.ndim(results) == 0:
+                    # none of the sampled variables are used
+                    return [results] * len(samples)
+                return list(results)
+
+        return [self.evaluate(sample, functions) for sample in samples]
 
 
 class ParseAugmenter(object):
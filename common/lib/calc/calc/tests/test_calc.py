@@ -559,3 +559,65 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression and the samples evaluation of
+    calc.CompiledExpression
+    """
+    def setUp(self):
+        super(CompiledExpressionTest, self).setUp()
+        self.samples = [{'x': value, 'y': 2 * value} for value in (-2.0, -0.5, 0.0, 1.5, 3.0)]
+
+    def assert_same_as_evaluator(self, math_expr, functions=None):
+        """
+        Evaluating the samples all at once should give what evaluating each of them does
+        """
+        functions = functions or {}
+        expected = [calc.evaluator(sample, functions, math_expr) for sample in self.samples]
+        results = calc.compile_expression(math_expr).evaluate_samples(self.samples, functions)
+        self.assertEqual(len(expected), len(results))
+        for result, expected_result in zip(results, expected):
+            if numpy.isnan(expected_result):
+                self.assertTrue(numpy.isnan(result))
+            else:
+                self.assertAlmostEqual(expected_result, result)
+
+    def test_cache(self):
+        self.assertIs(calc.compile_expression('x^2 + 1'), calc.compile_expression('x^2 + 1'))
+        self.assertIsNot(
+            calc.compile_expression('x^2 + 1'),
+            calc.compile_expression('x^2 + 1', case_sensitive=True)
+        )
+        with self.assertRaises(ParseException):
+            calc.compile_expression('1+.')
+
+    def test_cache_is_bounded(self):
+        first = calc.compile_expression('x + 1')
+        for index in range(calc.COMPILED_EXPRESSION_CACHE_SIZE):
+            calc.compile_expression('x + {}'.format(index + 2))
+        self.assertIsNot(first, calc.compile_expression('x + 1'))
+
+    def test_evaluate_samples(self):
+        self.assert_same_as_evaluator('3*x^2 - y/4 + sin(x)*e^y')
+        self.assert_same_as_evaluator('x + j*y')
+        self.assert_same_as_evaluator('x || y')
+        self.assert_same_as_evaluator('2 || 3')
+        self.assert_same_as_evaluator('sqrt(x)')
+        self.assert_same_as_evaluator('arccot(y)')
+        self.assert_same_as_evaluator('f(x) + 1', functions={'f': lambda x: x * 2})
+        self.assert_same_as_evaluator('5')
+        self.assertEqual([], calc.compile_expression('x').evaluate_samples([], {}))
+        self.assertTrue(all(numpy.isnan(calc.compile_expression(' ').evaluate_samples(self.samples, {}))))
+
+    def test_evaluate_samples_errors(self):
+        """
+        The samples should raise what evaluator raises for the first one which fails
+        """
+        with self.assertRaises(ZeroDivisionError):
+            calc.compile_expression('1/x').evaluate_samples(self.samples, {})
+        with self.assertRaisesRegexp(ValueError, 'factorial'):
+            calc.compile_expression('fact(x)').evaluate_samples(self.samples, {})
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'z'):
+            calc.compile_expression('x + z').evaluate_samples(self.samples, {})
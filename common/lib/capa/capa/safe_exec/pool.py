@@ -0,0 +1,302 @@
+"""
+A pool of warm sandboxed processes to run capa's safe_exec code in.
+
+Starting a jailed Python for every execution means paying for interpreter
+startup, and then for importing numpy and friends, each time. The workers of
+the pool are started once, with codejail's sandbox command, and import the
+sandbox packages up front. Each execution then runs in a child forked from a
+worker, with codejail's resource limits set on it.
+
+Workers are recycled after a number of executions, once their memory use
+goes over a ceiling, and whenever one of them misbehaves.
+"""
+
+import json
+import logging
+import os
+import os.path
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import Queue
+
+from codejail import jail_code
+from codejail.safe_exec import json_safe, SafeExecException
+from dogapi import dog_stats_api
+
+log = logging.getLogger(__name__)
+
+# The source of the worker process, copied into each worker's directory.
+WORKER_PY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pool_worker.py")
+WORKER_PY = open(WORKER_PY_FILE).read()
+
+# Extra seconds the pool waits for a worker beyond the REALTIME limit of the
+# execution, which the worker enforces itself.
+RESPONSE_GRACE_PERIOD = 5
+
+
+class WorkerError(Exception):
+    """
+    A worker didn't answer as it should have, and can't be used anymore.
+    """
+    pass
+
+
+class SandboxWorker(object):
+    """
+    One warm process, running executions one at a time.
+    """
+    def __init__(self, command, preload_modules):
+        self.home = tempfile.mkdtemp(prefix='codejail-pool-')
+        os.chmod(self.home, 0775)
+        with open(os.path.join(self.home, 'pool_worker.py'), 'w') as worker_file:
+            worker_file.write(WORKER_PY)
+        self.process = subprocess.Popen(
+            command + ['pool_worker.py'] + list(preload_modules),
+            cwd=self.home, env={}, close_fds=True,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        )
+        self.runs = 0
+        self.maxrss = 0
+
+    def execute(self, code, globals_dict, python_path, extra_files, limits):
+        """
+        Run code in a child of the worker. Returns the worker's response: a dict
+        with the exit status of the child, and its resulting globals or error output.
+        """
+        # Like codejail, give the code its own directory with the files it needs.
+        run_dir = tempfile.mkdtemp(prefix='codejail-')
+        try:
+            os.chmod(run_dir, 0775)
+            for path in python_path:
+                destination = os.path.join(run_dir, os.path.basename(path))
+                if os.path.isdir(path):
+                    shutil.copytree(path, destination)
+                else:
+                    shutil.copyfile(path, destination)
+            for filename, contents in extra_files:
+                with open(os.path.join(run_dir, filename), 'w') as extra_file:
+                    extra_file.write(contents)
+            tmp_dir = os.path.join(run_dir, 'tmp')
+            os.mkdir(tmp_dir)
+            os.chmod(tmp_dir, 0777)
+
+            request = {
+                'code': code,
+                'globals': globals_dict,
+                'python_path': [os.path.basename(path) for path in python_path],
+                'dir': run_dir,
+                'limits': limits,
+            }
+            self.runs += 1
+            self._send(json.dumps(request) + '\n')
+            realtime = limits.get('REALTIME')
+            response = self._receive(realtime + RESPONSE_GRACE_PERIOD if realtime else None)
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+        self.maxrss = response.get('maxrss', 0)
+        return response
+
+    def _send(self, data):
+        """
+        Write a request to the worker.
+        """
+        try:
+            self.process.stdin.write(data)
+            self.process.stdin.flush()
+        except (IOError, OSError) as error:
+            raise WorkerError(u"Could not send the request: {}".format(error))
+
+    def _receive(self, timeout):
+        """
+        Read the worker's response line, waiting at most timeout seconds for it.
+        """
+        deadline = time.time() + timeout if timeout else None
+        fd = self.process.stdout.fileno()
+        chunks = []
+        while not chunks or not chunks[-1].endswith('\n'):
+            wait = max(0, deadline - time.time()) if deadline else None
+            readable, __, __ = select.select([fd], [], [], wait)
+            if not readable:
+                raise WorkerError(u"Timed out waiting for the response")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise WorkerError(u"The worker exited")
+            chunks.append(chunk)
+        try:
+            return json.loads(''.join(chunks))
+        except ValueError:
+            raise WorkerError(u"Invalid response")
+
+    def close(self):
+        """
+        Stop the worker process and remove its directory.
+        """
+        try:
+            self.process.stdin.close()
+        except (IOError, OSError):
+            pass
+        if self.process.poll() is None:
+            try:
+                self.process.kill()
+            except OSError:
+                pass
+        self.process.wait()
+        shutil.rmtree(self.home, ignore_errors=True)
+
+
+class WorkerPool(object):
+    """
+    A bounded set of SandboxWorkers, started as they are needed.
+
+    `command` is the command line to start the sandboxed Python with, and
+    `preload_modules` what it should import right away. Workers are replaced
+    after `max_runs` executions, or once the code they run uses over
+    `max_memory` bytes at its peak.
+    """
+    def __init__(self, command, size, max_runs=100, max_memory=None, preload_modules=()):
+        self.command = command
+        self.size = size
+        self.max_runs = max_runs
+        self.max_memory = max_memory
+        self.preload_modules = preload_modules
+        self._idle = Queue.Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        """
+        Return an idle worker, starting one if the pool isn't full, and
+        waiting for one otherwise.
+        """
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except Queue.Empty:
+                pass
+            with self._lock:
+                start = self._started < self.size
+                if start:
+                    self._started += 1
+            if start:
+                try:
+                    return SandboxWorker(self.command, self.preload_modules)
+                except Exception:  # pylint: disable=broad-except
+                    with self._lock:
+                        self._started -= 1
+                    raise
+            try:
+                # check again now and then, in case a recycled worker left room for a new one
+                return self._idle.get(timeout=1)
+            except Queue.Empty:
+                pass
+
+    def _release(self, worker, broken=False):
+        """
+        Put the worker back in the pool, or replace it if it is due for recycling.
+        """
+        reason = None
+        if broken:
+            reason = 'error'
+        elif self.max_runs and worker.runs >= self.max_runs:
+            reason = 'max_runs'
+        elif self.max_memory and worker.maxrss > self.max_memory:
+            reason = 'max_memory'
+
+        if reason is None:
+            self._idle.put(worker)
+            return
+
+        dog_stats_api.increment('capa.safe_exec.pool.recycle', tags=['reason:{}'.format(reason)])
+        worker.close()
+        with self._lock:
+            self._started -= 1
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None, slug=None, limits=None):
+        """
+        Execute code in a worker, with the same arguments, effects on
+        globals_dict and exceptions as codejail's safe_exec.
+        """
+        limits = dict(jail_code.LIMITS if limits is None else limits)
+        request_globals = json_safe(globals_dict)
+
+        start = time.time()
+        worker = self._acquire()
+        dog_stats_api.histogram('capa.safe_exec.pool.queue_wait', time.time() - start)
+
+        start = time.time()
+        try:
+            response = worker.execute(code, request_globals, python_path or [], extra_files or [], limits)
+        except WorkerError as error:
+            log.warning(u"Sandbox worker failed running %s: %s", slug, error)
+            self._release(worker, broken=True)
+            raise SafeExecException(u"Couldn't execute jailed code: {}".format(error))
+        except Exception:  # pylint: disable=broad-except
+            self._release(worker, broken=True)
+            raise
+        dog_stats_api.histogram('capa.safe_exec.pool.exec_time', time.time() - start)
+
+        self._release(worker)
+        if response['status'] != 0:
+            stderr = response.get('stderr', '')
+            if response['status'] < 0:
+                stderr += u"Killed by signal {}".format(-response['status'])
+            raise SafeExecException(u"Couldn't execute jailed code: {}".format(stderr))
+        globals_dict.update(response['globals'])
+
+    def close(self):
+        """
+        Stop all the idle workers.
+        """
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except Queue.Empty:
+                break
+            worker.close()
+            with self._lock:
+                self._started -= 1
+
+
+# The pool settings, set by configure(), and the pool of this process.
+_config = {'size': 0}
+_pool = {'pid': None, 'pool': None}
+_pool_lock = threading.Lock()
+
+
+def configure(size, max_runs=100, max_memory=None):
+    """
+    Set up the pool: `size` workers at most per process (0 to not use a
+    pool), each used for at most `max_runs` executions and until its memory
+    use goes over `max_memory` bytes.
+    """
+    _config.update(size=size, max_runs=max_runs, max_memory=max_memory)
+
+
+def get_pool(preload_modules=()):
+    """
+    Return the WorkerPool of this process, or None if there shouldn't be
+    one: it isn't configured, or codejail isn't configured to run Python in
+    a sandbox.
+    """
+    if not _config['size'] or not jail_code.is_configured('python'):
+        return None
+
+    with _pool_lock:
+        # A pool inherited from a parent process is of no use to a forked one.
+        if _pool['pid'] != os.getpid():
+            python = jail_code.COMMANDS['python']
+            command = []
+            if python.get('user'):
+                command.extend(['sudo', '-u', python['user']])
+            command.extend(python['cmdline_start'])
+            _pool['pool'] = WorkerPool(
+                command, _config['size'], max_runs=_config['max_runs'], max_memory=_config['max_memory'],
+                preload_modules=preload_modules,
+            )
+            _pool['pid'] = os.getpid()
+        return _pool['pool']
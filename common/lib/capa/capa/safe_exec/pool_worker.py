@@ -0,0 +1,185 @@
+"""
+The long running process behind each worker of the safe_exec pool.
+
+This file isn't imported: pool.py copies its source into the worker's
+directory, where the sandboxed Python runs it like codejail runs jailed code.
+
+The process imports the sandbox packages once, then reads one JSON request
+per line from stdin. Each request is run in a child forked for it, so that
+nothing one execution does can be seen by the next one, with the resource
+limits of the request set on the child. The response, one JSON line on
+stdout, has the exit status and peak memory use of the child, and either the
+resulting globals or the error output.
+"""
+
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import sys
+import time
+import traceback
+
+# What the child outputs is limited to these types, as in codejail.
+OK_TYPES = (type(None), int, long, float, str, unicode, list, tuple, dict)
+BAD_KEYS = ("__builtins__",)
+
+PR_SET_DUMPABLE = 4
+
+
+def jsonable(value):
+    """
+    Whether value (and everything in it) can be returned to the pool.
+    """
+    if not isinstance(value, OK_TYPES):
+        return False
+    try:
+        json.dumps(value)
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return True
+
+
+def preload(module_names):
+    """
+    Import the modules the executed code is likely to use, so the children
+    don't have to.
+    """
+    for module_name in module_names:
+        try:
+            __import__(module_name)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+
+def protect_from_children():
+    """
+    The children run as the same user as this process: make it non-dumpable
+    so that they can't ptrace it or look into its /proc entries.
+    """
+    try:
+        import ctypes
+        ctypes.CDLL(None).prctl(PR_SET_DUMPABLE, 0, 0, 0, 0)
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+
+def set_limit(name, value):
+    """
+    Set both the soft and hard resource limit `name` to `value`, if it is set.
+    """
+    if value:
+        resource.setrlimit(name, (value, value))
+
+
+def run_child(request, result_fd):
+    """
+    Run the code of the request, and write the resulting globals to result_fd.
+    Never returns.
+    """
+    status = 0
+    try:
+        # the child can only talk to this process through result_fd, and must
+        # not write to the stderr it inherits from the LMS through this process
+        devnull = os.open(os.devnull, os.O_RDWR)
+        os.dup2(devnull, 0)
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+
+        os.chdir(request['dir'])
+        os.environ['TMPDIR'] = os.path.join(request['dir'], 'tmp')
+        limits = request['limits']
+        set_limit(resource.RLIMIT_CPU, limits.get('CPU'))
+        set_limit(resource.RLIMIT_AS, limits.get('VMEM'))
+        set_limit(resource.RLIMIT_FSIZE, limits.get('FSIZE'))
+        resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+
+        sys.path.extend(request['python_path'])
+        g_dict = request['globals']
+        try:
+            exec request['code'] in g_dict  # pylint: disable=exec-used
+        except BaseException:  # pylint: disable=broad-except
+            status = 1
+            output = {'stderr': traceback.format_exc()}
+        else:
+            output = {'globals': dict(
+                (key, value) for key, value in g_dict.iteritems() if key not in BAD_KEYS and jsonable(value)
+            )}
+
+        data = json.dumps(output)
+        while data:
+            written = os.write(result_fd, data)
+            data = data[written:]
+    except BaseException:  # pylint: disable=broad-except
+        status = 2
+    os._exit(status)  # pylint: disable=protected-access
+
+
+def wait_for_child(pid, result_fd, realtime):
+    """
+    Read what the child writes until it exits or runs out of time.
+    Returns its output, its exit status, negative if it was killed by a
+    signal, as subprocess has it, and its peak memory use in bytes.
+    """
+    deadline = time.time() + realtime if realtime else None
+    chunks = []
+    while True:
+        timeout = max(0, deadline - time.time()) if deadline else None
+        readable, __, __ = select.select([result_fd], [], [], timeout)
+        if not readable:
+            os.kill(pid, signal.SIGKILL)
+            break
+        chunk = os.read(result_fd, 65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    os.close(result_fd)
+
+    __, status, rusage = os.wait4(pid, 0)
+    # ru_maxrss is in kilobytes on Linux
+    maxrss = rusage.ru_maxrss * 1024
+    if os.WIFSIGNALED(status):
+        return '', -os.WTERMSIG(status), maxrss
+    return ''.join(chunks), os.WEXITSTATUS(status), maxrss
+
+
+def main():
+    """
+    Serve the requests of the pool until it closes our stdin.
+    """
+    preload(sys.argv[1:])
+    protect_from_children()
+
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        request = json.loads(line)
+
+        result_fd, child_result_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(result_fd)
+            run_child(request, child_result_fd)
+        os.close(child_result_fd)
+
+        output, status, maxrss = wait_for_child(pid, result_fd, request['limits'].get('REALTIME'))
+        shutil.rmtree(os.path.join(request['dir'], 'tmp'), ignore_errors=True)
+
+        try:
+            response = json.loads(output) if output else {}
+        except ValueError:
+            response = {}
+            status = status or 2
+        response['status'] = status
+        # what the executed code allocated is in the child, which starts as a
+        # copy of this process, so this covers the growth of both
+        response['maxrss'] = maxrss
+        sys.stdout.write(json.dumps(response) + '\n')
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
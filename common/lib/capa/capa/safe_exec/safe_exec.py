@@ -4,9 +4,13 @@ from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
 from . import lazymod
+from . import pool
 from dogapi import dog_stats_api
 
 import hashlib
+import logging
+
+log = logging.getLogger(__name__)
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -70,6 +74,23 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj))
 
 
+def pooled_exec_fn(worker_pool):
+    """
+    Return a function to run code in `worker_pool`, which falls back to a
+    jailed process of its own if the pool can't start a worker.
+    """
+    def exec_fn(code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Run code as codejail's safe_exec would.
+        """
+        try:
+            worker_pool.safe_exec(code, globals_dict, python_path=python_path, extra_files=extra_files, slug=slug)
+        except (OSError, IOError):
+            log.exception(u"Could not use the sandbox pool to run %s", slug)
+            codejail_safe_exec(code, globals_dict, python_path=python_path, extra_files=extra_files, slug=slug)
+    return exec_fn
+
+
 @dog_stats_api.timed('capa.safe_exec.time')
 def safe_exec(
     code,
@@ -132,6 +153,9 @@ def safe_exec(
         exec_fn = codejail_not_safe_exec
     else:
         exec_fn = codejail_safe_exec
+        worker_pool = pool.get_pool(preload_modules=[modname for __, modname in ASSUMED_IMPORTS])
+        if worker_pool is not None:
+            exec_fn = pooled_exec_fn(worker_pool)
 
     # Run the code!  Results are side effects in globals_dict.
     try:
@@ -0,0 +1,83 @@
+"""Test pool.py"""
+
+import sys
+import unittest
+
+from codejail.safe_exec import SafeExecException
+
+from capa.safe_exec import pool
+
+
+class TestWorkerPool(unittest.TestCase):
+    """
+    Run the pool's workers with this Python, without a sandbox, to test how
+    the pool manages them.
+    """
+    def make_pool(self, **kwargs):
+        """Return a WorkerPool that is closed at the end of the test."""
+        worker_pool = pool.WorkerPool([sys.executable], 1, **kwargs)
+        self.addCleanup(worker_pool.close)
+        return worker_pool
+
+    def test_set_values(self):
+        worker_pool = self.make_pool()
+        g = {'a': 17}
+        worker_pool.safe_exec("b = a + 1", g, limits={})
+        self.assertEqual(g, {'a': 17, 'b': 18})
+
+    def test_runs_are_isolated(self):
+        worker_pool = self.make_pool()
+        worker_pool.safe_exec("import math; math.leftover = 1", {}, limits={})
+        g = {}
+        worker_pool.safe_exec("import math; found = hasattr(math, 'leftover')", g, limits={})
+        self.assertFalse(g['found'])
+
+    def test_exception(self):
+        worker_pool = self.make_pool()
+        with self.assertRaises(SafeExecException) as cm:
+            worker_pool.safe_exec("1/0", {}, limits={})
+        self.assertIn("ZeroDivisionError", cm.exception.message)
+
+        # The worker is still good for the next execution.
+        g = {}
+        worker_pool.safe_exec("a = 1", g, limits={})
+        self.assertEqual(g['a'], 1)
+
+    def test_realtime_limit(self):
+        worker_pool = self.make_pool()
+        with self.assertRaisesRegexp(SafeExecException, "Killed by signal"):
+            worker_pool.safe_exec("while True: pass", {}, limits={'REALTIME': 1})
+
+    def test_recycle_after_max_runs(self):
+        worker_pool = self.make_pool(max_runs=2)
+        pids = []
+        for __ in range(4):
+            g = {}
+            worker_pool.safe_exec("import os; pid = os.getppid()", g, limits={})
+            pids.append(g['pid'])
+        self.assertEqual(pids[0], pids[1])
+        self.assertEqual(pids[2], pids[3])
+        self.assertNotEqual(pids[1], pids[2])
+
+    def test_recycle_over_max_memory(self):
+        worker_pool = self.make_pool(max_memory=100 * 1024 * 1024)
+        code = "import os; pid = os.getppid(); size = len('x' * allocate)"
+        pids = []
+        for allocate in (0, 0, 200 * 1024 * 1024, 0):
+            g = {'allocate': allocate}
+            worker_pool.safe_exec(code, g, limits={})
+            pids.append(g['pid'])
+        # Only the code that allocated more than max_memory gets its worker replaced
+        self.assertEqual(pids[0], pids[1])
+        self.assertEqual(pids[1], pids[2])
+        self.assertNotEqual(pids[2], pids[3])
+
+
+class TestGetPool(unittest.TestCase):
+    """Test when safe_exec gets a pool to use."""
+    def tearDown(self):
+        pool.configure(0)
+
+    def test_not_configured(self):
+        pool.configure(0)
+        self.assertIsNone(pool.get_pool())
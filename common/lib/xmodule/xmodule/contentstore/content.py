@@ -157,6 +157,12 @@ class StaticContent(object):
     def stream_data(self):
         yield self._data
 
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        yield self._data[first_byte:last_byte + 1]
+
     @staticmethod
     def serialize_asset_key_with_slash(asset_key):
         """
@@ -220,6 +226,14 @@ class ContentStore(object):
     def find(self, filename):
         raise NotImplementedError
 
+    def find_last_modified(self, locations):
+        '''
+        Returns a dict from each of the given asset locations which exist in the store to
+        when that asset was last uploaded (a datetime.datetime). Locations of assets which
+        don't exist are left out.
+        '''
+        raise NotImplementedError
+
     def get_all_content_for_course(self, course_key, start=0, maxresults=-1, sort=None):
         '''
         Returns a list of static assets for a course, followed by the total number of assets.
@@ -162,13 +162,63 @@ class MongoContentStore(ContentStore):
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
-            for attr, value in asset.iteritems():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
-                    policy.setdefault(asset['asset_key'].name, {})[attr] = value
+            self._add_asset_policy(policy, asset)
 
         with open(assets_policy_file, 'w') as f:
             json.dump(policy, f, sort_keys=True, indent=4)
 
+    def export_to_fs(self, location, export_fs):
+        """
+        Write the asset at location into the pyfilesystem export_fs, at the same path as export does.
+
+        The GridFS file is handed to export_fs.setcontents as a file object, so it is copied
+        over a chunk at a time instead of being read into memory.
+        """
+        content_id, __ = self.asset_db_key(location)
+        try:
+            fp = self.fs.get(content_id)
+        except NoFile:
+            raise NotFoundError(content_id)
+
+        with fp:
+            asset_path = fp.displayname
+            import_path = getattr(fp, 'import_path', None)
+            if import_path is not None:
+                asset_dir = os.path.dirname(import_path)
+                if asset_dir:
+                    export_fs.makedir(asset_dir, recursive=True, allow_recreate=True)
+                    asset_path = asset_dir + '/' + asset_path
+            export_fs.setcontents(asset_path, fp)
+
+    def export_all_for_course_to_fs(self, course_key, export_fs):
+        """
+        Export all of this course's assets into the static directory of export_fs, and all of the
+        assets' attributes to policies/assets.json in it. See export_all_for_course.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+            export_fs: the pyfilesystem FS for the exported course's directory
+        """
+        policy = {}
+        assets, __ = self.get_all_content_for_course(course_key)
+
+        static_fs = export_fs.makeopendir('static')
+        for asset in assets:
+            self.export_to_fs(asset['asset_key'], static_fs)
+            self._add_asset_policy(policy, asset)
+
+        export_fs.makedir('policies', allow_recreate=True)
+        export_fs.setcontents('policies/assets.json', json.dumps(policy, sort_keys=True, indent=4))
+
+    @staticmethod
+    def _add_asset_policy(policy, asset):
+        """
+        Add the exportable attributes of the asset to the assets policy dict
+        """
+        for attr, value in asset.iteritems():
+            if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                policy.setdefault(asset['asset_key'].name, {})[attr] = value
+
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
 
@@ -251,6 +301,37 @@ class MongoContentStore(ContentStore):
         """
         return self.get_attrs(location).get(attr, default)
 
+    def find_last_modified(self, locations):
+        """
+        See :meth:`.ContentStore.find_last_modified`
+
+        Looks all of the assets up with one query of the files collection, without reading their data.
+        """
+        content_ids = []
+        locations_by_id = {}
+        for location in locations:
+            content_id, __ = self.asset_db_key(location)
+            content_ids.append(content_id)
+            locations_by_id[self._hashable_id(content_id)] = location
+        if not content_ids:
+            return {}
+
+        last_modified = {}
+        for item in self.fs_files.find({'_id': {'$in': content_ids}}, fields=['uploadDate']):
+            location = locations_by_id.get(self._hashable_id(self.make_id_son(item)))
+            if location is not None:
+                last_modified[location] = item['uploadDate']
+        return last_modified
+
+    @staticmethod
+    def _hashable_id(content_id):
+        """
+        Return a hashable version of an asset's _id, which is either a string or a SON of its key fields
+        """
+        if isinstance(content_id, basestring):
+            return content_id
+        return tuple(content_id.items())
+
     def set_attrs(self, location, attr_dict):
         """
         Like set_attr but sets multiple key value pairs.
@@ -71,6 +71,13 @@ class HtmlModule(HtmlFields, XModule):
             return self.data.replace("%%USER_ID%%", self.system.anonymous_student_id)
         return self.data
 
+    @property
+    def has_user_independent_student_view(self):
+        """
+        The html is the same for everyone, unless it includes the user's id
+        """
+        return "%%USER_ID%%" not in self.data
+
 
 class HtmlDescriptor(HtmlFields, XmlDescriptor, EditingDescriptor):
     """
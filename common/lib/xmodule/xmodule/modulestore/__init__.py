@@ -21,7 +21,7 @@ from abc import ABCMeta, abstractmethod
 from contracts import contract, new_contract
 from xblock.plugin import default_select
 
-from .exceptions import InvalidLocationError, InsufficientSpecificationError
+from .exceptions import InvalidLocationError, InsufficientSpecificationError, ItemNotFoundError
 from xmodule.errortracker import make_error_tracker
 from xmodule.assetstore import AssetMetadata
 from opaque_keys.edx.keys import CourseKey, UsageKey, AssetKey
@@ -633,6 +633,14 @@ class ModuleStoreRead(ModuleStoreAssetInterface):
         '''
         pass
 
+    @abstractmethod
+    def get_ancestor_locations(self, location, **kwargs):
+        '''
+        Find the locations of all of the ancestors of this location, nearest first.
+        Needed for path_to_location().
+        '''
+        pass
+
     @abstractmethod
     def get_orphans(self, course_key, **kwargs):
         """
@@ -869,6 +877,22 @@ class ModuleStoreReadBase(BulkOperationsMixin, ModuleStoreRead):
         """
         return {}
 
+    def get_ancestor_locations(self, location, **kwargs):
+        """
+        Return the locations of the ancestors of location, starting with its parent and ending with
+        the root of its tree (normally the course). The list is empty if location has no parent.
+        kwargs are passed to get_parent_location.
+
+        Default impl--a get_parent_location call per ancestor. Stores which can look up the whole
+        chain at once override this.
+        """
+        ancestors = []
+        parent = self.get_parent_location(location, **kwargs)
+        while parent is not None:
+            ancestors.append(parent)
+            parent = self.get_parent_location(parent, **kwargs)
+        return ancestors
+
     def get_course(self, course_id, depth=0, **kwargs):
         """
         See ModuleStoreRead.get_course
@@ -881,6 +905,24 @@ class ModuleStoreReadBase(BulkOperationsMixin, ModuleStoreRead):
                 return course
         return None
 
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        Return a dict mapping each of the given course keys to its course descriptor. Courses
+        which aren't in this modulestore are left out.
+
+        Default impl--a get_course call per course. Stores which can find several courses in one
+        query override this.
+        """
+        courses = {}
+        for course_key in course_keys:
+            try:
+                course = self.get_course(course_key, depth=depth, **kwargs)
+            except ItemNotFoundError:
+                course = None
+            if course is not None:
+                courses[course_key] = course
+        return courses
+
     def has_course(self, course_id, ignore_case=False, **kwargs):
         """
         Returns the course_id of the course if it was found, else None
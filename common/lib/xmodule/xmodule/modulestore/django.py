@@ -11,6 +11,7 @@ from django.conf import settings
 if not settings.configured:
     settings.configure()
 from django.core.cache import get_cache, InvalidCacheBackendError
+import django.dispatch
 import django.utils
 
 import re
@@ -20,6 +21,7 @@ from xmodule.util.django import get_current_request_hostname
 import xmodule.modulestore  # pylint: disable=unused-import
 from xmodule.modulestore.mixed import MixedModuleStore
 from xmodule.modulestore.draft_and_published import BranchSettingMixin
+from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.contentstore.django import contentstore
 import xblock.reference.plugins
 
@@ -32,6 +34,10 @@ except ImportError:
 
 ASSET_IGNORE_REGEX = getattr(settings, "ASSET_IGNORE_REGEX", r"(^\._.*$)|(^\.DS_Store$)|(^.*~$)")
 
+# Sent with the key of a course whose course block was created, updated or published through
+# the modulestore, or with deleted=True, of a course which was deleted
+course_changed = django.dispatch.Signal(providing_args=['course_key', 'deleted'])
+
 
 def load_function(path):
     """
@@ -70,10 +76,18 @@ def create_modulestore_instance(engine, content_store, doc_store_config, options
 
     if issubclass(class_, MixedModuleStore):
         _options['create_modulestore_instance'] = create_modulestore_instance
+        _options['course_changed_func'] = _send_course_changed
 
     if issubclass(class_, BranchSettingMixin):
         _options['branch_setting_func'] = _get_modulestore_branch_setting
 
+    if issubclass(class_, SplitMongoModuleStore):
+        # structures and definitions are only shared across processes if a cache is set up for them
+        try:
+            _options['document_cache_subsystem'] = get_cache('course_structure_cache')
+        except InvalidCacheBackendError:
+            pass
+
     return class_(
         contentstore=content_store,
         metadata_inheritance_cache_subsystem=metadata_inheritance_cache,
@@ -148,6 +162,13 @@ class ModuleI18nService(object):
         return strftime_localized(*args, **kwargs)
 
 
+def _send_course_changed(course_key, deleted):
+    """
+    Send the course_changed signal for the course
+    """
+    course_changed.send(sender=MixedModuleStore, course_key=course_key, deleted=deleted)
+
+
 def _get_modulestore_branch_setting():
     """
     Returns the branch setting for the module store from the current Django request if configured,
@@ -6,6 +6,7 @@ In this way, courses can be served up both - say - XMLModuleStore or MongoModule
 """
 
 import logging
+from collections import defaultdict
 from contextlib import contextmanager
 import itertools
 import functools
@@ -96,16 +97,22 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
     """
     ModuleStore knows how to route requests to the right persistence ms
     """
-    def __init__(self, contentstore, mappings, stores, i18n_service=None, fs_service=None, create_modulestore_instance=None, **kwargs):
+    def __init__(self, contentstore, mappings, stores, i18n_service=None, fs_service=None, create_modulestore_instance=None,
+                 course_changed_func=None, **kwargs):
         """
         Initialize a MixedModuleStore. Here we look into our passed in kwargs which should be a
         collection of other modulestore configuration information
+
+        course_changed_func, if given, is called with the key of a course and whether it was deleted,
+        whenever the course is created, cloned or deleted, or its course block is updated or published.
         """
         super(MixedModuleStore, self).__init__(contentstore, **kwargs)
 
         if create_modulestore_instance is None:
             raise ValueError('MixedModuleStore constructor must be passed a create_modulestore_instance function')
 
+        self.course_changed_func = course_changed_func
+
         self.modulestores = []
         self.mappings = {}
 
@@ -156,6 +163,13 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             course_id = course_id.replace(branch=None)
         return course_id
 
+    def _course_changed(self, course_key, deleted=False):
+        """
+        Tell the course_changed_func, if there is one, that the course changed
+        """
+        if self.course_changed_func is not None:
+            self.course_changed_func(self._clean_course_id_for_mapping(course_key), deleted)
+
     def _get_modulestore_for_courseid(self, course_id=None):
         """
         For a given course_id, look in the mapping table and see if it has been pinned
@@ -290,6 +304,39 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         except ItemNotFoundError:
             return None
 
+    @strip_key
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        Returns a dict mapping each of the course_keys to its course module, leaving out any which
+        don't exist. Each store is asked for all of its courses at once.
+
+        :param course_keys: a list of CourseKeys
+        """
+        courses = {}
+        keys_by_store = defaultdict(list)
+        unmapped_keys = []
+        for course_key in course_keys:
+            assert(isinstance(course_key, CourseKey))
+            store = self.mappings.get(self._clean_course_id_for_mapping(course_key))
+            if store is None:
+                unmapped_keys.append(course_key)
+            else:
+                keys_by_store[store].append(course_key)
+
+        for store, store_keys in keys_by_store.iteritems():
+            courses.update(store.get_courses_by_keys(store_keys, depth=depth, **kwargs))
+
+        # look for the rest in the stores in order, as _get_modulestore_for_courseid does
+        for store in self.modulestores:
+            if not unmapped_keys:
+                break
+            found = store.get_courses_by_keys(unmapped_keys, depth=depth, **kwargs)
+            for course_key in found:
+                self.mappings[self._clean_course_id_for_mapping(course_key)] = store
+            courses.update(found)
+            unmapped_keys = [course_key for course_key in unmapped_keys if course_key not in found]
+        return courses
+
     @strip_key
     def has_course(self, course_id, ignore_case=False, **kwargs):
         """
@@ -312,7 +359,9 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         """
         assert(isinstance(course_key, CourseKey))
         store = self._get_modulestore_for_courseid(course_key)
-        return store.delete_course(course_key, user_id)
+        result = store.delete_course(course_key, user_id)
+        self._course_changed(course_key, deleted=True)
+        return result
 
     @contract(asset_metadata='AssetMetadata')
     def save_asset_metadata(self, asset_metadata, user_id):
@@ -448,6 +497,14 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         store = self._get_modulestore_for_courseid(location.course_key)
         return store.get_parent_location(location, **kwargs)
 
+    @strip_key
+    def get_ancestor_locations(self, location, **kwargs):
+        """
+        returns the ancestor locations for a given location, nearest first
+        """
+        store = self._get_modulestore_for_courseid(location.course_key)
+        return store.get_ancestor_locations(location, **kwargs)
+
     def get_modulestore_type(self, course_id):
         """
         Returns a type which identifies which modulestore is servicing the given course_id.
@@ -505,6 +562,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         # add new course to the mapping
         self.mappings[course_key] = store
 
+        self._course_changed(course_key)
         return course
 
     @strip_key
@@ -523,7 +581,9 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         # to have only course re-runs go to split. This code, however, uses the config'd priority
         dest_modulestore = self._get_modulestore_for_courseid(dest_course_id)
         if source_modulestore == dest_modulestore:
-            return source_modulestore.clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+            result = source_modulestore.clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+            self._course_changed(dest_course_id)
+            return result
 
         if dest_modulestore.get_modulestore_type() == ModuleStoreEnum.Type.split:
             split_migrator = SplitMigrator(dest_modulestore, source_modulestore)
@@ -532,6 +592,7 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             )
             # the super handles assets and any other necessities
             super(MixedModuleStore, self).clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+            self._course_changed(dest_course_id)
         else:
             raise NotImplementedError("No code for cloning from {} to {}".format(
                 source_modulestore, dest_modulestore
@@ -585,7 +646,10 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         Defer to the course's modulestore if it supports this method
         """
         store = self._verify_modulestore_support(course_key, 'import_xblock')
-        return store.import_xblock(user_id, course_key, block_type, block_id, fields, runtime)
+        result = store.import_xblock(user_id, course_key, block_type, block_id, fields, runtime)
+        if block_type == 'course':
+            self._course_changed(course_key)
+        return result
 
     @strip_key
     def update_item(self, xblock, user_id, allow_not_found=False, **kwargs):
@@ -594,7 +658,10 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         (content, children, and metadata) attribute the change to the given user.
         """
         store = self._verify_modulestore_support(xblock.location.course_key, 'update_item')
-        return store.update_item(xblock, user_id, allow_not_found, **kwargs)
+        result = store.update_item(xblock, user_id, allow_not_found, **kwargs)
+        if xblock.location.category == 'course':
+            self._course_changed(xblock.location.course_key)
+        return result
 
     @strip_key
     def delete_item(self, location, user_id, **kwargs):
@@ -696,7 +763,10 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         Returns the newly published item.
         """
         store = self._verify_modulestore_support(location.course_key, 'publish')
-        return store.publish(location, user_id, **kwargs)
+        result = store.publish(location, user_id, **kwargs)
+        if location.category == 'course':
+            self._course_changed(location.course_key)
+        return result
 
     @strip_key
     def unpublish(self, location, user_id, **kwargs):
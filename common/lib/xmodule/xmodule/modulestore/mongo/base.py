@@ -15,7 +15,6 @@ structure:
 import pymongo
 import sys
 import logging
-import copy
 import re
 from uuid import uuid4
 
@@ -579,23 +578,55 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             ('_id.course', course_id.course),
             ('_id.category', {'$in': BLOCK_TYPES_WITH_CHILDREN})
         ])
-        # we just want the Location, children, and inheritable metadata
-        record_filter = {'_id': 1, 'definition.children': 1}
-
-        # just get the inheritable metadata since that is all we need for the computation
-        # this minimizes both data pushed over the wire
-        for field_name in InheritanceMixin.fields:
-            record_filter['metadata.{0}'.format(field_name)] = 1
-
         # call out to the DB
-        resultset = self.collection.find(query, record_filter)
+        resultset = self.collection.find(query, self._inheritance_record_filter())
 
         # it's ok to keep these as deprecated strings b/c the overall cache is indexed by course_key and this
         # is a dictionary relative to that course
-        results_by_url = {}
+        results_by_url = self._inheritance_records_by_url(course_id, resultset)
         root = None
+        for location_url, result in results_by_url.iteritems():
+            if result['_id']['category'] == 'course':
+                root = location_url
+
+        # now traverse the tree and compute down the inherited metadata
+        metadata_to_inherit = {}
+
+        def _compute_inherited_metadata(url, inherited_metadata):
+            """
+            Helper method for computing inherited metadata for a specific location url
+            """
+            my_metadata = self._metadata_for_children(inherited_metadata, results_by_url[url])
 
-        # now go through the results and order them by the location url
+            # go through all the children and recurse, but only if we have
+            # in the result set. Remember results will not contain leaf nodes
+            for child in results_by_url[url].get('definition', {}).get('children', []):
+                metadata_to_inherit[child] = my_metadata
+                if child in results_by_url:
+                    _compute_inherited_metadata(child, my_metadata)
+
+        if root is not None:
+            _compute_inherited_metadata(root, {})
+
+        return metadata_to_inherit
+
+    @staticmethod
+    def _inheritance_record_filter():
+        """
+        Returns the fields to fetch for computing inheritance: the Location, children, and inheritable
+        metadata. This minimizes the data pushed over the wire.
+        """
+        record_filter = {'_id': 1, 'definition.children': 1}
+        for field_name in InheritanceMixin.fields:
+            record_filter['metadata.{0}'.format(field_name)] = 1
+        return record_filter
+
+    def _inheritance_records_by_url(self, course_id, resultset):
+        """
+        Index the container records in resultset by the url of their published location, combining
+        the children of the draft and published versions of an item.
+        """
+        results_by_url = {}
         for result in resultset:
             # manually pick it apart b/c the db has tag and we want as_published revision regardless
             location = as_published(Location._from_deprecated_son(result['_id'], course_id.run))
@@ -610,92 +641,259 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
                 results_by_url[location_url].setdefault('definition', {})['children'] = set(total_children)
             else:
                 results_by_url[location_url] = result
-            if location.category == 'course':
-                root = location_url
+        return results_by_url
 
-        # now traverse the tree and compute down the inherited metadata
-        metadata_to_inherit = {}
+    @staticmethod
+    def _metadata_for_children(inherited_metadata, result):
+        """
+        Returns the metadata the children of the container record in result inherit, given the metadata
+        the container inherits itself.
+
+        The returned dict is shared by all of the children, and with the container's own parent when the
+        container doesn't set any inheritable fields, so it must never be modified in place.
+        """
+        own_metadata = result.get('metadata')
+        if not own_metadata:
+            return inherited_metadata
+        my_metadata = dict(inherited_metadata)
+        my_metadata.update(own_metadata)
+        return my_metadata
+
+    def _update_metadata_inheritance_tree(self, course_id, tree, locations):
+        """
+        Recompute, in place, the parts of the inheritance tree below each of the given locations.
+
+        Only the containers whose inherited metadata actually changed are read from the db; a
+        subtree whose entries already match is left alone. Returns whether the tree changed.
+        """
+        changed = False
+        to_process = [location for location in locations if location.category in BLOCK_TYPES_WITH_CHILDREN]
+        while to_process:
+            query = {'_id': {'$in': [
+                as_version(location).to_deprecated_son()
+                for location in to_process
+                for as_version in (as_published, as_draft)
+            ]}}
+            results_by_url = self._inheritance_records_by_url(
+                course_id, self.collection.find(query, self._inheritance_record_filter())
+            )
 
-        def _compute_inherited_metadata(url):
-            """
-            Helper method for computing inherited metadata for a specific location url
-            """
-            my_metadata = results_by_url[url].get('metadata', {})
+            to_process = []
+            for location_url, result in results_by_url.iteritems():
+                my_metadata = self._metadata_for_children(tree.get(location_url, {}), result)
+                for child in result.get('definition', {}).get('children', []):
+                    if child in tree and tree[child] == my_metadata:
+                        continue
+                    tree[child] = my_metadata
+                    changed = True
+                    child_location = course_id.make_usage_key_from_deprecated_string(child)
+                    if child_location.category in BLOCK_TYPES_WITH_CHILDREN:
+                        to_process.append(child_location)
+        return changed
+
+    def _metadata_inheritance_generation(self, course_id):
+        """
+        Returns the generation of the course's inheritance tree in the caching subsystem, which is
+        bumped by every incremental update of the tree, and which every cached tree is stamped with.
+        A tree whose stamp doesn't match the current generation may be missing a concurrent update.
+
+        Returns None if the caching subsystem can't increment values atomically (e.g. in tests),
+        in which case the cached tree is dropped on updates rather than patched.
+        """
+        cache = self.metadata_inheritance_cache_subsystem
+        if cache is None or not hasattr(cache, 'incr'):
+            return None
+        generation_key = u'{}.generation'.format(course_id)
+        generation = cache.get(generation_key)
+        if generation is None:
+            # start from a random value, so that trees stamped before the generation was evicted
+            # don't match it by chance
+            cache.add(generation_key, uuid4().int % (2 ** 32))
+            generation = cache.get(generation_key)
+        return generation
+
+    def _find_cached_metadata_inheritance_tree(self, course_id, skip_request_cache=False):
+        """
+        Returns the inheritance tree for the course from the request cache or the caching subsystem
+        (e.g. memcached), or None if it isn't cached.
+        """
+        if not skip_request_cache and self.request_cache is not None and \
+                unicode(course_id) in self.request_cache.data.get('metadata_inheritance', {}):
+            return self.request_cache.data['metadata_inheritance'][unicode(course_id)]
+
+        if self.metadata_inheritance_cache_subsystem is not None:
+            cached = self.metadata_inheritance_cache_subsystem.get(unicode(course_id))
+            if isinstance(cached, tuple):
+                generation, tree = cached
+                if generation == self._metadata_inheritance_generation(course_id):
+                    # after a memcache hit, put it into the request_cache
+                    self._cache_metadata_inheritance_tree(course_id, tree, request_cache_only=True)
+                    return tree
 
-            # go through all the children and recurse, but only if we have
-            # in the result set. Remember results will not contain leaf nodes
-            for child in results_by_url[url].get('definition', {}).get('children', []):
-                if child in results_by_url:
-                    new_child_metadata = copy.deepcopy(my_metadata)
-                    new_child_metadata.update(results_by_url[child].get('metadata', {}))
-                    results_by_url[child]['metadata'] = new_child_metadata
-                    metadata_to_inherit[child] = new_child_metadata
-                    _compute_inherited_metadata(child)
-                else:
-                    # this is likely a leaf node, so let's record what metadata we need to inherit
-                    metadata_to_inherit[child] = my_metadata
+        return None
 
-        if root is not None:
-            _compute_inherited_metadata(root)
+    def _cache_metadata_inheritance_tree(self, course_id, tree, request_cache_only=False, generation=None):
+        """
+        Write the inheritance tree for the course to the caching subsystem (e.g. memcached), if
+        available, stamped with the given generation, and to the request_cache.
+        """
+        if self.metadata_inheritance_cache_subsystem is not None and not request_cache_only:
+            self.metadata_inheritance_cache_subsystem.set(unicode(course_id), (generation, tree))
 
-        return metadata_to_inherit
+        if self.request_cache is not None:
+            # we can't assume the 'metadatat_inheritance' part of the request cache dict has been
+            # defined
+            if 'metadata_inheritance' not in self.request_cache.data:
+                self.request_cache.data['metadata_inheritance'] = {}
+            self.request_cache.data['metadata_inheritance'][unicode(course_id)] = tree
 
     def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False):
         '''
         Compute the metadata inheritance for the course.
         '''
-        tree = {}
+        tree = None
 
         course_id = self.fill_in_run(course_id)
         if not force_refresh:
-            # see if we are first in the request cache (if present)
-            if self.request_cache is not None and unicode(course_id) in self.request_cache.data.get('metadata_inheritance', {}):
-                return self.request_cache.data['metadata_inheritance'][unicode(course_id)]
-
-            # then look in any caching subsystem (e.g. memcached)
-            if self.metadata_inheritance_cache_subsystem is not None:
-                tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id), {})
-            else:
+            tree = self._find_cached_metadata_inheritance_tree(course_id)
+            if tree is None and self.metadata_inheritance_cache_subsystem is None:
                 logging.warning(
                     'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
                     OK in localdev and testing environment. Not OK in production.'
                 )
 
-        if not tree:
-            # if not in subsystem, or we are on force refresh, then we have to compute
+        if tree is None:
+            # if not cached, or we are on force refresh, then we have to compute. The generation is
+            # read first, so that an update made while computing leaves the stamp out of date.
+            generation = self._metadata_inheritance_generation(course_id)
             tree = self._compute_metadata_inheritance_tree(course_id)
+            self._cache_metadata_inheritance_tree(course_id, tree, generation=generation)
 
-            # now write out computed tree to caching subsystem (e.g. memcached), if available
-            if self.metadata_inheritance_cache_subsystem is not None:
-                self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
+        return tree
 
-        # now populate a request_cache, if available. NOTE, we are outside of the
-        # scope of the above if: statement so that after a memcache hit, it'll get
-        # put into the request_cache
-        if self.request_cache is not None:
-            # we can't assume the 'metadatat_inheritance' part of the request cache dict has been
-            # defined
-            if 'metadata_inheritance' not in self.request_cache.data:
-                self.request_cache.data['metadata_inheritance'] = {}
-            self.request_cache.data['metadata_inheritance'][unicode(course_id)] = tree
+    def _patch_cached_metadata_inheritance_tree(self, course_id, updated, removed):
+        """
+        Patch the course's cached inheritance tree with the subtrees below the `updated` locations
+        recomputed, and the entries of the `removed` location urls dropped.
+
+        The tree is patched and written back only if no other update happened since it was cached,
+        which bumping its generation checks atomically. Returns the patched tree, or None if the
+        tree must be recomputed instead (it wasn't cached, or there was a concurrent update).
+        """
+        cache = self.metadata_inheritance_cache_subsystem
+        generation = self._metadata_inheritance_generation(course_id)
+        if generation is None:
+            # without atomic increments, concurrent updates can't be detected, so only patch the
+            # request's own copy, and have the next request recompute the tree
+            tree = self._find_cached_metadata_inheritance_tree(course_id)
+            if tree is not None and cache is not None:
+                cache.set(unicode(course_id), None)
+        else:
+            # patch the shared copy, not the request's which may be out of date
+            tree = self._find_cached_metadata_inheritance_tree(course_id, skip_request_cache=True)
+            if tree is not None:
+                try:
+                    new_generation = cache.incr(u'{}.generation'.format(course_id))
+                except ValueError:
+                    # the generation was evicted
+                    new_generation = None
+                if new_generation != generation + 1:
+                    return None
+                generation = new_generation
+        if tree is None:
+            return None
 
+        for location_url in removed or []:
+            tree.pop(location_url, None)
+        if updated:
+            self._update_metadata_inheritance_tree(course_id, tree, updated)
+        self._cache_metadata_inheritance_tree(
+            course_id, tree, request_cache_only=generation is None, generation=generation
+        )
         return tree
 
-    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None):
+    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None, updated=None, removed=None):
         """
         Refresh the cached metadata inheritance tree for the org/course combination
         for location
 
         If given a runtime, it replaces the cached_metadata in that runtime. NOTE: failure to provide
         a runtime may mean that some objects report old values for inherited data.
+
+        If the tree is already cached, callers which know what changed can have it patched rather
+        than recomputed: `updated` lists the locations whose subtrees must be recomputed, and
+        `removed` the location urls whose entries must be dropped.
         """
         course_id = course_id.for_branch(None)
         if not self._is_in_bulk_operation(course_id):
-            # below is done for side effects when runtime is None
-            cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+            cached_metadata = None
+            if updated or removed:
+                course_id = self.fill_in_run(course_id)
+                cached_metadata = self._patch_cached_metadata_inheritance_tree(course_id, updated, removed)
+
+            if cached_metadata is None:
+                # below is done for side effects when runtime is None
+                cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+
             if runtime:
                 runtime.cached_metadata = cached_metadata
 
+            # parents may have changed too
+            self._invalidate_parent_index(course_id)
+
+    def _compute_parent_index(self, course_id):
+        """
+        Map the url of every block in the course which has a published parent to the list of the urls
+        of its published parents (normally just one).
+        """
+        course_id = self.fill_in_run(course_id)
+        query = SON([
+            ('_id.tag', 'i4x'),
+            ('_id.org', course_id.org),
+            ('_id.course', course_id.course),
+            ('_id.category', {'$in': BLOCK_TYPES_WITH_CHILDREN}),
+            ('_id.revision', MongoRevisionKey.published),
+        ])
+        parent_index = {}
+        for result in self.collection.find(query, {'_id': 1, 'definition.children': 1}):
+            parent_url = unicode(Location._from_deprecated_son(result['_id'], course_id.run))
+            for child in result.get('definition', {}).get('children', []):
+                parent_index.setdefault(child, []).append(parent_url)
+        return parent_index
+
+    def _get_cached_parent_index(self, course_id):
+        """
+        Return the parent index for the course, from the same caches as the metadata inheritance tree,
+        computing it if it isn't cached.
+        """
+        course_id = self.fill_in_run(course_id)
+        cache_key = u'{}.parent_index'.format(course_id)
+        if self.request_cache is not None and cache_key in self.request_cache.data.get('parent_index', {}):
+            return self.request_cache.data['parent_index'][cache_key]
+
+        parent_index = None
+        if self.metadata_inheritance_cache_subsystem is not None:
+            parent_index = self.metadata_inheritance_cache_subsystem.get(cache_key)
+        if not parent_index:
+            parent_index = self._compute_parent_index(course_id)
+            if self.metadata_inheritance_cache_subsystem is not None:
+                self.metadata_inheritance_cache_subsystem.set(cache_key, parent_index)
+
+        if self.request_cache is not None:
+            self.request_cache.data.setdefault('parent_index', {})[cache_key] = parent_index
+        return parent_index
+
+    def _invalidate_parent_index(self, course_id):
+        """
+        Drop the cached parent index for the course, so the next lookup recomputes it.
+        """
+        course_id = self.fill_in_run(course_id)
+        cache_key = u'{}.parent_index'.format(course_id)
+        if self.request_cache is not None:
+            self.request_cache.data.get('parent_index', {}).pop(cache_key, None)
+        if self.metadata_inheritance_cache_subsystem is not None:
+            self.metadata_inheritance_cache_subsystem.set(cache_key, {})
+
     def _clean_item_data(self, item):
         """
         Renames the '_id' field in item to 'location'
@@ -865,6 +1063,30 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         except ItemNotFoundError:
             return None
 
+    @autoretry_read()
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        See ModuleStoreReadBase.get_courses_by_keys. Finds all of the courses with one query.
+        """
+        requested_keys = {}
+        for course_key in course_keys:
+            assert(isinstance(course_key, CourseKey))
+            full_key = self.fill_in_run(course_key)
+            if full_key.run is not None:
+                requested_keys[(full_key.org, full_key.course, full_key.run)] = (course_key, full_key)
+        if not requested_keys:
+            return {}
+
+        query = {'_id': {'$in': [
+            requested_key.make_usage_key('course', requested_key.run).to_deprecated_son()
+            for __, requested_key in requested_keys.itervalues()
+        ]}}
+        courses = {}
+        for item in self.collection.find(query):
+            course_key, full_key = requested_keys[(item['_id']['org'], item['_id']['course'], item['_id']['name'])]
+            courses[course_key] = self._load_items(full_key, [item], depth)[0]
+        return courses
+
     def has_course(self, course_key, ignore_case=False, **kwargs):
         """
         Returns the course_id of the course if it was found, else None
@@ -1250,8 +1472,10 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             # update the edit info of the instantiated xblock
             xblock._edit_info = payload['edit_info']
 
-            # recompute (and update) the metadata inheritance tree which is cached
-            self.refresh_cached_metadata_inheritance_tree(xblock.scope_ids.usage_id.course_key, xblock.runtime)
+            # update the metadata inheritance tree which is cached for the subtree below xblock
+            self.refresh_cached_metadata_inheritance_tree(
+                xblock.scope_ids.usage_id.course_key, xblock.runtime, updated=[as_published(xblock.scope_ids.usage_id)]
+            )
             # fire signal that we've written to DB
         except ItemNotFoundError:
             if not allow_not_found:
@@ -1401,6 +1625,59 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             return as_published(parent)
         return None
 
+    def get_ancestor_locations(self, location, revision=ModuleStoreEnum.RevisionOption.published_only, **kwargs):
+        '''
+        Find the locations of the ancestors of this location, nearest first, ending with the course (or
+        the root of the orphaned tree location is in).
+
+        PUBLISHED ancestors are looked up in the course's cached parent index, rather than with a query per
+        ancestor. That index isn't kept up to date within a bulk operation, so once the course has been
+        written to in one, when asked for DRAFT ancestors, or when there is nowhere to cache the index,
+        this falls back to get_parent_location.
+
+        Returns: version agnostic locations (revision always None) as per the rest of mongo.
+        '''
+        bulk_record = self._get_bulk_ops_record(location.course_key)
+        if (
+                revision != ModuleStoreEnum.RevisionOption.published_only or
+                (bulk_record.active and bulk_record.dirty) or
+                (self.request_cache is None and self.metadata_inheritance_cache_subsystem is None)
+        ):
+            return super(MongoModuleStore, self).get_ancestor_locations(location, revision=revision, **kwargs)
+
+        parent_index = self._get_cached_parent_index(location.course_key)
+
+        def reaches_course(url):
+            """
+            Whether the chain of parents from url ends at the course
+            """
+            visited = set()
+            while url is not None and url not in visited:
+                visited.add(url)
+                if Location.from_deprecated_string(url).category == 'course':
+                    return True
+                url = next(iter(parent_index.get(url, [])), None)
+            return False
+
+        ancestors = []
+        url = unicode(as_published(location))
+        visited = {url}
+        while True:
+            parents = parent_index.get(url)
+            if not parents:
+                break
+            if len(parents) > 1:
+                # like get_parent_location, ignore orphaned parents
+                parents = [parent for parent in parents if reaches_course(parent)]
+                if not parents:
+                    break
+            url = parents[0]
+            if url in visited:
+                break
+            visited.add(url)
+            ancestors.append(location.course_key.make_usage_key_from_deprecated_string(url))
+        return ancestors
+
     def get_modulestore_type(self, course_key=None):
         """
         Returns an enumeration-like type reflecting the type of this modulestore per ModuleStoreEnum.Type
@@ -294,6 +294,22 @@ class DraftModuleStore(MongoModuleStore):
                 else ModuleStoreEnum.RevisionOption.draft_preferred
         return super(DraftModuleStore, self).get_parent_location(location, revision, **kwargs)
 
+    def get_ancestor_locations(self, location, revision=None, **kwargs):
+        '''
+        Returns the locations of the given location's ancestors in this course, nearest first.
+
+        Returns: version agnostic locations (revision always None) as per the rest of mongo.
+
+        Args:
+            revision: as for get_parent_location. Only PUBLISHED ancestors are looked up in the
+                course's cached parent index, DRAFT ones are looked up a parent at a time.
+        '''
+        if revision is None:
+            revision = ModuleStoreEnum.RevisionOption.published_only \
+                if self.get_branch_setting() == ModuleStoreEnum.Branch.published_only \
+                else ModuleStoreEnum.RevisionOption.draft_preferred
+        return super(DraftModuleStore, self).get_ancestor_locations(location, revision=revision, **kwargs)
+
     def create_xblock(self, runtime, course_key, block_type, block_id=None, fields=None, **kwargs):
         """
         Create the new xmodule but don't save it. Returns the new module with a draft locator if
@@ -546,12 +562,15 @@ class DraftModuleStore(MongoModuleStore):
         Internal method for deleting all of the subtree whose revisions match the as_functions
         """
         course_key = location.course_key
+        deleted_urls = set()
 
         def _delete_item(current_entry, to_be_deleted):
             """
             Depth first deletion of nodes
             """
             to_be_deleted.append(self._id_dict_to_son(current_entry['_id']))
+            deleted_loc = Location._from_deprecated_son(current_entry['_id'], course_key.run)
+            deleted_urls.add(unicode(as_published(deleted_loc)))
             next_tier = []
             for child_loc in current_entry.get('definition', {}).get('children', []):
                 child_loc = course_key.make_usage_key_from_deprecated_string(child_loc)
@@ -564,8 +583,15 @@ class DraftModuleStore(MongoModuleStore):
 
         first_tier = [as_func(location) for as_func in as_functions]
         self._breadth_first(_delete_item, first_tier)
-        # recompute (and update) the metadata inheritance tree which is cached
-        self.refresh_cached_metadata_inheritance_tree(location.course_key)
+        # drop the deleted items from the metadata inheritance tree which is cached, and recompute the
+        # subtree below whichever version of location remains (e.g. the published one after a revert)
+        query = location.to_deprecated_son(prefix='_id.')
+        del query['_id.revision']
+        if self.collection.find(query).count() > 0:
+            deleted_urls.discard(unicode(as_published(location)))
+        self.refresh_cached_metadata_inheritance_tree(
+            course_key, updated=[as_published(location)], removed=list(deleted_urls)
+        )
 
     def _breadth_first(self, function, root_usages):
         """
@@ -597,6 +623,9 @@ class DraftModuleStore(MongoModuleStore):
             bulk_record = self._get_bulk_ops_record(root_usages[0].course_key)
             bulk_record.dirty = True
             self.collection.remove({'_id': {'$in': to_be_deleted}}, safe=self.collection.safe)
+            if not bulk_record.active:
+                # published parents may be among the removed items
+                self._invalidate_parent_index(root_usages[0].course_key)
 
     @MongoModuleStore.memoize_request_cache
     def has_changes(self, xblock):
@@ -24,57 +24,20 @@ def path_to_location(modulestore, usage_key):
     of this location under that sequence.
     '''
 
-    def flatten(xs):
-        '''Convert lisp-style (a, (b, (c, ()))) list into a python list.
-        Not a general flatten function. '''
-        p = []
-        while xs != ():
-            p.append(xs[0])
-            xs = xs[1]
-        return p
-
-    def find_path_to_course():
-        '''Find a path up the location graph to a node with the
-        specified category.
-
-        If no path exists, return None.
-
-        If a path exists, return it as a list with target location first, and
-        the starting location last.
-        '''
-        # Standard DFS
-
-        # To keep track of where we came from, the work queue has
-        # tuples (location, path-so-far).  To avoid lots of
-        # copying, the path-so-far is stored as a lisp-style
-        # list--nested hd::tl tuples, and flattened at the end.
-        queue = [(usage_key, ())]
-        while len(queue) > 0:
-            (next_usage, path) = queue.pop()  # Takes from the end
-
-            # get_parent_location raises ItemNotFoundError if location isn't found
-            parent = modulestore.get_parent_location(next_usage)
-
-            # print 'Processing loc={0}, path={1}'.format(next_usage, path)
-            if next_usage.block_type == "course":
-                # Found it!
-                path = (next_usage, path)
-                return flatten(path)
-            elif parent is None:
-                # Orphaned item.
-                return None
-
-            # otherwise, add parent locations at the end
-            newpath = (next_usage, path)
-            queue.append((parent, newpath))
-
     with modulestore.bulk_operations(usage_key.course_key):
         if not modulestore.has_item(usage_key):
             raise ItemNotFoundError(usage_key)
 
-        path = find_path_to_course()
-        if path is None:
-            raise NoPathToItem(usage_key)
+        # the path runs from the course down to usage_key
+        path = [usage_key]
+        if usage_key.block_type != "course":
+            for ancestor in modulestore.get_ancestor_locations(usage_key):
+                path.insert(0, ancestor)
+                if ancestor.block_type == "course":
+                    break
+            else:
+                # Orphaned item.
+                raise NoPathToItem(usage_key)
 
         n = len(path)
         course_id = path[0].course_key
@@ -1,7 +1,11 @@
 """
 Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
 """
+import cPickle as pickle
 import re
+import threading
+import zlib
+from collections import OrderedDict
 from mongodb_proxy import autoretry_read, MongoProxy
 import pymongo
 import time
@@ -69,16 +73,128 @@ def structure_to_mongo(structure):
     return new_structure
 
 
+class VersionedDocumentCache(object):
+    """
+    A bounded, thread-safe LRU cache for documents which never change once written, such as
+    structures and definitions, which are keyed by their version guid.
+
+    Documents are kept pickled, which both measures them against max_size and ensures no caller
+    can modify the cached copy. If given a shared_cache (e.g. memcached), it is used as a second
+    tier behind the local one.
+    """
+    def __init__(self, max_size, shared_cache=None, prefix=''):
+        """
+        Arguments:
+            max_size (int): the total number of bytes of pickled documents to keep in memory;
+                0 keeps nothing locally
+            shared_cache: a cache with the django cache get/set interface, or None
+            prefix (str): prepended to keys in the shared cache, to keep stores apart
+        """
+        self.max_size = max_size
+        self.shared_cache = shared_cache
+        self.prefix = prefix
+        self.size = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind, key):
+        """
+        Return a copy of the cached document of the given kind ('structures' or 'definitions')
+        with id key, or None.
+        """
+        cache_key = (kind, unicode(key))
+        with self._lock:
+            value = self._entries.pop(cache_key, None)
+            if value is not None:
+                # reinsert as the most recently used
+                self._entries[cache_key] = value
+                self.hits += 1
+
+        if value is None and self.shared_cache is not None:
+            compressed = self.shared_cache.get(self._shared_key(cache_key))
+            if compressed is not None:
+                value = zlib.decompress(compressed)
+                with self._lock:
+                    self.shared_hits += 1
+                    self._store(cache_key, value)
+
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        return pickle.loads(value)
+
+    def set(self, kind, key, document):
+        """
+        Cache document, of the given kind, with id key.
+        """
+        cache_key = (kind, unicode(key))
+        value = pickle.dumps(document, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store(cache_key, value)
+        if self.shared_cache is not None:
+            self.shared_cache.set(self._shared_key(cache_key), zlib.compress(value))
+
+    def stats(self):
+        """
+        Return the counters and size of this cache, for monitoring.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'size': self.size,
+            }
+
+    def clear(self):
+        """
+        Empty the local tier of the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _store(self, cache_key, value):
+        """
+        Insert value in the local tier, evicting the least recently used entries as needed to keep
+        within max_size. Must be called with the lock held.
+        """
+        if len(value) > self.max_size:
+            return
+        previous = self._entries.pop(cache_key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[cache_key] = value
+        self.size += len(value)
+        while self.size > self.max_size:
+            __, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def _shared_key(self, cache_key):
+        """
+        Return the key for cache_key in the shared cache.
+        """
+        return u'{}.{}.{}'.format(self.prefix, *cache_key)
+
+
 class MongoConnection(object):
     """
     Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
     """
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
-        asset_collection=None, retry_wait_time=0.1, **kwargs
+        asset_collection=None, retry_wait_time=0.1, document_cache=None, **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
+
+        If given a VersionedDocumentCache as document_cache, structures and definitions are read
+        through it.
         """
         self.database = MongoProxy(
             pymongo.database.Database(
@@ -108,6 +224,8 @@ class MongoConnection(object):
         self.structures.write_concern = {'w': 1}
         self.definitions.write_concern = {'w': 1}
 
+        self.document_cache = document_cache
+
     def heartbeat(self):
         """
         Check that the db is reachable.
@@ -117,11 +235,42 @@ class MongoConnection(object):
         else:
             raise HeartbeatFailure("Can't connect to {}".format(self.database.name))
 
+    def _get_cached(self, kind, ids):
+        """
+        Return the cached documents of the given kind among ids, and the list of ids which aren't cached.
+        """
+        if self.document_cache is None:
+            return [], list(ids)
+        found = []
+        missing = []
+        for _id in ids:
+            document = self.document_cache.get(kind, _id)
+            if document is None:
+                missing.append(_id)
+            else:
+                found.append(document)
+        return found, missing
+
+    def _cache(self, kind, document):
+        """
+        Add document, of the given kind, to the document cache, if there is one.
+        """
+        if self.document_cache is not None:
+            self.document_cache.set(kind, document['_id'], document)
+
     def get_structure(self, key):
         """
         Get the structure from the persistence mechanism whose id is the given key
         """
-        return structure_from_mongo(self.structures.find_one({'_id': key}))
+        cached, __ = self._get_cached('structures', [key])
+        if cached:
+            return cached[0]
+        structure = self.structures.find_one({'_id': key})
+        if structure is None:
+            return None
+        structure = structure_from_mongo(structure)
+        self._cache('structures', structure)
+        return structure
 
     @autoretry_read()
     def find_structures_by_id(self, ids):
@@ -131,7 +280,13 @@ class MongoConnection(object):
         Arguments:
             ids (list): A list of structure ids
         """
-        return [structure_from_mongo(structure) for structure in self.structures.find({'_id': {'$in': ids}})]
+        structures, missing = self._get_cached('structures', ids)
+        if missing:
+            for structure in self.structures.find({'_id': {'$in': missing}}):
+                structure = structure_from_mongo(structure)
+                self._cache('structures', structure)
+                structures.append(structure)
+        return structures
 
     @autoretry_read()
     def find_structures_derived_from(self, ids):
@@ -173,6 +328,7 @@ class MongoConnection(object):
         Insert a new structure into the database.
         """
         self.structures.insert(structure_to_mongo(structure))
+        self._cache('structures', structure)
 
     def get_course_index(self, key, ignore_case=False):
         """
@@ -209,6 +365,17 @@ class MongoConnection(object):
 
         return self.course_index.find(query)
 
+    def find_course_indexes_by_keys(self, course_keys):
+        """
+        Find the course_indexes of all of the given course keys in one query
+        """
+        if not course_keys:
+            return []
+        return self.course_index.find({'$or': [
+            {key_attr: getattr(course_key, key_attr) for key_attr in ('org', 'course', 'run')}
+            for course_key in course_keys
+        ]})
+
     def insert_course_index(self, course_index):
         """
         Create the course_index in the db
@@ -252,19 +419,31 @@ class MongoConnection(object):
         """
         Get the definition from the persistence mechanism whose id is the given key
         """
-        return self.definitions.find_one({'_id': key})
+        cached, __ = self._get_cached('definitions', [key])
+        if cached:
+            return cached[0]
+        definition = self.definitions.find_one({'_id': key})
+        if definition is not None:
+            self._cache('definitions', definition)
+        return definition
 
     def get_definitions(self, definitions):
         """
         Retrieve all definitions listed in `definitions`.
         """
-        return self.definitions.find({'$in': {'_id': definitions}})
+        found, missing = self._get_cached('definitions', definitions)
+        if missing:
+            for definition in self.definitions.find({'_id': {'$in': missing}}):
+                self._cache('definitions', definition)
+                found.append(definition)
+        return found
 
     def insert_definition(self, definition):
         """
         Create the definition in the db
         """
         self.definitions.insert(definition)
+        self._cache('definitions', definition)
 
     def ensure_indexes(self):
         """
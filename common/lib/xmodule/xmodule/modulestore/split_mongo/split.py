@@ -76,7 +76,9 @@ from xmodule.modulestore import (
 
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    MongoConnection, DuplicateKeyError, VersionedDocumentCache
+)
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
@@ -263,6 +265,22 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         else:
             return self.db_connection.get_course_index(course_key, ignore_case)
 
+    def find_course_indexes_by_keys(self, course_keys):
+        """
+        Return the indexes of the given courses, taking those in a bulk operation from its record.
+        """
+        indexes = []
+        unbulked_keys = []
+        for course_key in course_keys:
+            if self._is_in_bulk_operation(course_key):
+                index = self._get_bulk_ops_record(course_key).index
+                if index is not None:
+                    indexes.append(index)
+            else:
+                unbulked_keys.append(course_key)
+        indexes.extend(self.db_connection.find_course_indexes_by_keys(unbulked_keys))
+        return indexes
+
     def insert_course_index(self, course_key, index_entry):
         bulk_write_record = self._get_bulk_ops_record(course_key)
         if bulk_write_record.active:
@@ -570,19 +588,31 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
     # It won't recompute the value on operations such as update_course_index (e.g., to revert to a prev
     # version) but those functions will have an optional arg for setting these.
     SEARCH_TARGET_DICT = ['wiki_slug']
+    # the number of course versions whose parent maps are kept by each thread
+    PARENT_MAP_CACHE_SIZE = 20
 
     def __init__(self, contentstore, doc_store_config, fs_root, render_template,
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None,
-                 services=None, **kwargs):
+                 services=None, document_cache_size=0, document_cache_subsystem=None, **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param document_cache_size: the number of bytes of structures and definitions to cache in this process.
+            Both are immutable once written, so the cache never needs invalidating.
+        :param document_cache_subsystem: a shared cache (e.g. memcached) to use behind the in-process one
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
 
-        self.db_connection = MongoConnection(**doc_store_config)
+        document_cache = None
+        if document_cache_size or document_cache_subsystem is not None:
+            document_cache = VersionedDocumentCache(
+                document_cache_size,
+                shared_cache=document_cache_subsystem,
+                prefix=u'{}.{}'.format(doc_store_config.get('db'), doc_store_config.get('collection')),
+            )
+        self.db_connection = MongoConnection(document_cache=document_cache, **doc_store_config)
         self.db = self.db_connection.database
 
         # Code review question: How should I expire entries?
@@ -625,6 +655,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         # drop the assets
         super(SplitMongoModuleStore, self)._drop_database()
 
+        if self.db_connection.document_cache is not None:
+            self.db_connection.document_cache.clear()
+
         connection = self.db.connection
         connection.drop_database(self.db.name)
         connection.close()
@@ -845,6 +878,41 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         result = self._load_items(course_entry, [root], depth, lazy=True, **kwargs)
         return result[0]
 
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        '''
+        See ModuleStoreReadBase.get_courses_by_keys. Finds all of the courses' indexes in one query,
+        and then all of their structures in another. Each course key must name its branch.
+        '''
+        requested_keys = {}
+        for course_key in course_keys:
+            # keys of the wrong type can't possibly be in this modulestore
+            if isinstance(course_key, CourseLocator) and not course_key.deprecated:
+                if course_key.branch is None:
+                    raise InsufficientSpecificationError(course_key)
+                requested_keys[(course_key.org, course_key.course, course_key.run)] = course_key
+        if not requested_keys:
+            return {}
+
+        # more than one course can use the same structure
+        keys_by_version = defaultdict(list)
+        for index in self.find_course_indexes_by_keys(requested_keys.values()):
+            course_key = requested_keys.get((index['org'], index['course'], index['run']))
+            if course_key is None or course_key.branch not in index['versions']:
+                continue
+            version_guid = index['versions'][course_key.branch]
+            if course_key.version_guid is not None and version_guid != course_key.version_guid:
+                continue
+            keys_by_version[version_guid].append(course_key)
+
+        courses = {}
+        for structure in self.find_structures_by_id(keys_by_version.keys()):
+            for course_key in keys_by_version[structure['_id']]:
+                course_entry = CourseEnvelope(course_key.replace(version_guid=structure['_id']), structure)
+                courses[course_key] = self._load_items(
+                    course_entry, [structure['root']], depth, lazy=True, **kwargs
+                )[0]
+        return courses
+
     def has_course(self, course_id, ignore_case=False, **kwargs):
         '''
         Does this course exist in this modulestore. This method does not verify that the branch &/or
@@ -987,7 +1055,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        parent_id = self._get_parent_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        parent_map = self._get_parent_map(locator.course_key, course.structure)
+        parent_id = parent_map.get(BlockKey.from_usage_key(locator))
         if parent_id is None:
             return None
         return BlockUsageLocator.make_relative(
@@ -996,6 +1065,66 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             block_id=parent_id.id,
         )
 
+    def get_ancestor_locations(self, locator, **kwargs):
+        '''
+        Return the locations (Locators w/ block_ids) of the ancestors of this location in this course,
+        nearest first, ending with the root of its tree (normally the course).
+
+        :param locator: BlockUsageLocator restricting search scope
+        '''
+        if not isinstance(locator, BlockUsageLocator) or locator.deprecated:
+            # The supplied locator is of the wrong type, so it can't possibly be stored in this modulestore.
+            raise ItemNotFoundError(locator)
+
+        course = self._lookup_course(locator.course_key)
+        parent_map = self._get_parent_map(locator.course_key, course.structure)
+        ancestors = []
+        block_key = BlockKey.from_usage_key(locator)
+        visited = {block_key}
+        while block_key in parent_map:
+            block_key = parent_map[block_key]
+            if block_key in visited:
+                break
+            visited.add(block_key)
+            ancestors.append(BlockUsageLocator.make_relative(
+                locator,
+                block_type=block_key.type,
+                block_id=block_key.id,
+            ))
+        return ancestors
+
+    def _get_parent_map(self, course_key, structure):
+        """
+        Return a map from each block in structure to its parent's BlockKey.
+
+        Structures saved to the db never change, so their maps are cached per version in this thread;
+        structures still being edited in a bulk operation are mapped afresh each time.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        cacheable = not (
+            bulk_write_record.active and
+            structure['_id'] in bulk_write_record.structures and
+            structure['_id'] not in bulk_write_record.structures_in_db
+        )
+        if cacheable:
+            if not hasattr(self.thread_cache, 'parent_maps'):
+                self.thread_cache.parent_maps = {}
+            parent_map = self.thread_cache.parent_maps.get(structure['_id'])
+            if parent_map is not None:
+                return parent_map
+
+        parent_map = {}
+        for block_key, block in structure['blocks'].iteritems():
+            for child in block['fields'].get('children', []):
+                # like _get_parent_from_structure, the first parent found wins
+                parent_map.setdefault(child, block_key)
+
+        if cacheable:
+            if len(self.thread_cache.parent_maps) >= self.PARENT_MAP_CACHE_SIZE:
+                self.thread_cache.parent_maps.clear()
+            self.thread_cache.parent_maps[structure['_id']] = parent_map
+        return parent_map
+
     def get_orphans(self, course_key, **kwargs):
         """
         Return an array of all of the orphans in the course.
@@ -57,6 +57,17 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         course_id = self._map_revision_to_branch(course_id)
         return super(DraftVersioningModuleStore, self).get_course(course_id, depth=depth, **kwargs)
 
+    def get_courses_by_keys(self, course_keys, depth=0, **kwargs):
+        """
+        See :py:meth: xmodule.modulestore.split_mongo.split.SplitMongoModuleStore.get_courses_by_keys
+        """
+        branch_keys = {}
+        for course_key in course_keys:
+            if isinstance(course_key, CourseLocator) and not course_key.deprecated:
+                branch_keys[self._map_revision_to_branch(course_key)] = course_key
+        courses = super(DraftVersioningModuleStore, self).get_courses_by_keys(branch_keys.keys(), depth=depth, **kwargs)
+        return {branch_keys[branch_key]: course for branch_key, course in courses.iteritems()}
+
     def clone_course(self, source_course_id, dest_course_id, user_id, fields=None, revision=None, **kwargs):
         """
         See :py:meth: xmodule.modulestore.split_mongo.split.SplitMongoModuleStore.clone_course
@@ -234,6 +245,17 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         location = self._map_revision_to_branch(location, revision=revision)
         return super(DraftVersioningModuleStore, self).get_parent_location(location, **kwargs)
 
+    def get_ancestor_locations(self, location, revision=None, **kwargs):
+        '''
+        Returns the given location's ancestor locations in this course, nearest first.
+        Args:
+            revision: as for get_parent_location
+        '''
+        if revision == ModuleStoreEnum.RevisionOption.draft_preferred:
+            revision = ModuleStoreEnum.RevisionOption.draft_only
+        location = self._map_revision_to_branch(location, revision=revision)
+        return super(DraftVersioningModuleStore, self).get_ancestor_locations(location, **kwargs)
+
     def get_orphans(self, course_key, **kwargs):
         course_key = self._map_revision_to_branch(course_key)
         return super(DraftVersioningModuleStore, self).get_orphans(course_key, **kwargs)
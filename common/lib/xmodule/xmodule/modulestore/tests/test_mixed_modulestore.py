@@ -837,6 +837,25 @@ class TestMixedModuleStore(CourseComparisonTest):
             published_courses = self.store.get_courses(remove_branch=True)
         self.assertEquals([c.id for c in draft_courses], [c.id for c in published_courses])
 
+    @ddt.data('draft', 'split')
+    def test_get_courses_by_keys(self, default_ms):
+        self.initdb(default_ms)
+        course_keys = [
+            self.course_locations[course_id].course_key
+            for course_id in (self.MONGO_COURSEID, self.XML_COURSEID1, self.XML_COURSEID2)
+        ]
+        missing_key = self.store.make_course_key('edX', 'missing', '2012_Fall')
+        courses = self.store.get_courses_by_keys(course_keys + [missing_key])
+
+        self.assertItemsEqual(course_keys, courses.keys())
+        for course_key in course_keys:
+            self.assertEqual(course_key, courses[course_key].id)
+            self.assertEqual(self.store.get_course(course_key).location, courses[course_key].location)
+
+        # a second call finds the courses through the mappings the first one made
+        courses = self.store.get_courses_by_keys(course_keys)
+        self.assertItemsEqual(course_keys, courses.keys())
+
     def test_xml_get_courses(self):
         """
         Test that the xml modulestore only loaded the courses from the maps.
@@ -908,6 +927,28 @@ class TestMixedModuleStore(CourseComparisonTest):
                 self.store.get_parent_location(child_location, revision=revision)
             )
 
+    @ddt.data('draft', 'split')
+    def test_get_ancestor_locations(self, default_ms):
+        """
+        Ancestors should be the chain of parents, nearest first, up to the course
+        """
+        self.initdb(default_ms)
+        self._create_block_hierarchy()
+        self.store.publish(self.course.location, self.user_id)
+
+        self.assertEqual(
+            [self.vertical_x1a, self.sequential_x1, self.chapter_x, self.course.location.version_agnostic()],
+            self.store.get_ancestor_locations(self.problem_x1a_2)
+        )
+        self.assertEqual([], self.store.get_ancestor_locations(self.course.location))
+
+        # the ancestors agree with get_parent_location
+        location = self.problem_y1a_1
+        for ancestor in self.store.get_ancestor_locations(location):
+            self.assertEqual(self.store.get_parent_location(location), ancestor)
+            location = ancestor
+        self.assertIsNone(self.store.get_parent_location(location))
+
     @ddt.data('draft', 'split')
     def test_get_parent_locations_moved_child(self, default_ms):
         self.initdb(default_ms)
@@ -981,20 +1022,15 @@ class TestMixedModuleStore(CourseComparisonTest):
     # Draft:
     #   Problem path:
     #    1. Get problem
-    #    2-3. count matches definition.children called 2x?
-    #    4. get parent via definition.children query
-    #    5-7. 2 counts and 1 get grandparent via definition.children
-    #    8-10. ditto for great-grandparent
-    #    11-13. ditto for next ancestor
-    #    14. fail count query looking for parent of course (unnecessary)
-    #    15. get course record direct query (not via definition.children) (already fetched in 13)
-    #    16. get items for inheritance computation
-    #    17. get vertical (parent of problem)
-    #    18. get items for inheritance computation (why? caching should handle)
-    #    19-20. get vertical_x1b (? why? this is the only ref in trace) & items for inheritance computation
-    #   Chapter path: get chapter, count parents 2x, get parents, count non-existent grandparents
+    #    2. get the course's parent index (all the published containers' children)
+    #    3. get course record direct query (for inheritance)
+    #    4. get items for inheritance computation
+    #    5. get vertical (parent of problem)
+    #    6. get items for inheritance computation (why? caching should handle)
+    #    7-8. get vertical_x1b (? why? this is the only ref in trace) & items for inheritance computation
+    #   Chapter path: get chapter (the parent index is cached)
     # Split: active_versions & structure
-    @ddt.data(('draft', [20, 5], 0), ('split', [2, 2], 0))
+    @ddt.data(('draft', [8, 1], 0), ('split', [2, 2], 0))
     @ddt.unpack
     def test_path_to_location(self, default_ms, num_finds, num_sends):
         """
@@ -1038,6 +1074,28 @@ class TestMixedModuleStore(CourseComparisonTest):
         with self.assertRaises(NoPathToItem):
             path_to_location(self.store, orphan)
 
+    @ddt.data('draft', 'split')
+    def test_path_to_draft_location(self, default_ms):
+        """
+        Make sure that path_to_location finds the path to draft-only items on the draft_preferred branch
+        """
+        self.initdb(default_ms)
+        self._create_block_hierarchy()
+        self.store.publish(self.course.location, self.user_id)
+
+        course_key = self.course_locations[self.MONGO_COURSEID].course_key
+        with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, course_key):
+            draft_vertical = self.store.create_child(
+                self.user_id, self.sequential_x1, 'vertical', block_id='draft_vertical'
+            )
+            draft_problem = self.store.create_child(
+                self.user_id, draft_vertical.location, 'problem', block_id='draft_problem'
+            )
+            self.assertEqual(
+                path_to_location(self.store, draft_problem.location),
+                (course_key, u"Chapter_x", u"Sequential_x1", '3')
+            )
+
     def test_xml_path_to_location(self):
         """
         Make sure that path_to_location works: should be passed a modulestore
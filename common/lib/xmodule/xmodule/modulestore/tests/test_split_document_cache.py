@@ -0,0 +1,86 @@
+"""
+Tests for the cache of structures and definitions used by the split modulestore.
+"""
+import unittest
+
+from bson.objectid import ObjectId
+
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import VersionedDocumentCache
+from xmodule.modulestore.tests.test_cross_modulestore_import_export import MemoryCache
+
+
+class TestVersionedDocumentCache(unittest.TestCase):
+    """
+    Tests of VersionedDocumentCache
+    """
+    def setUp(self):
+        super(TestVersionedDocumentCache, self).setUp()
+        self.structure = {
+            '_id': ObjectId(),
+            'root': BlockKey('course', 'course'),
+            'blocks': {BlockKey('course', 'course'): {'fields': {'children': []}}},
+        }
+
+    def test_returns_copies(self):
+        cache = VersionedDocumentCache(1024 * 1024)
+        cache.set('structures', self.structure['_id'], self.structure)
+
+        cached = cache.get('structures', self.structure['_id'])
+        self.assertEqual(self.structure, cached)
+        cached['blocks'].clear()
+        self.assertEqual(self.structure, cache.get('structures', self.structure['_id']))
+
+    def test_kinds_are_separate(self):
+        cache = VersionedDocumentCache(1024 * 1024)
+        cache.set('structures', self.structure['_id'], self.structure)
+        self.assertIsNone(cache.get('definitions', self.structure['_id']))
+
+    def test_counters(self):
+        cache = VersionedDocumentCache(1024 * 1024)
+        self.assertIsNone(cache.get('structures', self.structure['_id']))
+        cache.set('structures', self.structure['_id'], self.structure)
+        cache.get('structures', self.structure['_id'])
+        cache.get('structures', self.structure['_id'])
+
+        stats = cache.stats()
+        self.assertEqual(2, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+        self.assertEqual(1, stats['entries'])
+
+    def test_evicts_least_recently_used(self):
+        documents = [{'_id': ObjectId(), 'data': 'x' * 1000} for __ in range(3)]
+        cache = VersionedDocumentCache(2500)
+        cache.set('definitions', documents[0]['_id'], documents[0])
+        cache.set('definitions', documents[1]['_id'], documents[1])
+        # use the first so that the second is the least recently used one
+        cache.get('definitions', documents[0]['_id'])
+        cache.set('definitions', documents[2]['_id'], documents[2])
+
+        self.assertIsNotNone(cache.get('definitions', documents[0]['_id']))
+        self.assertIsNone(cache.get('definitions', documents[1]['_id']))
+        self.assertIsNotNone(cache.get('definitions', documents[2]['_id']))
+        self.assertLessEqual(cache.stats()['size'], 2500)
+
+    def test_oversized_documents_are_not_kept(self):
+        cache = VersionedDocumentCache(10)
+        cache.set('structures', self.structure['_id'], self.structure)
+        self.assertIsNone(cache.get('structures', self.structure['_id']))
+        self.assertEqual(0, cache.stats()['size'])
+
+    def test_shared_cache(self):
+        shared_cache = MemoryCache()
+        VersionedDocumentCache(0, shared_cache=shared_cache, prefix='db.modulestore').set(
+            'structures', self.structure['_id'], self.structure
+        )
+
+        # another process, with its own local tier
+        cache = VersionedDocumentCache(1024 * 1024, shared_cache=shared_cache, prefix='db.modulestore')
+        self.assertEqual(self.structure, cache.get('structures', self.structure['_id']))
+        self.assertEqual(self.structure, cache.get('structures', self.structure['_id']))
+        stats = cache.stats()
+        self.assertEqual(1, stats['shared_hits'])
+        self.assertEqual(1, stats['hits'])
+
+        other_store_cache = VersionedDocumentCache(1024 * 1024, shared_cache=shared_cache, prefix='db.other')
+        self.assertIsNone(other_store_cache.get('structures', self.structure['_id']))
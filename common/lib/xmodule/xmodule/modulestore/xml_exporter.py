@@ -10,12 +10,17 @@ from xmodule.exceptions import NotFoundError
 from xmodule.modulestore import EdxJSONEncoder, ModuleStoreEnum
 from xmodule.modulestore.inheritance import own_metadata
 from xmodule.modulestore.store_utilities import draft_node_constructor, get_draft_subtree_roots
+from fs.errors import DestinationExistsError, UnsupportedError
 from fs.osfs import OSFS
 from json import dumps
 import json
 import os
+import posixpath
 from path import path
 import shutil
+from StringIO import StringIO
+import tarfile
+import time
 from xmodule.modulestore.draft_and_published import DIRECT_ONLY_CATEGORIES
 from opaque_keys.edx.locator import CourseLocator
 
@@ -27,6 +32,116 @@ EXPORT_VERSION_KEY = "export_format"
 DEFAULT_CONTENT_FIELDS = ['metadata', 'data']
 
 
+class TarExportFS(object):
+    """
+    A write-only stand-in for a pyfilesystem FS which adds everything written to it to a tar
+    file under `root_path`, rather than to disk. It covers the part of the FS api which
+    exporting a course uses: `open` for writing, `setcontents`, `makedir`, `makeopendir` and `exists`.
+
+    A tar member needs its size up front, so a file opened for writing is kept in memory until it is
+    closed. `setcontents` with a file object which knows its `length` (as GridFS files do) copies
+    it into the tar a chunk at a time instead.
+    """
+    def __init__(self, tar_file, root_path, entries=None):
+        self.tar_file = tar_file
+        self.root_path = root_path.strip('/')
+        # the paths (relative to the tar's root) of the files and directories written so far,
+        # shared by every FS opened on the same tar file
+        self.entries = entries if entries is not None else set()
+
+    def _tar_path(self, path):
+        """
+        Return the path of `path` inside the tar file
+        """
+        return posixpath.normpath(posixpath.join(self.root_path, path.strip('/')))
+
+    def _add_directories(self, tar_path):
+        """
+        Add `tar_path` and every one of its parents which isn't in the tar yet as directories
+        """
+        missing = []
+        while tar_path and tar_path != '.' and tar_path not in self.entries:
+            missing.append(tar_path)
+            tar_path = posixpath.dirname(tar_path)
+        for dir_path in reversed(missing):
+            dir_info = tarfile.TarInfo(dir_path)
+            dir_info.type = tarfile.DIRTYPE
+            dir_info.mode = 0755
+            dir_info.mtime = time.time()
+            self.tar_file.addfile(dir_info)
+            self.entries.add(dir_path)
+
+    def _add_file(self, path, fileobj, size):
+        """
+        Add `size` bytes read from `fileobj` to the tar as the file `path`
+        """
+        tar_path = self._tar_path(path)
+        self._add_directories(posixpath.dirname(tar_path))
+        file_info = tarfile.TarInfo(tar_path)
+        file_info.size = size
+        file_info.mode = 0644
+        file_info.mtime = time.time()
+        self.tar_file.addfile(file_info, fileobj)
+        self.entries.add(tar_path)
+
+    def exists(self, path):
+        return self._tar_path(path) in self.entries
+
+    def makedir(self, path, recursive=False, allow_recreate=False):
+        tar_path = self._tar_path(path)
+        if tar_path in self.entries and not allow_recreate:
+            raise DestinationExistsError(path)
+        self._add_directories(tar_path)
+
+    def makeopendir(self, path, recursive=False):
+        self.makedir(path, recursive=recursive, allow_recreate=True)
+        return TarExportFS(self.tar_file, self._tar_path(path), self.entries)
+
+    def open(self, path, mode='r'):
+        if 'w' not in mode and 'a' not in mode:
+            raise UnsupportedError('read from a TarExportFS')
+        return _TarMemberFile(self, path)
+
+    def setcontents(self, path, data, chunk_size=None):
+        if hasattr(data, 'read'):
+            size = getattr(data, 'length', None)
+            if size is not None:
+                self._add_file(path, data, size)
+                return
+            data = data.read()
+        if isinstance(data, unicode):
+            data = data.encode('utf-8')
+        self._add_file(path, StringIO(data), len(data))
+
+
+class _TarMemberFile(object):
+    """
+    The file returned by `TarExportFS.open`, which is added to the tar when it is closed
+    """
+    def __init__(self, export_fs, path):
+        self.export_fs = export_fs
+        self.path = path
+        self._buffer = StringIO()
+        self.closed = False
+
+    def write(self, data):
+        self._buffer.write(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.export_fs.setcontents(self.path, self._buffer.getvalue())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 def export_to_xml(modulestore, contentstore, course_key, root_dir, course_dir):
     """
     Export all modules from `modulestore` and content from `contentstore` as xml to `root_dir`.
@@ -37,12 +152,32 @@ def export_to_xml(modulestore, contentstore, course_key, root_dir, course_dir):
     `root_dir`: The directory to write the exported xml to
     `course_dir`: The name of the directory inside `root_dir` to write the course content to
     """
+    fsm = OSFS(root_dir)
+    export_to_fs(modulestore, contentstore, course_key, fsm.makeopendir(course_dir))
+
+
+def export_to_tar(modulestore, contentstore, course_key, course_dir, fileobj):
+    """
+    Export the course as `export_to_xml` does, but as a gzipped tar written to `fileobj` as the
+    export goes, so no temporary directory is needed and `fileobj` only has to support `write`.
+
+    `course_dir`: The name of the directory inside the tar to write the course content to
+    `fileobj`: The file object to write the tar.gz to
+    """
+    with tarfile.open(fileobj=fileobj, mode='w|gz') as tar_file:
+        export_to_fs(modulestore, contentstore, course_key, TarExportFS(tar_file, course_dir))
+
+
+def export_to_fs(modulestore, contentstore, course_key, export_fs):
+    """
+    Export all modules from `modulestore` and content from `contentstore` as xml to the
+    pyfilesystem `export_fs`, which is the course's directory. See `export_to_xml`.
+    """
 
     with modulestore.bulk_operations(course_key):
 
         course = modulestore.get_course(course_key, depth=None)  # None means infinite
-        fsm = OSFS(root_dir)
-        export_fs = course.runtime.export_fs = fsm.makeopendir(course_dir)
+        course.runtime.export_fs = export_fs
 
         root = lxml.etree.Element('unknown')
 
@@ -60,11 +195,7 @@ def export_to_xml(modulestore, contentstore, course_key, root_dir, course_dir):
         # export the static assets
         policies_dir = export_fs.makeopendir('policies')
         if contentstore:
-            contentstore.export_all_for_course(
-                course_key,
-                root_dir + '/' + course_dir + '/static/',
-                root_dir + '/' + course_dir + '/policies/assets.json',
-            )
+            contentstore.export_all_for_course_to_fs(course_key, export_fs)
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
@@ -79,11 +210,8 @@ def export_to_xml(modulestore, contentstore, course_key, root_dir, course_dir):
                 except NotFoundError:
                     pass
                 else:
-                    output_dir = root_dir + '/' + course_dir + '/static/images/'
-                    if not os.path.isdir(output_dir):
-                        os.makedirs(output_dir)
-                    with OSFS(output_dir).open('course_image.jpg', 'wb') as course_image_file:
-                        course_image_file.write(course_image.data)
+                    export_fs.makedir('static/images', recursive=True, allow_recreate=True)
+                    export_fs.setcontents('static/images/course_image.jpg', course_image.data)
 
         # export the static tabs
         export_extra_content(export_fs, modulestore, course_key, xml_centric_course_key, 'static_tab', 'tabs', '.html')
@@ -26,6 +26,7 @@ import mimetypes
 from path import path
 import json
 import re
+from multiprocessing.pool import ThreadPool
 
 from .xml import XMLModuleStore, ImportSystem, ParentTracker
 from xblock.runtime import KvsFieldData, DictKeyValueStore
@@ -47,19 +48,30 @@ from xmodule.modulestore.store_utilities import draft_node_constructor, get_draf
 
 log = logging.getLogger(__name__)
 
+# How many files each thread imports at a time when static content is
+# imported by more than one thread.
+STATIC_CONTENT_BATCH_SIZE = 20
+
 
 def import_static_content(
         course_data_path, static_content_store,
-        target_course_id, subpath='static', verbose=False):
+        target_course_id, subpath='static', verbose=False, workers=1):
+    """
+    Import the files under `subpath` of `course_data_path` into
+    static_content_store as assets of target_course_id.
 
-    remap_dict = {}
+    With more than one worker, files are read and saved (along with their
+    thumbnails) by a pool of `workers` threads, in batches.
 
+    Returns a dict mapping the path of each file under `subpath` to the key
+    of its asset.
+    """
     # now import all static assets
     static_dir = course_data_path / subpath
     try:
         with open(course_data_path / 'policies/assets.json') as f:
             policy = json.load(f)
-    except (IOError, ValueError) as err:
+    except (IOError, ValueError):
         # xml backed courses won't have this file, only exported courses;
         # so, its absence is not really an exception.
         policy = {}
@@ -70,66 +82,89 @@ def import_static_content(
     mimetypes.add_type('application/octet-stream', '.srt')
     mimetypes_list = mimetypes.types_map.values()
 
-    for dirname, _, filenames in os.walk(static_dir):
-        for filename in filenames:
+    def content_paths():
+        """
+        Yields the (content_path, filename) of every file to import.
+        """
+        for dirname, _, filenames in os.walk(static_dir):
+            for filename in filenames:
+                content_path = os.path.join(dirname, filename)
 
-            content_path = os.path.join(dirname, filename)
+                if re.match(ASSET_IGNORE_REGEX, filename):
+                    if verbose:
+                        log.debug('skipping static content %s...', content_path)
+                    continue
 
-            if re.match(ASSET_IGNORE_REGEX, filename):
-                if verbose:
-                    log.debug('skipping static content %s...', content_path)
-                continue
+                yield content_path, filename
 
-            if verbose:
-                log.debug('importing static content %s...', content_path)
+    def import_file(paths):
+        """
+        Save the file at content_path as an asset. Returns the
+        (fullname_with_subpath, asset_key) of the file, or None if it is skipped.
+        """
+        content_path, filename = paths
+        if verbose:
+            log.debug('importing static content %s...', content_path)
 
-            try:
-                with open(content_path, 'rb') as f:
-                    data = f.read()
-            except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-                    continue
-                # Not a 'hidden file', then re-raise exception
-                raise
-
-            # strip away leading path from the name
-            fullname_with_subpath = content_path.replace(static_dir, '')
-            if fullname_with_subpath.startswith('/'):
-                fullname_with_subpath = fullname_with_subpath[1:]
-            asset_key = StaticContent.compute_location(target_course_id, fullname_with_subpath)
-
-            policy_ele = policy.get(asset_key.path, {})
-            displayname = policy_ele.get('displayname', filename)
-            locked = policy_ele.get('locked', False)
-            mime_type = policy_ele.get('contentType')
-
-            # Check extracted contentType in list of all valid mimetypes
-            if not mime_type or mime_type not in mimetypes_list:
-                mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                asset_key, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
+        try:
+            with open(content_path, 'rb') as f:
+                data = f.read()
+        except IOError:
+            if filename.startswith('._'):
+                # OS X "companion files". See
+                # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+                return None
+            # Not a 'hidden file', then re-raise exception
+            raise
+
+        # strip away leading path from the name
+        fullname_with_subpath = content_path.replace(static_dir, '')
+        if fullname_with_subpath.startswith('/'):
+            fullname_with_subpath = fullname_with_subpath[1:]
+        asset_key = StaticContent.compute_location(target_course_id, fullname_with_subpath)
+
+        policy_ele = policy.get(asset_key.path, {})
+        displayname = policy_ele.get('displayname', filename)
+        locked = policy_ele.get('locked', False)
+        mime_type = policy_ele.get('contentType')
+
+        # Check extracted contentType in list of all valid mimetypes
+        if not mime_type or mime_type not in mimetypes_list:
+            mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
+        content = StaticContent(
+            asset_key, displayname, mime_type, data,
+            import_path=fullname_with_subpath, locked=locked
+        )
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+        # first let's save a thumbnail so we can get back a thumbnail location
+        thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+        if thumbnail_content is not None:
+            content.thumbnail_location = thumbnail_location
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception(u'Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
+        # then commit the content
+        try:
+            static_content_store.save(content)
+        except Exception as err:
+            log.exception(u'Error importing {0}, error={1}'.format(
+                fullname_with_subpath, err
+            ))
 
+        return fullname_with_subpath, asset_key
+
+    if workers > 1:
+        pool = ThreadPool(workers)
+        try:
+            imported = pool.imap_unordered(import_file, content_paths(), STATIC_CONTENT_BATCH_SIZE)
             # store the remapping information which will be needed
             # to subsitute in the module data
-            remap_dict[fullname_with_subpath] = asset_key
+            remap_dict = dict(result for result in imported if result is not None)
+        finally:
+            pool.terminate()
+    else:
+        remap_dict = dict(
+            result for result in (import_file(paths) for paths in content_paths()) if result is not None
+        )
 
     return remap_dict
 
@@ -139,7 +174,8 @@ def import_from_xml(
         default_class='xmodule.raw_module.RawDescriptor',
         load_error_modules=True, static_content_store=None,
         target_course_id=None, verbose=False,
-        do_import_static=True, create_new_course_if_not_present=False):
+        do_import_static=True, create_new_course_if_not_present=False,
+        static_content_workers=1, step_callback=None):
     """
     Import xml-based courses from data_dir into modulestore.
 
@@ -170,8 +206,20 @@ def import_from_xml(
         create_new_course_if_not_present: If True, then a new course is created if it doesn't already exist.
             Otherwise, it throws an InvalidLocationError if the course does not exist.
 
+        static_content_workers: the number of threads importing the static content of a course.
+
+        step_callback: if given, called as step_callback(step, count) as each step of the import
+            of a course is done, where step is one of 'parse', 'static_content', 'modules' and
+            'drafts', and count is the number of modules or assets handled by the step, or None.
+
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
     """
+    def step_done(step, count=None):
+        """
+        Report that a step of the import is done.
+        """
+        if step_callback is not None:
+            step_callback(step, count)
 
     xml_module_store = XMLModuleStore(
         data_dir,
@@ -187,6 +235,8 @@ def import_from_xml(
     if target_course_id:
         assert(len(xml_module_store.modules) == 1)
 
+    step_done('parse', sum(len(modules) for modules in xml_module_store.modules.itervalues()))
+
     new_courses = []
     for course_key in xml_module_store.modules.keys():
         if target_course_id is not None:
@@ -219,9 +269,11 @@ def import_from_xml(
             new_courses.append(course)
 
             # STEP 2: import static content
-            _import_static_content_wrapper(
-                static_content_store, do_import_static, course_data_path, dest_course_id, verbose
+            asset_count = _import_static_content_wrapper(
+                static_content_store, do_import_static, course_data_path, dest_course_id, verbose,
+                static_content_workers,
             )
+            step_done('static_content', asset_count)
 
             # STEP 3: import PUBLISHED items
             # now loop through all the modules depth first and then orphans
@@ -270,6 +322,8 @@ def import_from_xml(
                         runtime=course.runtime
                     )
 
+            step_done('modules', len(xml_module_store.modules[course_key]))
+
             # STEP 4: import any DRAFT items
             with store.branch_setting(ModuleStoreEnum.Branch.draft_preferred, dest_course_id):
                 _import_course_draft(
@@ -281,6 +335,7 @@ def import_from_xml(
                     dest_course_id,
                     course.runtime
                 )
+            step_done('drafts')
 
     return new_courses
 
@@ -358,14 +413,20 @@ def _import_course_module(
     return course, course_data_path
 
 
-def _import_static_content_wrapper(static_content_store, do_import_static, course_data_path, dest_course_id, verbose):
+def _import_static_content_wrapper(
+        static_content_store, do_import_static, course_data_path, dest_course_id, verbose, workers=1
+):
+    """
+    Import the static content of the course. Returns the number of assets imported.
+    """
+    asset_count = 0
     # then import all the static content
     if static_content_store is not None and do_import_static:
         # first pass to find everything in /static/
-        import_static_content(
+        asset_count += len(import_static_content(
             course_data_path, static_content_store,
-            dest_course_id, subpath='static', verbose=verbose
-        )
+            dest_course_id, subpath='static', verbose=verbose, workers=workers
+        ))
 
     elif verbose and not do_import_static:
         log.debug(
@@ -385,10 +446,12 @@ def _import_static_content_wrapper(static_content_store, do_import_static, cours
 
     simport = 'static_import'
     if os.path.exists(course_data_path / simport):
-        import_static_content(
+        asset_count += len(import_static_content(
             course_data_path, static_content_store,
-            dest_course_id, subpath=simport, verbose=verbose
-        )
+            dest_course_id, subpath=simport, verbose=verbose, workers=workers
+        ))
+
+    return asset_count
 
 
 def _import_module_and_update_references(
@@ -8,6 +8,7 @@ import mock
 import os
 import pytz
 import shutil
+import StringIO
 import tarfile
 import unittest
 import uuid
@@ -26,7 +27,7 @@ from opaque_keys.edx.locations import Location
 from xmodule.modulestore import EdxJSONEncoder
 from xmodule.modulestore.xml import XMLModuleStore
 from xmodule.modulestore.xml_exporter import (
-    convert_between_versions, get_version
+    convert_between_versions, get_version, TarExportFS
 )
 from xmodule.tests import DATA_DIR
 from xmodule.tests.helpers import directories_equal
@@ -153,6 +154,54 @@ class RoundTripTestCase(unittest.TestCase):
             ))
 
 
+class TarExportFSTestCase(unittest.TestCase):
+    """
+    Tests for writing an export straight into a tar file
+    """
+    def _read_tar(self, write):
+        """
+        Call write with a TarExportFS for the course directory 'course', and return the resulting tar file
+        """
+        output = StringIO.StringIO()
+        with tarfile.open(fileobj=output, mode='w|gz') as tar_file:
+            write(TarExportFS(tar_file, 'course'))
+        return tarfile.open(fileobj=StringIO.StringIO(output.getvalue()), mode='r:gz')
+
+    def test_files_and_directories(self):
+        def write(export_fs):
+            with export_fs.open('course.xml', 'w') as course_xml:
+                course_xml.write('<course/>')
+            policy_dir = export_fs.makeopendir('policies').makeopendir('2012_Fall')
+            with policy_dir.open('policy.json', 'w') as policy:
+                policy.write(u'{"display_name": "\u00e9"}')
+            export_fs.makedir('html/nested', recursive=True, allow_recreate=True)
+            self.assertTrue(export_fs.exists('policies/2012_Fall/policy.json'))
+            self.assertFalse(export_fs.exists('policies/policy.json'))
+
+        tar_file = self._read_tar(write)
+        self.assertItemsEqual(
+            ['course', 'course/course.xml', 'course/policies', 'course/policies/2012_Fall',
+             'course/policies/2012_Fall/policy.json', 'course/html', 'course/html/nested'],
+            tar_file.getnames()
+        )
+        self.assertTrue(tar_file.getmember('course/html/nested').isdir())
+        self.assertEqual('<course/>', tar_file.extractfile('course/course.xml').read())
+        self.assertEqual(
+            u'{"display_name": "\u00e9"}'.encode('utf-8'),
+            tar_file.extractfile('course/policies/2012_Fall/policy.json').read()
+        )
+
+    def test_setcontents_with_length(self):
+        asset = StringIO.StringIO('x' * 100000)
+        asset.length = 100000
+        asset.read = mock.Mock(wraps=asset.read)
+
+        tar_file = self._read_tar(lambda export_fs: export_fs.makeopendir('static').setcontents('asset.bin', asset))
+        self.assertEqual('x' * 100000, tar_file.extractfile('course/static/asset.bin').read())
+        # the asset was copied in chunks, not read all at once
+        self.assertGreater(asset.read.call_count, 1)
+
+
 class TestEdxJsonEncoder(unittest.TestCase):
     """
     Tests for xml_exporter.EdxJSONEncoder
@@ -39,3 +39,20 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+    def test_import_with_workers(self):
+        """
+        Test that importing with a pool of threads saves the same files
+        """
+        course_dir = DATA_DIR / "dot-underscore"
+        course_id = SlashSeparatedCourseKey("edX", "dot-underscore", "2014_Fall")
+        remap_dicts = []
+        saved_names = []
+        for workers in (1, 3):
+            content_store = Mock()
+            content_store.generate_thumbnail.return_value = ("content", "location")
+            remap_dicts.append(import_static_content(course_dir, content_store, course_id, workers=workers))
+            saved_names.append(sorted(call[0][0].name for call in content_store.save.call_args_list))
+        self.assertEqual(remap_dicts[0], remap_dicts[1])
+        self.assertEqual(saved_names[0], saved_names[1])
+        self.assertIn("example.txt", saved_names[1])
@@ -14,10 +14,15 @@ from HTMLParser import HTMLParser
 from xmodule.exceptions import NotFoundError
 from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.django import contentstore
+from xmodule.x_module import DoNothingCache
 
 
 log = logging.getLogger(__name__)
 
+# How long a converted transcript stays cached. Transcripts are cached per upload of their
+# asset, so a new upload is picked up right away; this only bounds how long old ones linger.
+TRANSCRIPT_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 class TranscriptException(Exception):  # pylint: disable=missing-docstring
     pass
@@ -423,12 +428,20 @@ def get_or_create_sjson(item):
     user_filename = item.transcripts[item.transcript_language]
     user_subs_id = os.path.splitext(user_filename)[0]
     source_subs_id, result_subs_dict = user_subs_id, {1.0: user_subs_id}
+    sjson_filename = subs_filename(source_subs_id, item.transcript_language)
     try:
-        sjson_transcript = Transcript.asset(item.location, source_subs_id, item.transcript_language).data
+        return Transcript.get_converted(transcript_cache(item), item.location, sjson_filename, 'sjson', 'sjson')
     except (NotFoundError):  # generating sjson from srt
         generate_sjson_for_all_speeds(item, user_filename, result_subs_dict, item.transcript_language)
-    sjson_transcript = Transcript.asset(item.location, source_subs_id, item.transcript_language).data
-    return sjson_transcript
+    return Transcript.get_converted(transcript_cache(item), item.location, sjson_filename, 'sjson', 'sjson')
+
+
+def transcript_cache(item):
+    """
+    Return the cache for converted transcripts of the module `item`: its runtime's cache,
+    if it has one.
+    """
+    return getattr(item.runtime, 'cache', None) or DoNothingCache()
 
 
 class Transcript(object):
@@ -473,6 +486,31 @@ class Transcript(object):
             elif output_format == 'srt':
                 return generate_srt_from_sjson(json.loads(content), speed=1.0)
 
+    @staticmethod
+    def get_converted(cache, location, filename, input_format, output_format):
+        """
+        Return the transcript asset `filename` of the module at `location`, converted from
+        `input_format` to `output_format`.
+
+        The converted transcript is kept in `cache`, keyed by when the asset was last uploaded,
+        so that it is only fetched from the contentstore and converted again once it changes.
+        Only the upload date of the asset is looked up to check that.
+
+        Raises NotFoundError if the asset doesn't exist.
+        """
+        asset_location = Transcript.asset_location(location, filename)
+        last_modified_at = contentstore().find_last_modified([asset_location]).get(asset_location)
+        if last_modified_at is None:
+            raise NotFoundError(asset_location)
+
+        cache_key = u'video.transcript.{}.{}.{}'.format(asset_location, last_modified_at.isoformat(), output_format)
+        content = cache.get(cache_key)
+        if content is None:
+            data = contentstore().find(asset_location).data
+            content = Transcript.convert(data, input_format, output_format)
+            cache.set(cache_key, content, TRANSCRIPT_CACHE_TIMEOUT)
+        return content
+
     @staticmethod
     def asset(location, subs_id, lang='en', filename=None):
         """
@@ -538,23 +576,16 @@ class VideoTranscriptsMixin(object):
             return translations
 
         # If we've gotten this far, we're going to verify that the transcripts
-        # being referenced are actually in the contentstore.
-        if self.sub:  # check if sjson exists for 'en'.
-            try:
-                Transcript.asset(self.location, self.sub, 'en')
-            except NotFoundError:
-                pass
-            else:
-                translations = ['en']
-
+        # being referenced are actually in the contentstore, all with one query.
+        # For 'en', check if the sjson exists; for the others, the uploaded srt.
+        candidates = []
+        if self.sub:
+            candidates.append(('en', Transcript.asset_location(self.location, subs_filename(self.sub, 'en'))))
         for lang in self.transcripts:
-            try:
-                Transcript.asset(self.location, None, None, self.transcripts[lang])
-            except NotFoundError:
-                continue
-            translations.append(lang)
+            candidates.append((lang, Transcript.asset_location(self.location, self.transcripts[lang])))
 
-        return translations
+        existing = contentstore().find_last_modified([asset_location for __, asset_location in candidates])
+        return [lang for lang, asset_location in candidates if asset_location in existing]
 
     def get_transcript(self, transcript_format='srt', lang=None):
         """
@@ -582,13 +613,15 @@ class VideoTranscriptsMixin(object):
                 log.debug("No subtitles for 'en' language")
                 raise ValueError
 
-            data = Transcript.asset(self.location, transcript_name, lang).data
             filename = u'{}.{}'.format(transcript_name, transcript_format)
-            content = Transcript.convert(data, 'sjson', transcript_format)
+            content = Transcript.get_converted(
+                transcript_cache(self), self.location, subs_filename(transcript_name, lang), 'sjson', transcript_format
+            )
         else:
-            data = Transcript.asset(self.location, None, None, self.transcripts[lang]).data
             filename = u'{}.{}'.format(os.path.splitext(self.transcripts[lang])[0], transcript_format)
-            content = Transcript.convert(data, 'srt', transcript_format)
+            content = Transcript.get_converted(
+                transcript_cache(self), self.location, self.transcripts[lang], 'srt', transcript_format
+            )
 
         if not content:
             log.debug('no subtitles produced in get_transcript')
@@ -22,7 +22,8 @@ from .transcripts_utils import (
     youtube_speed_dict,
     Transcript,
     save_to_store,
-    subs_filename
+    subs_filename,
+    transcript_cache,
 )
 
 
@@ -108,13 +109,13 @@ class VideoStudentViewHandlers(object):
         if youtube_id:
             # Youtube case:
             if self.transcript_language == 'en':
-                return Transcript.asset(self.location, youtube_id).data
+                return self._sjson_transcript(youtube_id)
 
             youtube_ids = youtube_speed_dict(self)
             assert youtube_id in youtube_ids
 
             try:
-                sjson_transcript = Transcript.asset(self.location, youtube_id, self.transcript_language).data
+                sjson_transcript = self._sjson_transcript(youtube_id)
             except (NotFoundError):
                 log.info("Can't find content in storage for %s transcript: generating.", youtube_id)
                 generate_sjson_for_all_speeds(
@@ -123,16 +124,25 @@ class VideoStudentViewHandlers(object):
                     {speed: youtube_id for youtube_id, speed in youtube_ids.iteritems()},
                     self.transcript_language
                 )
-                sjson_transcript = Transcript.asset(self.location, youtube_id, self.transcript_language).data
+                sjson_transcript = self._sjson_transcript(youtube_id)
 
             return sjson_transcript
         else:
             # HTML5 case
             if self.transcript_language == 'en':
-                return Transcript.asset(self.location, self.sub).data
+                return self._sjson_transcript(self.sub)
             else:
                 return get_or_create_sjson(self)
 
+    def _sjson_transcript(self, subs_id):
+        """
+        Return the sjson transcript named by `subs_id` in the current transcript language,
+        from the transcript cache if it hasn't been uploaded again since it was cached.
+        """
+        return Transcript.get_converted(
+            transcript_cache(self), self.location, subs_filename(subs_id, self.transcript_language), 'sjson', 'sjson'
+        )
+
     def get_static_transcript(self, request):
         """
         Courses that are imported with the --nostatic flag do not show
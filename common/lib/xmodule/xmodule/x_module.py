@@ -174,6 +174,13 @@ class XModuleMixin(XBlockMixin):
     # student interacts with the module on the page.  A specific example is
     # FoldIt, which posts grade-changing updates through a separate API.
     always_recalculate_grades = False
+
+    # True if the student_view depends only on the block's content and settings,
+    # not on the user, their state or the render context, so that it can be
+    # cached and shared between users. Subclasses for which that depends on the
+    # data in the module can make it a property.
+    has_user_independent_student_view = False
+
     # The default implementation of get_icon_class returns the icon_class
     # attribute of the class
     #
@@ -227,6 +227,81 @@ class CourseEmailTemplate(models.Model):
         """
         return CourseEmailTemplate._render(self.html_template, htmltext, context)
 
+    def compile_plaintext(self, plaintext, context):
+        """
+        Create a CompiledEmailMessage of the plain text message.
+
+        `context` holds the values of all of the stored plain template's slots
+        but the recipient's 'name' and 'email'.
+        """
+        return CompiledEmailMessage(self.plain_template, plaintext, context)
+
+    def compile_htmltext(self, htmltext, context):
+        """
+        Create a CompiledEmailMessage of the HTML message.
+
+        `context` holds the values of all of the stored HTML template's slots
+        but the recipient's 'name' and 'email'.
+        """
+        return CompiledEmailMessage(self.html_template, htmltext, context)
+
+
+class CompiledEmailMessage(object):
+    """
+    An email message rendered from a template for all of its recipients at once,
+    but for their names and email addresses.
+
+    The message is split into lines, and the lines which don't hold the name or
+    the email address are wrapped once, so that rendering it for a recipient only
+    substitutes and wraps the lines which do.
+    """
+    NAME_SLOT = u'\x00name\x00'
+    EMAIL_SLOT = u'\x00email\x00'
+
+    def __init__(self, format_string, message_body, context):
+        slot_context = dict(context, name=self.NAME_SLOT, email=self.EMAIL_SLOT)
+        message = format_string.format(**slot_context)
+        message = message.replace(COURSE_EMAIL_MESSAGE_BODY_TAG.format(), message_body, 1)
+
+        # List of (text, whether it holds slots), where consecutive lines without
+        # slots are joined, and already wrapped.
+        self.segments = []
+        static_lines = []
+        for line in message.split('\n'):
+            if self.NAME_SLOT in line or self.EMAIL_SLOT in line:
+                if static_lines:
+                    self.segments.append((wrap_message(u'\n'.join(static_lines)), False))
+                    static_lines = []
+                self.segments.append((line, True))
+            else:
+                static_lines.append(line)
+        if static_lines or not self.segments:
+            self.segments.append((wrap_message(u'\n'.join(static_lines)), False))
+
+        # A template which formats the name or email with a conversion or format spec
+        # doesn't leave the slots as they are; render it the slow way then.
+        self._fallback = None
+        sample_context = dict(context, name=u'Sample Name', email=u'sample@example.com')
+        if self.render(u'Sample Name', u'sample@example.com') != CourseEmailTemplate._render(
+                format_string, message_body, sample_context
+        ):
+            self._fallback = (format_string, message_body, context)
+
+    def render(self, name, email):
+        """
+        Return the message for the recipient with the given name and email address.
+        """
+        if self._fallback is not None:
+            format_string, message_body, context = self._fallback
+            return CourseEmailTemplate._render(format_string, message_body, dict(context, name=name, email=email))
+
+        name = u'{}'.format(name)
+        email = u'{}'.format(email)
+        return u'\n'.join(
+            wrap_message(text.replace(self.NAME_SLOT, name).replace(self.EMAIL_SLOT, email)) if has_slots else text
+            for text, has_slots in self.segments
+        )
+
 
 class CourseAuthorization(models.Model):
     """
@@ -5,7 +5,8 @@ to a course.
 import re
 import random
 import json
-from time import sleep
+import threading
+from time import sleep, time
 
 import dogstats_wrapper as dog_stats_api
 from smtplib import SMTPServerDisconnected, SMTPDataError, SMTPConnectError, SMTPException
@@ -90,6 +91,10 @@ BULK_EMAIL_FAILURE_ERRORS = (
     SMTPException,
 )
 
+# The email backend connection each worker thread keeps open between subtasks, so that
+# consecutive subtasks don't each pay for connecting and authenticating to the server.
+_worker_connection = threading.local()
+
 
 def _get_recipient_queryset(user_id, to_option, course_id, course_location):
     """
@@ -445,13 +450,18 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
+
+    connection = None
+    keep_connection = False
+    batch_size = 0
+    batch_start = time()
     try:
-        connection = get_connection()
-        connection.open()
+        # Format the parts of the messages that are the same for all recipients once,
+        # so that only their names and email addresses are filled in for each of them.
+        compiled_plaintext = course_email_template.compile_plaintext(course_email.text_message, global_email_context)
+        compiled_html = course_email_template.compile_htmltext(course_email.html_message, global_email_context)
 
-        # Define context values to use in all course emails:
-        email_context = {'name': '', 'email': ''}
-        email_context.update(global_email_context)
+        connection = _get_worker_connection()
 
         while to_list:
             # Update context with user-specific values from the user at the end of the list.
@@ -461,12 +471,11 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             # yet been emailed, but not send to those who have already been sent to.
             current_recipient = to_list[-1]
             email = current_recipient['email']
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
+            name = current_recipient['profile__name']
 
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
+            # Construct message content using the compiled templates:
+            plaintext_msg = compiled_plaintext.render(name, email)
+            html_msg = compiled_html.render(name, email)
 
             # Create email:
             email_msg = EmailMultiAlternatives(
@@ -522,6 +531,12 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             # needed to be retried, the user is still on the list.)
             to_list.pop()
 
+            batch_size += 1
+            if batch_size == settings.BULK_EMAIL_SEND_BATCH_SIZE or not to_list:
+                _record_batch(subtask_status, course_title, batch_size, time() - batch_start)
+                batch_size = 0
+                batch_start = time()
+
     except INFINITE_RETRY_ERRORS as exc:
         dog_stats_api.increment('course_email.infinite_retry', tags=[_statsd_tag(course_title)])
         # Increment the "retried_nomax" counter, update other counters with progress to date,
@@ -572,11 +587,67 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
         # All went well.  Update counters with progress to date,
         # and set the state to SUCCESS:
         subtask_status.increment(state=SUCCESS)
+        keep_connection = True
         # Successful completion is marked by an exception value of None.
         return subtask_status, None
     finally:
-        # Clean up at the end.
+        # Clean up at the end, keeping the connection for the next subtask only if
+        # nothing went wrong with it.
+        if connection is not None:
+            _release_worker_connection(connection, keep_connection)
+
+
+def _record_batch(subtask_status, course_title, batch_size, duration):
+    """
+    Count a batch of `batch_size` emails, which took `duration` seconds to send,
+    in the subtask status and the send throughput metrics.
+    """
+    subtask_status.increment(batches=1, send_duration_ms=int(duration * 1000))
+    tags = [_statsd_tag(course_title)]
+    dog_stats_api.histogram('course_email.batch.size', batch_size, tags=tags)
+    if duration > 0:
+        dog_stats_api.histogram('course_email.batch.throughput', batch_size / duration, tags=tags)
+
+
+def _get_worker_connection():
+    """
+    Return an open email backend connection for this worker thread.
+
+    The connection left by the previous subtask is reused if it was released less
+    than `settings.BULK_EMAIL_CONNECTION_MAX_IDLE` seconds ago, since servers drop
+    connections that have been idle for long.  Otherwise it is closed, and a new
+    one is opened.
+    """
+    connection = getattr(_worker_connection, 'connection', None)
+    if connection is not None:
+        _worker_connection.connection = None
+        if time() - _worker_connection.released_at < settings.BULK_EMAIL_CONNECTION_MAX_IDLE:
+            return connection
+        _close_connection(connection)
+
+    connection = get_connection()
+    connection.open()
+    return connection
+
+
+def _release_worker_connection(connection, keep):
+    """
+    Keep the connection open for this worker thread's next subtask if `keep` is True
+    and connections may be reused; otherwise close it.
+    """
+    if keep and settings.BULK_EMAIL_CONNECTION_MAX_IDLE > 0:
+        _worker_connection.connection = connection
+        _worker_connection.released_at = time()
+    else:
+        _close_connection(connection)
+
+
+def _close_connection(connection):
+    """Close the connection, which may already have been dropped by the server."""
+    try:
         connection.close()
+    except Exception:  # pylint: disable=broad-except
+        log.warning('Error closing email backend connection', exc_info=True)
 
 
 def _get_current_task():
@@ -130,6 +130,23 @@ class CourseEmailTemplateTest(TestCase):
         context = self._get_sample_plain_context()
         template.render_plaintext("My new plain text.", context)
 
+    def test_compiled_matches_render(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._get_sample_html_context()
+        del context['email']
+        plain_message = u"Dear {name},\n" + u"word " * 100 + u"\nsent to {email}"
+        html_message = u"<p>Dear {name},</p><p>" + u"word " * 100 + u"</p>"
+        compiled_plain = template.compile_plaintext(plain_message, context)
+        compiled_html = template.compile_htmltext(html_message, context)
+        for name, email in [(u"Robot", u"robot@example.com"), (u"R\xf6b\xf2t " * 30, u"robot2@example.com")]:
+            recipient_context = dict(context, name=name, email=email)
+            self.assertEqual(
+                compiled_plain.render(name, email), template.render_plaintext(plain_message, recipient_context)
+            )
+            self.assertEqual(
+                compiled_html.render(name, email), template.render_htmltext(html_message, recipient_context)
+            )
+
 
 class CourseAuthorizationTest(TestCase):
     """Test the CourseAuthorization model."""
@@ -27,8 +27,10 @@ from celery.states import SUCCESS, FAILURE
 
 from django.conf import settings
 from django.core.management import call_command
+from django.test.utils import override_settings
 
 from bulk_email.models import CourseEmail, Optout, SEND_TO_ALL
+from bulk_email.tasks import _get_worker_connection, _release_worker_connection
 
 from instructor_task.tasks import send_bulk_course_email
 from instructor_task.subtasks import update_subtask_status, SubtaskStatus
@@ -212,6 +214,20 @@ class TestBulkEmailInstructorTask(InstructorTaskCourseTestCase):
         self.assertEquals(parent_status.get('succeeded'), num_emails)
         self.assertEquals(parent_status.get('failed'), 0)
 
+    @override_settings(BULK_EMAIL_CONNECTION_MAX_IDLE=60)
+    def test_connection_kept_for_next_subtask(self):
+        with patch('bulk_email.tasks.get_connection', autospec=True) as get_conn:
+            connection = _get_worker_connection()
+            _release_worker_connection(connection, keep=True)
+            self.assertIs(_get_worker_connection(), connection)
+            _release_worker_connection(connection, keep=False)
+            self.assertEquals(get_conn.call_count, 1)
+            self.assertEquals(connection.close.call_count, 1)
+
+            # once a connection has been closed, the next subtask opens a new one:
+            _release_worker_connection(_get_worker_connection(), keep=False)
+            self.assertEquals(get_conn.call_count, 2)
+
     def test_unactivated_user(self):
         # Select number of emails to fit into a single subtask.
         num_emails = settings.BULK_EMAIL_EMAILS_PER_TASK
@@ -284,32 +284,12 @@ def _has_access_descriptor(user, action, descriptor, course_key=None):
         students to see modules.  If not, views should check the course, so we
         don't have to hit the enrollments table on every module load.
         """
-        if descriptor.visible_to_staff_only and not _has_staff_access_to_descriptor(user, descriptor, course_key):
-            return False
-
-        # If start dates are off, can always load
-        if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user):
-            debug("Allow: DISABLE_START_DATES")
-            return True
-
-        # Check start date
-        if 'detached' not in descriptor._class_tags and descriptor.start is not None:
-            now = datetime.now(UTC())
-            effective_start = _adjust_start_date_for_beta_testers(
-                user,
-                descriptor,
-                course_key=course_key
-            )
-            if now > effective_start:
-                # after start date, everyone can see it
-                debug("Allow: now > effective start date")
-                return True
-            # otherwise, need staff access
-            return _has_staff_access_to_descriptor(user, descriptor, course_key)
-
-        # No start date, so can always load.
-        debug("Allow: no start date")
-        return True
+        return can_load_from_fields(
+            user,
+            load_access_fields(descriptor),
+            lambda: _has_staff_access_to_descriptor(user, descriptor, course_key),
+            lambda: CourseBetaTesterRole(course_key).has_user(user),
+        )
 
     checkers = {
         'load': can_load,
@@ -446,6 +426,59 @@ def _adjust_start_date_for_beta_testers(user, descriptor, course_key=None):  # p
     return descriptor.start
 
 
+def load_access_fields(descriptor):
+    """
+    Returns a dict of the fields of descriptor that `can_load_from_fields` checks, which
+    can be kept (e.g. cached) to check access to the descriptor without loading it.
+    """
+    return {
+        'visible_to_staff_only': descriptor.visible_to_staff_only,
+        'detached': 'detached' in descriptor._class_tags,  # pylint: disable=protected-access
+        'start': descriptor.start,
+        'days_early_for_beta': descriptor.days_early_for_beta,
+    }
+
+
+def can_load_from_fields(user, fields, has_staff_access, is_beta_tester):
+    """
+    Check if user can load a descriptor, from its `load_access_fields`. This is the 'load'
+    check of descriptors without custom policy.
+
+    Arguments:
+        user: A django user.  May be anonymous.
+        fields: the dict returned by `load_access_fields` for the descriptor
+        has_staff_access: a callable returning whether the user has staff access to the
+            descriptor's course; only called if needed
+        is_beta_tester: a callable returning whether the user is a beta tester of the
+            descriptor's course; only called if needed
+    """
+    if fields['visible_to_staff_only'] and not has_staff_access():
+        return False
+
+    # If start dates are off, can always load
+    if settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(user):
+        debug("Allow: DISABLE_START_DATES")
+        return True
+
+    # Check start date
+    if not fields['detached'] and fields['start'] is not None:
+        now = datetime.now(UTC())
+        effective_start = fields['start']
+        if fields['days_early_for_beta'] is not None and is_beta_tester():
+            debug("Adjust start time: user in beta role")
+            effective_start -= timedelta(fields['days_early_for_beta'])
+        if now > effective_start:
+            # after start date, everyone can see it
+            debug("Allow: now > effective start date")
+            return True
+        # otherwise, need staff access
+        return has_staff_access()
+
+    # No start date, so can always load.
+    debug("Allow: no start date")
+    return True
+
+
 def _has_instructor_access_to_location(user, location, course_key=None):
     if course_key is None:
         course_key = location.course_key
@@ -6,27 +6,45 @@ import random
 import logging
 
 from contextlib import contextmanager
+from datetime import timedelta
+from itertools import chain, islice
+
 from django.conf import settings
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Max
 from django.test.client import RequestFactory
+from django.utils import timezone
 
 import dogstats_wrapper as dog_stats_api
 
 from courseware import courses
-from courseware.model_data import FieldDataCache
+from courseware.access import has_access
+from courseware.model_data import FieldDataCache, flush_student_module_writes
 from student.models import anonymous_id_for_user
 from xmodule import graders
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.util.duedate import get_extended_due_date
-from .models import StudentModule
+from xmodule.x_module import XModuleDescriptor
+from .models import (
+    CourseAnswerDistribution, StudentModule, StudentModuleHistory, StudentSubsectionGrade, persistent_grades_enabled
+)
 from .module_render import get_module_for_descriptor
 from submissions import api as sub_api  # installed from the edx-submissions repository
 from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import UsageKey
 
 log = logging.getLogger("edx.courseware")
 
+# StudentModules read per query when counting answers
+ANSWER_DISTRIBUTION_CHUNK_SIZE = 1000
+
+# Incremental answer counts only count the StudentModules modified at least this
+# long ago, so that they don't miss the writes of transactions which haven't
+# committed yet; those are counted by the next run.
+ANSWER_DISTRIBUTION_LAG = timedelta(minutes=1)
+
 
 def yield_dynamic_descriptor_descendents(descriptor, module_creator):
     """
@@ -51,7 +69,20 @@ def yield_dynamic_descriptor_descendents(descriptor, module_creator):
         yield next_descriptor
 
 
-def answer_distributions(course_key):
+def yield_descriptor_descendents(descriptor):
+    """
+    This returns the descriptor and all of its static descendants, including
+    every possible child of blocks with dynamic children.
+    """
+    stack = [descriptor]
+
+    while len(stack) > 0:
+        next_descriptor = stack.pop()
+        stack.extend(next_descriptor.get_children())
+        yield next_descriptor
+
+
+def answer_distributions(course_key, incremental=False):
     """
     Given a course_key, return answer distributions in the form of a dictionary
     mapping:
@@ -76,82 +107,228 @@ def answer_distributions(course_key):
     rather than crawling through a student's course-tree -- the latter could
     potentially cause us trouble with A/B testing. The distribution report may
     not be aware of problems that are not visible to the user being used to
-    generate the report.
+    generate the report. The url_names and display_names of the problems are
+    looked up in a map built by walking the course once.
 
-    This method will try to use a read-replica database if one is available.
-    """
-    # dict: { module.module_state_key : (url_name, display_name) }
-    state_keys_to_problem_info = {}  # For caching, used by url_and_display_name
+    The records are read ANSWER_DISTRIBUTION_CHUNK_SIZE at a time, so that they
+    don't all have to fit in memory.
 
-    def url_and_display_name(usage_key):
-        """
-        For a given usage_key, return the problem's url and display_name.
-        Handle modulestore access and caching. This method ignores permissions.
+    If `incremental` is set, the counts start from the course's stored
+    CourseAnswerDistribution, and only the records modified since it was
+    computed are read, to update it. The answers submitted in the last
+    ANSWER_DISTRIBUTION_LAG are left for the next run to count.
 
-        Raises:
-            InvalidKeyError: if the usage_key does not parse
-            ItemNotFoundError: if there is no content that corresponds
-                to this usage_key.
-        """
-        problem_store = modulestore()
-        if usage_key not in state_keys_to_problem_info:
-            problem = problem_store.get_item(usage_key)
-            problem_info = (problem.url_name, problem.display_name_with_default)
-            state_keys_to_problem_info[usage_key] = problem_info
-
-        return state_keys_to_problem_info[usage_key]
+    Unless `incremental` is set, this method will try to use a read-replica
+    database if one is available.
+    """
+    if incremental:
+        counts = _incremental_answer_counts(course_key)
+    else:
+        counts = _new_answer_counts()
+        for module in _iter_modules(StudentModule.all_submitted_problems_read_only(course_key)):
+            _count_answers(counts, course_key, module, module.state, 1)
 
-    # Iterate through all problems submitted for this course in no particular
-    # order, and build up our answer_counts dict that we will eventually return
+    problem_info = _problem_info_by_usage_key(course_key)
     answer_counts = defaultdict(lambda: defaultdict(int))
-    for module in StudentModule.all_submitted_problems_read_only(course_key):
+    for usage_key, problem_counts in _positive_counts(counts).iteritems():
         try:
-            state_dict = json.loads(module.state) if module.state else {}
-            raw_answers = state_dict.get("student_answers", {})
-        except ValueError:
-            log.error(
-                "Answer Distribution: Could not parse module state for " +
-                "StudentModule id={}, course={}".format(module.id, course_key)
-            )
-            continue
-
-        try:
-            url, display_name = url_and_display_name(module.module_state_key.map_into_course(course_key))
-            # Each problem part has an ID that is derived from the
-            # module.module_state_key (with some suffix appended)
-            for problem_part_id, raw_answer in raw_answers.items():
-                # Convert whatever raw answers we have (numbers, unicode, None, etc.)
-                # to be unicode values. Note that if we get a string, it's always
-                # unicode and not str -- state comes from the json decoder, and that
-                # always returns unicode for strings.
-                answer = unicode(raw_answer)
-                answer_counts[(url, display_name, problem_part_id)][answer] += 1
-
+            if usage_key in problem_info:
+                url, display_name = problem_info[usage_key]
+            else:
+                # Problems which aren't in the course tree, such as orphans
+                problem = modulestore().get_item(UsageKey.from_string(usage_key).map_into_course(course_key))
+                url, display_name = problem.url_name, problem.display_name_with_default
         except (ItemNotFoundError, InvalidKeyError):
-            msg = "Answer Distribution: Item {} referenced in StudentModule {} " + \
-                  "for user {} in course {} not found; " + \
+            msg = "Answer Distribution: Item {} referenced in StudentModules " + \
+                  "in course {} not found; " + \
                   "This can happen if a student answered a question that " + \
-                  "was later deleted from the course. This answer will be " + \
+                  "was later deleted from the course. Its answers will be " + \
                   "omitted from the answer distribution CSV."
-            log.warning(
-                msg.format(module.module_state_key, module.id, module.student_id, course_key)
-            )
+            log.warning(msg.format(usage_key, course_key))
             continue
 
+        for problem_part_id, answers in problem_counts.iteritems():
+            for answer, count in answers.iteritems():
+                answer_counts[(url, display_name, problem_part_id)][answer] += count
+
+    return answer_counts
+
+
+def _problem_info_by_usage_key(course_key):
+    """
+    Walk the course once, returning a dict mapping the usage_key (as unicode) of
+    each of its problems to the problem's (url_name, display_name).
+    """
+    course = modulestore().get_course(course_key, depth=None)
+    if course is None:
+        return {}
+    return {
+        unicode(descriptor.location.map_into_course(course_key)): (
+            descriptor.url_name, descriptor.display_name_with_default
+        )
+        for descriptor in yield_descriptor_descendents(course)
+        if descriptor.category == 'problem'
+    }
+
+
+def _incremental_answer_counts(course_key):
+    """
+    Return the answer counts of the course's CourseAnswerDistribution, updated
+    with the StudentModules modified since it was computed, and store them.
+
+    A StudentModule modified since is counted again with its current state,
+    after taking back the answers of the state it had when the stored counts
+    were computed, which is the last StudentModuleHistory entry from before.
+
+    The records are read from the primary database, not the read replica:
+    the replica can lag behind by more than ANSWER_DISTRIBUTION_LAG, and a
+    record missing from it when the window is read would never be counted.
+    """
+    computed_through = timezone.now() - ANSWER_DISTRIBUTION_LAG
+    try:
+        distribution = CourseAnswerDistribution.objects.select_for_update().get(course_id=course_key)
+    except CourseAnswerDistribution.DoesNotExist:
+        distribution = CourseAnswerDistribution(course_id=course_key)
+        counts = _new_answer_counts()
+        modules = StudentModule.objects.filter(
+            course_id=course_key,
+            module_type='problem',
+            grade__isnull=False,
+            modified__lt=computed_through,
+        )
+        for module in _iter_modules(modules):
+            _count_answers(counts, course_key, module, module.state, 1)
+    else:
+        counts = _new_answer_counts(json.loads(distribution.counts))
+        # Modules whose grade was cleared since are read too, to take their answers back
+        modules = StudentModule.objects.filter(
+            course_id=course_key,
+            module_type='problem',
+            modified__gte=distribution.computed_through,
+            modified__lt=computed_through,
+        )
+        for chunk in _iter_module_chunks(modules):
+            modules_by_id = {module.id: module for module in chunk}
+            for entry in _last_history_entries(modules_by_id.keys(), distribution.computed_through):
+                if entry.grade is not None:
+                    _count_answers(counts, course_key, modules_by_id[entry.student_module_id], entry.state, -1)
+            for module in chunk:
+                if module.grade is not None:
+                    _count_answers(counts, course_key, module, module.state, 1)
+
+    distribution.counts = json.dumps(_positive_counts(counts))
+    distribution.computed_through = computed_through
+    distribution.save()
+    return counts
+
+
+def _last_history_entries(student_module_ids, before):
+    """
+    Return the last StudentModuleHistory entry created before `before` of each
+    of the StudentModules with ids `student_module_ids`, with two queries.
+    """
+    last_ids = StudentModuleHistory.objects.filter(
+        student_module__in=student_module_ids,
+        created__lt=before,
+    ).values('student_module').annotate(last_id=Max('id')).values_list('last_id', flat=True)
+    return StudentModuleHistory.objects.filter(id__in=list(last_ids))
+
+
+def _iter_module_chunks(queryset):
+    """
+    Yield the StudentModules of queryset in lists of ANSWER_DISTRIBUTION_CHUNK_SIZE,
+    with one query per list, each starting after the id of the last module read.
+    Only the fields needed to count their answers are loaded.
+    """
+    queryset = queryset.only('id', 'student', 'module_state_key', 'state', 'grade').order_by('id')
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id)[:ANSWER_DISTRIBUTION_CHUNK_SIZE])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].id
+
+
+def _iter_modules(queryset):
+    """
+    Yield the StudentModules of queryset, reading them in chunks.
+    """
+    return chain.from_iterable(_iter_module_chunks(queryset))
+
+
+def _new_answer_counts(counts=None):
+    """
+    Return a dict of {problem usage_key: {problem part id: {answer: count}}}
+    which defaults counts to 0, starting from `counts` if given.
+    """
+    answer_counts = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+    for usage_key, problem_counts in (counts or {}).iteritems():
+        for problem_part_id, answers in problem_counts.iteritems():
+            answer_counts[usage_key][problem_part_id].update(answers)
     return answer_counts
 
 
+def _positive_counts(counts):
+    """
+    Return a copy of the answer counts `counts` without the answers that no
+    longer count, and the problems left with none.
+    """
+    positive_counts = {}
+    for usage_key, problem_counts in counts.iteritems():
+        problem_counts = {
+            problem_part_id: {answer: count for answer, count in answers.iteritems() if count > 0}
+            for problem_part_id, answers in problem_counts.iteritems()
+        }
+        problem_counts = {
+            problem_part_id: answers for problem_part_id, answers in problem_counts.iteritems() if answers
+        }
+        if problem_counts:
+            positive_counts[usage_key] = problem_counts
+    return positive_counts
+
+
+def _count_answers(counts, course_key, module, state, weight):
+    """
+    Add `weight` to the counts of the answers in `state`, a state of the
+    StudentModule `module`.
+    """
+    try:
+        state_dict = json.loads(state) if state else {}
+        raw_answers = state_dict.get("student_answers", {})
+    except ValueError:
+        log.error(
+            "Answer Distribution: Could not parse module state for " +
+            "StudentModule id={}, course={}".format(module.id, course_key)
+        )
+        return
+
+    if not raw_answers:
+        return
+
+    # Each problem part has an ID that is derived from the
+    # module.module_state_key (with some suffix appended)
+    problem_counts = counts[unicode(module.module_state_key.map_into_course(course_key))]
+    for problem_part_id, raw_answer in raw_answers.items():
+        # Convert whatever raw answers we have (numbers, unicode, None, etc.)
+        # to be unicode values. Note that if we get a string, it's always
+        # unicode and not str -- state comes from the json decoder, and that
+        # always returns unicode for strings.
+        answer = unicode(raw_answer)
+        problem_counts[problem_part_id][answer] += weight
+
+
 @transaction.commit_manually
-def grade(student, request, course, keep_raw_scores=False):
+def grade(student, request, course, keep_raw_scores=False, field_data_cache=None):
     """
     Wraps "_grade" with the manual_transaction context manager just in case
     there are unanticipated errors.
     """
     with manual_transaction():
-        return _grade(student, request, course, keep_raw_scores)
+        return _grade(student, request, course, keep_raw_scores, field_data_cache)
 
 
-def _grade(student, request, course, keep_raw_scores):
+def _grade(student, request, course, keep_raw_scores, field_data_cache=None):
     """
     Unwrapped version of "grade"
 
@@ -169,6 +346,9 @@ def _grade(student, request, course, keep_raw_scores):
       make up the final grade. (For display)
     - keep_raw_scores : if True, then value for key 'raw_scores' contains scores
       for every graded module
+    - field_data_cache : a FieldDataCache.cache_for_course of the student to
+      create modules with. One is loaded when the first module is created if
+      it isn't given.
 
     More information on the format is in the docstring for CourseGrader.
     """
@@ -182,6 +362,24 @@ def _grade(student, request, course, keep_raw_scores):
         course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id)
     )
 
+    persistent_grades = persistent_grades_enabled()
+    if persistent_grades:
+        # One query each for the student's persisted subsection grades and for
+        # the set of modules they have state for, instead of per-section
+        # queries below.
+        persisted_grades = StudentSubsectionGrade.grades_for_course(student, course.id)
+        # The queries below read StudentModule directly, so they must see
+        # the writes this request has buffered.
+        flush_student_module_writes()
+        with manual_transaction():
+            touched_keys = set(
+                unicode(module_state_key) for module_state_key in StudentModule.objects.filter(
+                    student=student, course_id=course.id
+                ).values_list('module_state_key', flat=True)
+            )
+
+    create_module = _course_module_creator(student, request, course, field_data_cache)
+
     totaled_scores = {}
     # This next complicated loop is just to collect the totaled_scores, which is
     # passed to the grader
@@ -207,49 +405,47 @@ def _grade(student, request, course, keep_raw_scores):
                     for descriptor in section['xmoduledescriptors']
                 )
 
-            if not should_grade_section:
-                with manual_transaction():
-                    should_grade_section = StudentModule.objects.filter(
-                        student=student,
-                        module_state_key__in=[
-                            descriptor.location for descriptor in section['xmoduledescriptors']
-                        ]
-                    ).exists()
+            # Scores that can change without a grade event being published can't
+            # be persisted, everything else is read from and written to the
+            # persisted subsection grades.
+            persist_section = persistent_grades and not should_grade_section
+            scores = None
+            if persist_section:
+                persisted_entries = _get_persisted_entries(persisted_grades, section_descriptor)
+                if persisted_entries is not None:
+                    scores = [_score_from_entry(entry) for entry in persisted_entries]
+
+            if scores is None and not should_grade_section:
+                if persistent_grades:
+                    should_grade_section = any(
+                        _stored_key(descriptor.location) in touched_keys
+                        for descriptor in section['xmoduledescriptors']
+                    )
+                else:
+                    flush_student_module_writes()
+                    with manual_transaction():
+                        should_grade_section = StudentModule.objects.filter(
+                            student=student,
+                            module_state_key__in=[
+                                descriptor.location for descriptor in section['xmoduledescriptors']
+                            ]
+                        ).exists()
 
             # If we haven't seen a single problem in the section, we don't have
             # to grade it at all! We can assume 0%
-            if should_grade_section:
-                scores = []
-
-                def create_module(descriptor):
-                    '''creates an XModule instance given a descriptor'''
-                    # TODO: We need the request to pass into here. If we could forego that, our arguments
-                    # would be simpler
-                    with manual_transaction():
-                        field_data_cache = FieldDataCache([descriptor], course.id, student)
-                    return get_module_for_descriptor(student, request, descriptor, field_data_cache, course.id)
-
-                for module_descriptor in yield_dynamic_descriptor_descendents(section_descriptor, create_module):
-
-                    (correct, total) = get_score(
-                        course.id, student, module_descriptor, create_module, scores_cache=submissions_scores
-                    )
-                    if correct is None and total is None:
-                        continue
-
-                    if settings.GENERATE_PROFILE_SCORES:  	# for debugging!
-                        if total > 1:
-                            correct = random.randrange(max(total - 2, 1), total + 1)
-                        else:
-                            correct = total
-
-                    graded = module_descriptor.graded
-                    if not total > 0:
-                        #We simply cannot grade a problem that is 12/0, because we might need it as a percentage
-                        graded = False
-
-                    scores.append(Score(correct, total, graded, module_descriptor.display_name_with_default))
-
+            if scores is None and should_grade_section:
+                scored_entries = _calculate_section_scores(
+                    course.id, student, section_descriptor, create_module, submissions_scores
+                )
+                if settings.GENERATE_PROFILE_SCORES:  	# for debugging!
+                    for entry in scored_entries:
+                        total = entry[2]
+                        entry[1] = random.randrange(max(total - 2, 1), total + 1) if total > 1 else total
+                if persist_section:
+                    _persist_scores(student, course.id, section_descriptor, scored_entries)
+                scores = [_score_from_entry(entry) for entry in scored_entries]
+
+            if scores is not None:
                 _, graded_total = graders.aggregate_scores(scores, section_name)
                 if keep_raw_scores:
                     raw_scores += scores
@@ -267,6 +463,18 @@ def _grade(student, request, course, keep_raw_scores):
 
         totaled_scores[section_format] = format_scores
 
+    grade_summary = _summarize_grades(course, totaled_scores)
+    if keep_raw_scores:
+        grade_summary['raw_scores'] = raw_scores        # way to get all RAW scores out to instructor
+                                                        # so grader can be double-checked
+    return grade_summary
+
+
+def _summarize_grades(course, totaled_scores):
+    """
+    Run the course grader over the per-format section totals and add the
+    rounded percentage and letter grade.
+    """
     grade_summary = course.grader.grade(totaled_scores, generate_random_scores=settings.GENERATE_PROFILE_SCORES)
 
     # We round the grade here, to make sure that the grade is an whole percentage and
@@ -276,12 +484,211 @@ def _grade(student, request, course, keep_raw_scores):
     letter_grade = grade_for_percentage(course.grade_cutoffs, grade_summary['percent'])
     grade_summary['grade'] = letter_grade
     grade_summary['totaled_scores'] = totaled_scores  	# make this available, eg for instructor download & debugging
-    if keep_raw_scores:
-        grade_summary['raw_scores'] = raw_scores        # way to get all RAW scores out to instructor
-                                                        # so grader can be double-checked
     return grade_summary
 
 
+class BulkGradingContext(object):
+    """
+    Course data shared by every batch graded with `bulk_grade`.
+
+    The graded sections and their problems are worked out once per course,
+    and the max score of each problem is remembered across batches, either
+    from StudentModule rows or from instantiating the problem once.
+    """
+    def __init__(self, course):
+        self.course = course
+        # dict: { stored problem key : max score before weighting }
+        self.max_scores = {}
+        self.sections = []
+        # Only pure XBlocks (e.g. openassessment) report scores through the
+        # submissions API, so courses without any don't need a call per student.
+        self.uses_submissions = False
+
+        for section_format, sections in course.grading_context['graded_sections'].iteritems():
+            for section in sections:
+                section_descriptor = section['section_descriptor']
+                problems = section['xmoduledescriptors']
+                self.uses_submissions = self.uses_submissions or any(
+                    not isinstance(problem, XModuleDescriptor) for problem in problems
+                )
+                self.sections.append({
+                    'format': section_format,
+                    'descriptor': section_descriptor,
+                    'name': section_descriptor.display_name_with_default,
+                    'problems': [(problem, _stored_key(problem.location)) for problem in problems],
+                    # Which problems a student sees below a block with dynamic
+                    # children is only known by instantiating it for them.
+                    'per_student': any(
+                        block.has_dynamic_children() for block in yield_descriptor_descendents(section_descriptor)
+                    ),
+                    'always_recalculate': any(problem.always_recalculate_grades for problem in problems),
+                })
+
+
+@transaction.commit_manually
+def bulk_grade(students, request, context):
+    """
+    Wraps "_bulk_grade" with the manual_transaction context manager just in
+    case there are unanticipated errors.
+    """
+    with manual_transaction():
+        return _bulk_grade(students, request, context)
+
+
+def _bulk_grade(students, request, context):
+    """
+    Unwrapped version of "bulk_grade"
+
+    Grades a batch of students together, producing the same gradesets as
+    `grade`. The (grade, max_grade) of every StudentModule of the batch is
+    read in a single query; problems are only instantiated for blocks with
+    always_recalculate_grades, sections containing blocks with dynamic
+    children, and once per problem whose max score is not yet known.
+
+    students: a list of User objects
+    request: a fake request, its user is set to each student in turn
+    context: the course's BulkGradingContext
+
+    Returns a dict mapping student id -> (gradeset, err_msg), in the same
+    format as the tuples yielded by `iterate_grades_for`.
+    """
+    course = context.course
+    module_scores = defaultdict(dict)
+    flush_student_module_writes()
+    with manual_transaction():
+        rows = StudentModule.objects.filter(
+            student__in=[student.id for student in students],
+            course_id=course.id,
+        ).values_list('student_id', 'module_state_key', 'grade', 'max_grade')
+        for student_id, module_state_key, grade_value, max_grade in rows:
+            module_scores[student_id][unicode(module_state_key)] = (grade_value, max_grade)
+            if max_grade is not None:
+                context.max_scores.setdefault(unicode(module_state_key), max_grade)
+
+    results = {}
+    for student in students:
+        request.user = student
+        request.session = {}
+        try:
+            gradeset = _bulk_grade_student(student, request, context, module_scores[student.id])
+            results[student.id] = (gradeset, "")
+        except Exception as exc:  # pylint: disable=broad-except
+            log.exception(
+                'Cannot grade student %s (%s) in course %s because of exception: %s',
+                student.username,
+                student.id,
+                course.id,
+                exc.message
+            )
+            results[student.id] = ({}, exc.message)
+    return results
+
+
+def _bulk_grade_student(student, request, context, module_scores):
+    """
+    Grade one student of a `bulk_grade` batch.
+
+    module_scores: dict of stored problem key -> (grade, max_grade) for every
+        StudentModule of the student in the course
+    """
+    course = context.course
+
+    submissions_scores = {}
+    if context.uses_submissions:
+        submissions_scores = sub_api.get_scores(
+            course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id)
+        )
+
+    create_module = _course_module_creator(student, request, course)
+
+    totaled_scores = {}
+    for section in context.sections:
+        format_scores = totaled_scores.setdefault(section['format'], [])
+        should_grade_section = section['always_recalculate'] or any(
+            key in module_scores or problem.location.to_deprecated_string() in submissions_scores
+            for problem, key in section['problems']
+        )
+
+        # If we haven't seen a single problem in the section, we don't have
+        # to grade it at all! We can assume 0%
+        if not should_grade_section:
+            graded_total = Score(0.0, 1.0, True, section['name'])
+        elif section['per_student']:
+            entries = _calculate_section_scores(
+                course.id, student, section['descriptor'], create_module, submissions_scores
+            )
+            _, graded_total = graders.aggregate_scores(
+                [_score_from_entry(entry) for entry in entries], section['name']
+            )
+        else:
+            scores = []
+            for problem, key in section['problems']:
+                (correct, total) = _bulk_problem_score(
+                    student, problem, key, context, module_scores, submissions_scores, create_module
+                )
+                if correct is None and total is None:
+                    continue
+                graded = problem.graded and total > 0
+                scores.append(Score(correct, total, graded, problem.display_name_with_default))
+            _, graded_total = graders.aggregate_scores(scores, section['name'])
+
+        if graded_total.possible > 0:
+            format_scores.append(graded_total)
+        else:
+            log.info(
+                "Unable to grade a section with a total possible score of zero. " +
+                str(section['descriptor'].location)
+            )
+
+    return _summarize_grades(course, totaled_scores)
+
+
+def _bulk_problem_score(student, problem, key, context, module_scores, submissions_scores, create_module):
+    """
+    The `bulk_grade` counterpart of `get_score`: returns (correct, total) for
+    the student on the problem, without instantiating it unless it has to be
+    recalculated or its max score is not known yet.
+    """
+    course = context.course
+    location_url = problem.location.to_deprecated_string()
+    if location_url in submissions_scores:
+        return submissions_scores[location_url]
+
+    if problem.always_recalculate_grades:
+        return get_score(course.id, student, problem, create_module)
+
+    grade_value, max_grade = module_scores.get(key, (None, None))
+    if max_grade is not None:
+        correct = grade_value if grade_value is not None else 0
+        total = max_grade
+    else:
+        # get_score would instantiate the problem here, which also checks
+        # that the student can see it.
+        if not has_access(student, 'load', problem, course.id):
+            return (None, None)
+        if key not in context.max_scores:
+            module = create_module(problem)
+            if module is None:
+                return (None, None)
+            # The max score of a problem doesn't depend on the student, so
+            # it is computed once and reused for everyone else.
+            context.max_scores[key] = module.max_score()
+        correct = 0.0
+        total = context.max_scores[key]
+        if total is None:
+            return (None, None)
+
+    weight = problem.weight
+    if weight is not None:
+        if total == 0:
+            log.error("Cannot reweight a problem with zero total points. Problem: %s", location_url)
+            return (correct, total)
+        correct = correct * weight / total
+        total = weight
+
+    return (correct, total)
+
+
 def grade_for_percentage(grade_cutoffs, percentage):
     """
     Returns a letter grade as defined in grading_policy (e.g. 'A' 'B' 'C' for 6.002x) or None.
@@ -305,19 +712,19 @@ def grade_for_percentage(grade_cutoffs, percentage):
 
 
 @transaction.commit_manually
-def progress_summary(student, request, course):
+def progress_summary(student, request, course, field_data_cache=None):
     """
     Wraps "_progress_summary" with the manual_transaction context manager just
     in case there are unanticipated errors.
     """
     with manual_transaction():
-        return _progress_summary(student, request, course)
+        return _progress_summary(student, request, course, field_data_cache)
 
 
 # TODO: This method is not very good. It was written in the old course style and
 # then converted over and performance is not good. Once the progress page is redesigned
 # to not have the progress summary this method should be deleted (so it won't be copied).
-def _progress_summary(student, request, course):
+def _progress_summary(student, request, course, field_data_cache=None):
     """
     Unwrapped version of "progress_summary".
 
@@ -333,15 +740,16 @@ def _progress_summary(student, request, course):
     Arguments:
         student: A User object for the student to grade
         course: A Descriptor containing the course to grade
+        field_data_cache: A FieldDataCache.cache_for_course of the student,
+            loaded here if it isn't given
 
     If the student does not have access to load the course module, this function
     will return None.
 
     """
     with manual_transaction():
-        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-            course.id, student, course, depth=None
-        )
+        if field_data_cache is None:
+            field_data_cache = FieldDataCache.cache_for_course(course.id, student)
         # TODO: We need the request to pass into here. If we could
         # forego that, our arguments would be simpler
         course_module = get_module_for_descriptor(student, request, course, field_data_cache, course.id)
@@ -351,6 +759,26 @@ def _progress_summary(student, request, course):
 
     submissions_scores = sub_api.get_scores(course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id))
 
+    persisted_grades = {}
+    use_persisted_grades = persistent_grades_enabled()
+    if use_persisted_grades:
+        persisted_grades = StudentSubsectionGrade.grades_for_course(student, course.id)
+
+    def persist_section(section_module):
+        """
+        Sections containing scores that can change without a grade event can't
+        use the persisted grades.
+        """
+        if not use_persisted_grades:
+            return False
+        # Walk the static descriptor tree, so that every child a dynamic block
+        # could pick is considered, not just the ones this student sees.
+        section_descriptor = getattr(section_module, 'descriptor', section_module)
+        return not any(
+            descriptor.always_recalculate_grades or descriptor.location.to_deprecated_string() in submissions_scores
+            for descriptor in yield_descriptor_descendents(section_descriptor)
+        )
+
     chapters = []
     # Don't include chapters that aren't displayable (e.g. due to error)
     for chapter_module in course_module.get_display_items():
@@ -367,20 +795,21 @@ def _progress_summary(student, request, course):
                     continue
 
                 graded = section_module.graded
-                scores = []
 
-                module_creator = section_module.xmodule_runtime.get_module
+                entries = None
+                persisted = persist_section(section_module)
+                if persisted:
+                    entries = _get_persisted_entries(persisted_grades, section_module)
 
-                for module_descriptor in yield_dynamic_descriptor_descendents(section_module, module_creator):
-                    course_id = course.id
-                    (correct, total) = get_score(
-                        course_id, student, module_descriptor, module_creator, scores_cache=submissions_scores
+                if entries is None:
+                    module_creator = section_module.xmodule_runtime.get_module
+                    entries = _calculate_section_scores(
+                        course.id, student, section_module, module_creator, submissions_scores
                     )
-                    if correct is None and total is None:
-                        continue
-
-                    scores.append(Score(correct, total, graded, module_descriptor.display_name_with_default))
+                    if persisted:
+                        _persist_scores(student, course.id, section_module, entries)
 
+                scores = [_score_from_entry(entry, graded=graded) for entry in entries]
                 scores.reverse()
                 section_total, _ = graders.aggregate_scores(
                     scores, section_module.display_name_with_default)
@@ -406,6 +835,129 @@ def _progress_summary(student, request, course):
     return chapters
 
 
+def _stored_key(usage_key):
+    """
+    Return the string `usage_key` is stored as in a LocationKeyField column,
+    so keys loaded from the database can be compared without parsing them.
+    """
+    return StudentModule._meta.get_field('module_state_key').get_prep_value(usage_key)
+
+
+def _content_version(section_descriptor):
+    """
+    Return the version of the section's content that persisted scores are
+    valid for, or None if the modulestore doesn't track edits (e.g. XML
+    courses), in which case scores for the section are never persisted.
+    """
+    try:
+        edited_on = section_descriptor.subtree_edited_on
+    except AttributeError:
+        return None
+    return unicode(edited_on) if edited_on is not None else None
+
+
+def _course_module_creator(student, request, course, field_data_cache=None):
+    """
+    Return a function creating the XModule of a descriptor of the course for
+    the student. All of the modules share `field_data_cache`, or a
+    FieldDataCache.cache_for_course loaded when the first of them is created.
+    """
+    field_data_caches = [field_data_cache] if field_data_cache is not None else []
+
+    def create_module(descriptor):
+        '''creates an XModule instance given a descriptor'''
+        # TODO: We need the request to pass into here. If we could forego that, our arguments
+        # would be simpler
+        if not field_data_caches:
+            with manual_transaction():
+                field_data_caches.append(FieldDataCache.cache_for_course(course.id, student))
+        return get_module_for_descriptor(student, request, descriptor, field_data_caches[0], course.id)
+
+    return create_module
+
+
+def _calculate_section_scores(course_id, student, section_descriptor, module_creator, submissions_scores):
+    """
+    Score every problem in the section, walking the student's dynamic children.
+
+    Returns a list of [location, earned, possible, graded, display_name]
+    entries, in the format stored by StudentSubsectionGrade.
+    """
+    entries = []
+    for module_descriptor in yield_dynamic_descriptor_descendents(section_descriptor, module_creator):
+        (correct, total) = get_score(
+            course_id, student, module_descriptor, module_creator, scores_cache=submissions_scores
+        )
+        if correct is None and total is None:
+            continue
+
+        graded = module_descriptor.graded
+        if not total > 0:
+            #We simply cannot grade a problem that is 12/0, because we might need it as a percentage
+            graded = False
+
+        entries.append([
+            module_descriptor.location.to_deprecated_string(),
+            correct,
+            total,
+            graded,
+            module_descriptor.display_name_with_default,
+        ])
+    return entries
+
+
+def _score_from_entry(entry, graded=None):
+    """
+    Build a Score from a stored score entry, optionally overriding whether it
+    counts as graded.
+    """
+    _location, earned, possible, entry_graded, display_name = entry
+    return Score(earned, possible, entry_graded if graded is None else graded, display_name)
+
+
+def _get_persisted_entries(persisted_grades, section_descriptor):
+    """
+    Return the persisted score entries for the section, or None if there are
+    none or they were computed against a different version of the content.
+
+    persisted_grades: the result of StudentSubsectionGrade.grades_for_course
+    """
+    version = _content_version(section_descriptor)
+    if version is None:
+        return None
+
+    subsection_grade = persisted_grades.get(_stored_key(section_descriptor.location))
+    if subsection_grade is None or subsection_grade.content_version != version:
+        return None
+
+    return subsection_grade.get_scores()
+
+
+def _persist_scores(student, course_id, section_descriptor, entries):
+    """
+    Store freshly calculated score entries for the section.
+    """
+    version = _content_version(section_descriptor)
+    if version is None:
+        return
+
+    try:
+        with manual_transaction():
+            subsection_grade, _ = StudentSubsectionGrade.objects.get_or_create(
+                student=student,
+                course_id=course_id,
+                usage_key=section_descriptor.location,
+                defaults={'content_version': version},
+            )
+            subsection_grade.content_version = version
+            subsection_grade.set_scores(entries)
+            subsection_grade.save()
+    except IntegrityError:
+        # A concurrent request persisted the same subsection first; the scores
+        # were computed from the same state, so there is nothing left to do.
+        pass
+
+
 def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=None):
     """
     Return the score for a user on a problem, as a tuple (correct, total).
@@ -446,6 +998,7 @@ def get_score(course_id, user, problem_descriptor, module_creator, scores_cache=
         # These are not problems, and do not have a score
         return (None, None)
 
+    flush_student_module_writes()
     try:
         student_module = StudentModule.objects.get(
             student=user,
@@ -499,7 +1052,7 @@ def manual_transaction():
         transaction.commit()
 
 
-def iterate_grades_for(course_id, students):
+def iterate_grades_for(course_id, students, batch_size=None):
     """Given a course_id and an iterable of students (User), yield a tuple of:
 
     (student, gradeset, err_msg) for every student enrolled in the course.
@@ -516,6 +1069,9 @@ def iterate_grades_for(course_id, students):
     - grade_breakdown : A breakdown of the major components that
         make up the final grade. (For display)
     - raw_scores: contains scores for every graded module
+
+    If `batch_size` is given, students are graded `batch_size` at a time with
+    `bulk_grade`, in which case raw_scores are not included.
     """
     course = courses.get_course_by_id(course_id)
 
@@ -524,6 +1080,11 @@ def iterate_grades_for(course_id, students):
     # grading that student.
     request = RequestFactory().get('/')
 
+    if batch_size and not settings.GENERATE_PROFILE_SCORES:
+        for result in _iterate_bulk_grades_for(course, students, request, batch_size):
+            yield result
+        return
+
     for student in students:
         with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(course_id)]):
             try:
@@ -546,3 +1107,28 @@ def iterate_grades_for(course_id, students):
                     exc.message
                 )
                 yield student, {}, exc.message
+
+
+def _iterate_bulk_grades_for(course, students, request, batch_size):
+    """
+    Batched implementation of `iterate_grades_for`.
+    """
+    context = BulkGradingContext(course)
+    students = iter(students)
+    while True:
+        batch = list(islice(students, batch_size))
+        if not batch:
+            break
+
+        with dog_stats_api.timer('lms.grades.bulk_grade', tags=[u'action:{}'.format(course.id)]):
+            try:
+                results = bulk_grade(batch, request, context)
+            except Exception as exc:  # pylint: disable=broad-except
+                # Failing to load the batch's scores fails every student in it,
+                # but we keep marching on with the next batch.
+                log.exception('Cannot grade a batch of students in course %s: %s', course.id, exc.message)
+                results = {student.id: ({}, exc.message) for student in batch}
+
+        for student in batch:
+            gradeset, err_msg = results[student.id]
+            yield student, gradeset, err_msg
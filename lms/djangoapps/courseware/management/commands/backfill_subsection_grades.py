@@ -0,0 +1,63 @@
+"""
+A Django command that fills the persisted subsection grades for every student
+enrolled in a course, so that the first progress page view or grade report
+after enabling ENABLE_PERSISTENT_GRADES doesn't have to score everything.
+
+Existing rows are kept if they are still valid for the published content, and
+recomputed otherwise.
+"""
+
+from optparse import make_option
+from textwrap import dedent
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courseware.grades import iterate_grades_for
+from courseware.models import StudentSubsectionGrade, persistent_grades_enabled
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+from student.models import CourseEnrollment
+
+
+class Command(BaseCommand):
+    """
+    Compute and persist subsection grades for all students in a course.
+    """
+    args = "<course_id>"
+    help = dedent(__doc__).strip()
+    option_list = BaseCommand.option_list + (
+        make_option('--reset',
+                    action='store_true',
+                    default=False,
+                    help='Delete all persisted grades for the course before recomputing them'),
+    )
+
+    # Print an update after this many students
+    STATUS_INTERVAL = 500
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("course_id not specified")
+
+        if not persistent_grades_enabled():
+            raise CommandError("ENABLE_PERSISTENT_GRADES is not enabled")
+
+        try:
+            course_key = CourseKey.from_string(args[0])
+        except InvalidKeyError:
+            raise CommandError("Invalid course_id")
+
+        if options['reset']:
+            StudentSubsectionGrade.objects.filter(course_id=course_key).delete()
+
+        students = CourseEnrollment.users_enrolled_in(course_key).order_by('id')
+        total = students.count()
+        failed = 0
+        for count, (student, _gradeset, err_msg) in enumerate(iterate_grades_for(course_key, students), start=1):
+            if err_msg:
+                failed += 1
+                self.stderr.write(u"Could not grade {}: {}\n".format(student.username, err_msg))
+            if count % self.STATUS_INTERVAL == 0:
+                self.stdout.write(u"{}/{} students graded\n".format(count, total))
+
+        self.stdout.write(u"Done: {} students graded, {} failures\n".format(total, failed))
@@ -2,10 +2,17 @@
 Middleware for the courseware app
 """
 
+import logging
+
+from django.db import DatabaseError, transaction
+from django.http import HttpResponseServerError
 from django.shortcuts import redirect
 from django.core.urlresolvers import reverse
 
 from courseware.courses import UserNotEnrolled
+from courseware.model_data import begin_buffered_writes, end_buffered_writes
+
+log = logging.getLogger(__name__)
 
 
 class RedirectUnenrolledMiddleware(object):
@@ -22,3 +29,29 @@ class RedirectUnenrolledMiddleware(object):
                     args=[course_key.to_deprecated_string()]
                 )
             )
+
+
+class StudentModuleWriteBufferMiddleware(object):
+    """
+    Buffer the StudentModule writes made while handling a request, and write
+    them when the response goes out. This must come after TransactionMiddleware,
+    so that the writes are made in the request's transaction, before it commits.
+    """
+    def process_request(self, request):
+        begin_buffered_writes()
+
+    def process_exception(self, request, exception):
+        # The transaction is being rolled back, so drop the writes along with it
+        end_buffered_writes(discard=True)
+
+    def process_response(self, request, response):
+        try:
+            end_buffered_writes()
+        except DatabaseError:
+            # The handler has already run as if its writes succeeded, so the
+            # response it built can't be sent: roll back and fail the request
+            log.exception(u"Failed to write the buffered StudentModule writes for %s", request.path)
+            if transaction.is_managed():
+                transaction.rollback()
+            return HttpResponseServerError()
+        return response
@@ -2,11 +2,14 @@
 Classes to provide the LMS runtime data storage to XBlocks
 """
 
+import copy
 import json
-from collections import defaultdict
+import threading
+from collections import defaultdict, OrderedDict
 from itertools import chain
 from .models import (
     StudentModule,
+    StudentModuleHistory,
     XModuleUserStateSummaryField,
     XModuleStudentPrefsField,
     XModuleStudentInfoField
@@ -17,6 +20,7 @@ from opaque_keys.edx.keys import CourseKey, UsageKey
 
 from django.db import DatabaseError
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 from xblock.runtime import KeyValueStore
 from xblock.exceptions import KeyValueMultiSaveError, InvalidScopeError
@@ -46,7 +50,7 @@ class FieldDataCache(object):
     A cache of django model objects needed to supply the data
     for a module and its decendants
     """
-    def __init__(self, descriptors, course_id, user, select_for_update=False):
+    def __init__(self, descriptors, course_id, user, select_for_update=False, course_scoped=False):
         '''
         Find any courseware.models objects that are needed by any descriptor
         in descriptors. Attempts to minimize the number of queries to the database.
@@ -58,19 +62,49 @@ class FieldDataCache(object):
         course_id: The id of the current course
         user: The user for which to cache data
         select_for_update: True if rows should be locked until end of transaction
+        course_scoped: True to load all of the user's data in the course
+            instead of the data of `descriptors` (see `cache_for_course`)
         '''
         self.cache = {}
         self.descriptors = descriptors
         self.select_for_update = select_for_update
+        self.course_scoped = course_scoped
 
         assert isinstance(course_id, CourseKey)
         self.course_id = course_id
         self.user = user
 
+        # The usage ids whose user_state_summary fields are loaded, in course_scoped mode
+        self._summary_usage_ids = set()
+
         if user.is_authenticated():
-            for scope, fields in self._fields_to_cache().items():
-                for field_object in self._retrieve_fields(scope, fields):
-                    self.cache[self._cache_key_from_field_object(scope, field_object)] = field_object
+            if course_scoped:
+                scoped_field_objects = self._retrieve_course_fields()
+            else:
+                scoped_field_objects = (
+                    (scope, field_object)
+                    for scope, fields in self._fields_to_cache().items()
+                    for field_object in self._retrieve_fields(scope, fields)
+                )
+            for scope, field_object in scoped_field_objects:
+                self.cache[self._cache_key_from_field_object(scope, field_object)] = field_object
+
+    @classmethod
+    def cache_for_course(cls, course_id, user, select_for_update=False):
+        """
+        Return a FieldDataCache holding all of the data of `user` in the course,
+        which can be used for any module of the course.
+
+        Rather than walking the course's descriptors, this loads the user's
+        StudentModules in the course, and their preferences and info fields,
+        with one query each. The user_state_summary fields, which aren't per
+        user, are loaded for a block the first time one of them is looked up.
+
+        course_id: the course in the context of which we want StudentModules.
+        user: the django user for whom to load modules.
+        select_for_update: Flag indicating whether the rows should be locked until end of transaction
+        """
+        return cls([], course_id, user, select_for_update, course_scoped=True)
 
     @classmethod
     def cache_for_descriptor_descendents(cls, course_id, user, descriptor, depth=None,
@@ -145,6 +179,7 @@ class FieldDataCache(object):
         Queries the database for all of the fields in the specified scope
         """
         if scope == Scope.user_state:
+            flush_student_module_writes()
             return self._chunked_query(
                 StudentModule,
                 'module_state_key__in',
@@ -176,6 +211,30 @@ class FieldDataCache(object):
         else:
             return []
 
+    def _retrieve_course_fields(self):
+        """
+        Queries the database for all of the user's fields in the course, except
+        for the user_state_summary ones. Returns a list of (scope, field_object).
+        """
+        flush_student_module_writes()
+        queries = (
+            (Scope.user_state, self._query(StudentModule, course_id=self.course_id, student=self.user.pk)),
+            (Scope.preferences, self._query(XModuleStudentPrefsField, student=self.user.pk)),
+            (Scope.user_info, self._query(XModuleStudentInfoField, student=self.user.pk)),
+        )
+        return [(scope, field_object) for scope, query in queries for field_object in query]
+
+    def _retrieve_summary_fields(self, usage_id):
+        """
+        Load the user_state_summary fields of `usage_id` into the cache, unless
+        they already are. Used in course_scoped mode.
+        """
+        if usage_id in self._summary_usage_ids:
+            return
+        self._summary_usage_ids.add(usage_id)
+        for field_object in self._query(XModuleUserStateSummaryField, usage_id=usage_id):
+            self.cache[self._cache_key_from_field_object(Scope.user_state_summary, field_object)] = field_object
+
     def _fields_to_cache(self):
         """
         Returns a map of scopes to fields in that scope that should be cached
@@ -226,6 +285,9 @@ class FieldDataCache(object):
             # user we were constructed for.
             assert key.user_id == self.user.id
 
+        if self.course_scoped and key.scope == Scope.user_state_summary and self.user.is_authenticated():
+            self._retrieve_summary_fields(key.block_scope_id)
+
         return self.cache.get(self._cache_key_from_kvs_key(key))
 
     def find_or_create(self, key):
@@ -273,6 +335,106 @@ class FieldDataCache(object):
         return field_object
 
 
+def _load_state(student_module):
+    """
+    Return the deserialized `state` of `student_module`. The result is kept on
+    the object, so the JSON is only parsed again once `state` is replaced.
+    Callers must not modify the returned dict.
+    """
+    parsed = getattr(student_module, '_parsed_state', None)
+    if parsed is None or parsed[0] is not student_module.state:
+        parsed = (student_module.state, json.loads(student_module.state))
+        student_module._parsed_state = parsed  # pylint: disable=protected-access
+    return parsed[1]
+
+
+class StudentModuleWriteBuffer(object):
+    """
+    Collects the writes to StudentModules, so that however many times a
+    module is saved, it is written with a single UPDATE, and the history
+    entries of all the modules are written with a single INSERT.
+    """
+    def __init__(self):
+        # Maps the pk of each saved StudentModule to its latest saved instance
+        self.student_modules = OrderedDict()
+        self.history_entries = []
+
+    def save(self, student_module):
+        """
+        Record student_module as saved, along with the history entry that
+        saving it would have created.
+        """
+        # Set here what auto_now would have set, so that the history entry is
+        # timestamped with this save rather than with the flush.
+        student_module.modified = timezone.now()
+        self.student_modules[student_module.pk] = student_module
+        history_entry = StudentModuleHistory.entry_for(student_module)
+        if history_entry is not None:
+            self.history_entries.append(history_entry)
+
+    def flush(self):
+        """
+        Write the saved StudentModules and their history to the database.
+        """
+        student_modules, self.student_modules = self.student_modules, OrderedDict()
+        history_entries, self.history_entries = self.history_entries, []
+
+        for student_module in student_modules.itervalues():
+            StudentModule.objects.filter(pk=student_module.pk).update(
+                state=student_module.state,
+                grade=student_module.grade,
+                max_grade=student_module.max_grade,
+                done=student_module.done,
+                modified=student_module.modified,
+            )
+        if history_entries:
+            StudentModuleHistory.objects.bulk_create(history_entries)
+
+
+_write_buffer = threading.local()
+
+
+def begin_buffered_writes():
+    """
+    Start buffering the StudentModule writes made by this thread, until
+    `end_buffered_writes` is called.
+    """
+    _write_buffer.buffer = StudentModuleWriteBuffer()
+
+
+def end_buffered_writes(discard=False):
+    """
+    Stop buffering StudentModule writes, writing those that are buffered
+    to the database, unless `discard` is set.
+    """
+    write_buffer = getattr(_write_buffer, 'buffer', None)
+    _write_buffer.buffer = None
+    if write_buffer is not None and not discard:
+        write_buffer.flush()
+
+
+def flush_student_module_writes():
+    """
+    Write the buffered StudentModule writes to the database, if any, so that
+    queries see them.
+    """
+    write_buffer = getattr(_write_buffer, 'buffer', None)
+    if write_buffer is not None:
+        write_buffer.flush()
+
+
+def save_student_module(student_module):
+    """
+    Save student_module, or buffer the write if this thread is buffering
+    StudentModule writes.
+    """
+    write_buffer = getattr(_write_buffer, 'buffer', None)
+    if write_buffer is None or student_module.pk is None:
+        student_module.save()
+    else:
+        write_buffer.save(student_module)
+
+
 class DjangoKeyValueStore(KeyValueStore):
     """
     This KeyValueStore will read and write data in the following scopes to django models
@@ -310,7 +472,11 @@ class DjangoKeyValueStore(KeyValueStore):
             raise KeyError(key.field_name)
 
         if key.scope == Scope.user_state:
-            return json.loads(field_object.state)[key.field_name]
+            value = _load_state(field_object)[key.field_name]
+            # The parsed state is shared, don't hand out its mutable values
+            if isinstance(value, (dict, list)):
+                value = copy.deepcopy(value)
+            return value
         else:
             return json.loads(field_object.value)
 
@@ -345,7 +511,7 @@ class DjangoKeyValueStore(KeyValueStore):
 
             # Special case when scope is for the user state, because this scope saves fields in a single row
             if field.scope == Scope.user_state:
-                state = json.loads(field_object.state)
+                state = dict(_load_state(field_object))
                 state[field.field_name] = kv_dict[field]
                 field_object.state = json.dumps(state)
             else:
@@ -356,7 +522,10 @@ class DjangoKeyValueStore(KeyValueStore):
         for field_object in field_objects:
             try:
                 # Save the field object that we made above
-                field_object.save()
+                if isinstance(field_object, StudentModule):
+                    save_student_module(field_object)
+                else:
+                    field_object.save()
                 # If save is successful on this scope, add the saved fields to
                 # the list of successful saves
                 saved_fields.extend([field.field_name for field in field_objects[field_object]])
@@ -373,10 +542,10 @@ class DjangoKeyValueStore(KeyValueStore):
             raise KeyError(key.field_name)
 
         if key.scope == Scope.user_state:
-            state = json.loads(field_object.state)
+            state = dict(_load_state(field_object))
             del state[key.field_name]
             field_object.state = json.dumps(state)
-            field_object.save()
+            save_student_module(field_object)
         else:
             field_object.delete()
 
@@ -389,6 +558,6 @@ class DjangoKeyValueStore(KeyValueStore):
             return False
 
         if key.scope == Scope.user_state:
-            return key.field_name in json.loads(field_object.state)
+            return key.field_name in _load_state(field_object)
         else:
             return True
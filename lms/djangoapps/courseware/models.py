@@ -12,15 +12,37 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+import json
+
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 from xmodule_django.models import CourseKeyField, LocationKeyField
 
 
+def using_read_replica(queryset):
+    """
+    Return queryset, made to use the read replica database if there is one
+    in this environment.
+    """
+    if "read_replica" in settings.DATABASES:
+        return queryset.using("read_replica")
+    else:
+        return queryset
+
+
+def persistent_grades_enabled():
+    """
+    Return whether subsection grades are read from and written to the
+    StudentSubsectionGrade table. Randomly generated debugging scores are
+    never persisted.
+    """
+    return settings.FEATURES.get('ENABLE_PERSISTENT_GRADES', False) and not settings.GENERATE_PROFILE_SCORES
+
+
 class StudentModule(models.Model):
     """
     Keeps student state for a particular module in a particular course.
@@ -76,10 +98,7 @@ class StudentModule(models.Model):
             module_type='problem',
             grade__isnull=False
         )
-        if "read_replica" in settings.DATABASES:
-            return queryset.using("read_replica")
-        else:
-            return queryset
+        return using_read_replica(queryset)
 
     def __repr__(self):
         return 'StudentModule<%r>' % ({
@@ -113,6 +132,22 @@ class StudentModuleHistory(models.Model):
     grade = models.FloatField(null=True, blank=True)
     max_grade = models.FloatField(null=True, blank=True)
 
+    @classmethod
+    def entry_for(cls, student_module):
+        """
+        Returns an unsaved StudentModuleHistory entry recording the current
+        state of student_module, or None if its module_type is not one
+        that we save.
+        """
+        if student_module.module_type not in cls.HISTORY_SAVING_TYPES:
+            return None
+        return cls(student_module=student_module,
+                   version=None,
+                   created=student_module.modified,
+                   state=student_module.state,
+                   grade=student_module.grade,
+                   max_grade=student_module.max_grade)
+
     @receiver(post_save, sender=StudentModule)
     def save_history(sender, instance, **kwargs):  # pylint: disable=no-self-argument, unused-argument
         """
@@ -120,13 +155,8 @@ class StudentModuleHistory(models.Model):
         StudentModuleHistory entry if the module_type is one that
         we save.
         """
-        if instance.module_type in StudentModuleHistory.HISTORY_SAVING_TYPES:
-            history_entry = StudentModuleHistory(student_module=instance,
-                                                 version=None,
-                                                 created=instance.modified,
-                                                 state=instance.state,
-                                                 grade=instance.grade,
-                                                 max_grade=instance.max_grade)
+        history_entry = StudentModuleHistory.entry_for(instance)
+        if history_entry is not None:
             history_entry.save()
 
 
@@ -260,3 +290,147 @@ class OfflineComputedGradeLog(models.Model):
 
     def __unicode__(self):
         return "[OCGLog] %s: %s" % (self.course_id.to_deprecated_string(), self.created)  # pylint: disable=no-member
+
+
+class StudentSubsectionGrade(models.Model):
+    """
+    Persisted scores for a single subsection (sequential) of a course for one
+    student, so that grading does not have to re-score every problem.
+
+    `scores` holds the JSON-encoded list of per-problem scores in the order
+    they are yielded while walking the subsection, each entry being
+    [location, earned, possible, graded, display_name] with the problem
+    weight already applied. `content_version` records the subsection's
+    `subtree_edited_on` when the row was computed; a row whose version no
+    longer matches the published content is ignored and recomputed.
+    """
+    class Meta:
+        unique_together = (('student', 'course_id', 'usage_key'),)
+
+    student = models.ForeignKey(User, db_index=True)
+    course_id = CourseKeyField(max_length=255, db_index=True)
+    usage_key = LocationKeyField(max_length=255, db_index=True)
+
+    content_version = models.CharField(max_length=255)
+
+    # Totals over graded problems and over all problems, for reporting
+    earned_graded = models.FloatField(default=0.0)
+    possible_graded = models.FloatField(default=0.0)
+    earned_all = models.FloatField(default=0.0)
+    possible_all = models.FloatField(default=0.0)
+
+    scores = models.TextField(default='[]')
+
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
+
+    @classmethod
+    def grades_for_course(cls, student, course_id):
+        """
+        Return a dict mapping the stored form of each subsection usage_key
+        (its unicode value) to the StudentSubsectionGrade for every persisted
+        subsection grade of `student` in `course_id`, in a single query.
+        """
+        return {
+            unicode(subsection_grade.usage_key): subsection_grade
+            for subsection_grade in cls.objects.filter(student=student, course_id=course_id)
+        }
+
+    @classmethod
+    def update_problem_score(cls, student_id, course_id, subsection_key, problem_key, earned, possible, graded):
+        """
+        Patch the stored score of a single problem in an existing subsection
+        grade, and refresh the subsection totals.
+
+        `earned` and `possible` must already be weighted, and `graded` tells
+        whether the problem counts towards the graded totals. Nothing is done if
+        no grade has been persisted for the subsection yet, or if the problem
+        isn't part of the stored scores; the next read will fall back to a
+        full computation in that case.
+        """
+        try:
+            subsection_grade = cls.objects.get(
+                student_id=student_id, course_id=course_id, usage_key=subsection_key
+            )
+        except cls.DoesNotExist:
+            return
+
+        scores = subsection_grade.get_scores()
+        problem_id = problem_key.to_deprecated_string()
+        for entry in scores:
+            if entry[0] == problem_id:
+                entry[1] = earned
+                entry[2] = possible
+                entry[3] = graded
+                break
+        else:
+            # Unknown problem: the structure changed under us, force a recompute
+            subsection_grade.delete()
+            return
+
+        subsection_grade.set_scores(scores)
+        subsection_grade.save()
+
+    def get_scores(self):
+        """
+        Return the decoded list of per-problem score entries.
+        """
+        return json.loads(self.scores)
+
+    def set_scores(self, scores):
+        """
+        Store `scores`, a list of [location, earned, possible, graded,
+        display_name] entries, and recompute the subsection totals.
+        """
+        self.scores = json.dumps(scores)
+        self.earned_all = sum(entry[1] for entry in scores)
+        self.possible_all = sum(entry[2] for entry in scores)
+        self.earned_graded = sum(entry[1] for entry in scores if entry[3])
+        self.possible_graded = sum(entry[2] for entry in scores if entry[3])
+
+    def __unicode__(self):
+        return u"[StudentSubsectionGrade] {}: {} {} = {}/{}".format(
+            self.student_id, self.course_id, self.usage_key, self.earned_graded, self.possible_graded
+        )
+
+
+class CourseAnswerDistribution(models.Model):
+    """
+    The answers submitted to the problems of a course, counted over the
+    StudentModules modified before `computed_through`. An incremental run of
+    `courseware.grades.answer_distributions` only counts the answers of the
+    StudentModules modified since, and updates this.
+
+    `counts` holds the JSON-encoded counts, as a dict of
+    {problem usage_key: {problem part id: {answer: count}}}.
+    """
+    course_id = CourseKeyField(max_length=255, unique=True)
+    computed_through = models.DateTimeField()
+    counts = models.TextField(default='{}')
+
+    modified = models.DateTimeField(auto_now=True)
+
+    def __unicode__(self):
+        return u"[CourseAnswerDistribution] {}: {}".format(self.course_id, self.computed_through)
+
+
+@receiver(post_delete, sender=StudentModule)
+def invalidate_answer_distribution(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    An incremental count can't tell which answers of a deleted StudentModule it
+    counted, so drop the stored counts for the course, to be counted afresh.
+    """
+    if instance.module_type == 'problem':
+        CourseAnswerDistribution.objects.filter(course_id=instance.course_id).delete()
+
+
+@receiver(post_delete, sender=StudentModule)
+def invalidate_subsection_grades(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Deleting student state (e.g. an instructor resetting a problem) can change
+    any subsection score for the student, so drop their persisted grades for
+    the course and let them be recomputed on the next read.
+    """
+    StudentSubsectionGrade.objects.filter(
+        student_id=instance.student_id, course_id=instance.course_id
+    ).delete()
@@ -20,7 +20,8 @@ from django.views.decorators.csrf import csrf_exempt
 from capa.xqueue_interface import XQueueInterface
 from courseware.access import has_access, get_user_role
 from courseware.masquerade import setup_masquerade
-from courseware.model_data import FieldDataCache, DjangoKeyValueStore
+from courseware.model_data import FieldDataCache, DjangoKeyValueStore, save_student_module
+from courseware.models import StudentSubsectionGrade, persistent_grades_enabled
 from lms.lib.xblock.field_data import LmsFieldData
 from lms.lib.xblock.runtime import LmsModuleSystem, unquote_slashes, quote_slashes
 from edxmako.shortcuts import render_to_string
@@ -40,8 +41,6 @@ from xmodule.modulestore.django import modulestore, ModuleI18nService
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.util.duedate import get_extended_due_date
 from xmodule_modifiers import (
-    replace_course_urls,
-    replace_jump_to_id_urls,
     replace_static_urls,
     add_staff_markup,
     wrap_xblock,
@@ -360,7 +359,10 @@ def get_module_system_for_user(user, field_data_cache,
         student_module.grade = event.get('value')
         student_module.max_grade = event.get('max_value')
         # Save all changes to the underlying KeyValueStore
-        student_module.save()
+        save_student_module(student_module)
+
+        if persistent_grades_enabled():
+            update_persisted_subsection_grade(descriptor, user_id, course_id, student_module)
 
         # Bin score into range and increment stats
         score_bucket = get_score_bucket(student_module.grade, student_module.max_grade)
@@ -454,28 +456,26 @@ def get_module_system_for_user(user, field_data_cache,
     # prefix is going to have to be specific to the module, not the directory
     # that the xml was loaded from
 
-    # Rewrite urls beginning in /static to point to course-specific content
-    block_wrappers.append(partial(
-        replace_static_urls,
-        getattr(descriptor, 'data_dir', None),
-        course_id=course_id,
-        static_asset_path=static_asset_path or descriptor.static_asset_path
-    ))
-
-    # Allow URLs of the form '/course/' refer to the root of multicourse directory
-    #   hierarchy of this course
-    block_wrappers.append(partial(replace_course_urls, course_id))
-
-    # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
-    # is an improvement over the /course/... format for studio authored courses,
+    # Rewrite urls beginning in /static to point to course-specific content.
+    # In the same pass, allow URLs of the form '/course/' refer to the root of multicourse
+    # directory hierarchy of this course, and rewrite intra-courseware links (/jump_to_id/<id>).
+    # This format is an improvement over the /course/... format for studio authored courses,
     # because it is agnostic to course-hierarchy.
     # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
     # function, we just need to specify something to get the reverse() to work.
-    block_wrappers.append(partial(
-        replace_jump_to_id_urls,
-        course_id,
-        reverse('jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''}),
-    ))
+    # These don't depend on the user, so they are applied before the other wrappers, and
+    # the rendered student_view of blocks which don't depend on the user either is cached
+    # with them applied; see LmsModuleSystem.
+    user_independent_wrappers = [partial(
+        replace_static_urls,
+        getattr(descriptor, 'data_dir', None),
+        course_id=course_id,
+        static_asset_path=static_asset_path or descriptor.static_asset_path,
+        replace_course_urls=True,
+        jump_to_id_base_url=reverse(
+            'jump_to_id', kwargs={'course_id': course_id.to_deprecated_string(), 'module_id': ''}
+        ),
+    )]
 
     if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
         if has_access(user, 'staff', descriptor, course_id):
@@ -537,6 +537,7 @@ def get_module_system_for_user(user, field_data_cache,
         # TODO: When we merge the descriptor and module systems, we can stop reaching into the mixologist (cpennington)
         mixins=descriptor.runtime.mixologist._mixins,  # pylint: disable=protected-access
         wrappers=block_wrappers,
+        user_independent_wrappers=user_independent_wrappers,
         get_real_user=user_by_anonymous_id,
         services={
             'i18n': ModuleI18nService(),
@@ -805,6 +806,39 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, user):
     return webob_to_django_response(resp)
 
 
+def update_persisted_subsection_grade(descriptor, user_id, course_id, student_module):
+    """
+    Patch the persisted grade of the subsection (sequential) containing
+    `descriptor` with the score just recorded in `student_module`, weighting
+    it the same way `courseware.grades.get_score` does.
+    """
+    subsection = descriptor.get_parent()
+    while subsection is not None and subsection.category != 'sequential':
+        subsection = subsection.get_parent()
+    if subsection is None:
+        return
+
+    if student_module.max_grade is None:
+        # The max score is only known by instantiating the problem, so let the
+        # next read recompute the whole subsection.
+        StudentSubsectionGrade.objects.filter(
+            student_id=user_id, course_id=course_id, usage_key=subsection.location
+        ).delete()
+        return
+
+    correct = float(student_module.grade) if student_module.grade is not None else 0.0
+    total = student_module.max_grade
+    weight = getattr(descriptor, 'weight', None)
+    if weight is not None and total != 0:
+        correct = correct * weight / total
+        total = weight
+
+    StudentSubsectionGrade.update_problem_score(
+        user_id, course_id, subsection.location, descriptor.location,
+        correct, total, descriptor.graded and total > 0
+    )
+
+
 def get_score_bucket(grade, max_grade):
     """
     Function to split arbitrary score ranges into 3 buckets.
@@ -106,6 +106,7 @@ class AccessTestCase(TestCase):
         # TODO: override DISABLE_START_DATES and test the start date branch of the method
         user = Mock()
         descriptor = Mock()
+        descriptor._class_tags = {}  # Needed for detached check in load_access_fields
 
         # Always returns true because DISABLE_START_DATES is set in test.py
         self.assertTrue(access._has_access_descriptor(user, 'load', descriptor))
@@ -157,6 +158,32 @@ class AccessTestCase(TestCase):
         mock_unit.visible_to_staff_only = False
         verify_access(False)
 
+    @patch.dict('django.conf.settings.FEATURES', {'DISABLE_START_DATES': False})
+    def test_can_load_from_fields(self):
+        """
+        Tests the start date and beta tester checks, from the fields kept for a descriptor.
+        """
+        mock_unit = Mock()
+        mock_unit._class_tags = {}
+        mock_unit.visible_to_staff_only = False
+        mock_unit.start = datetime.datetime.now(pytz.utc) + datetime.timedelta(days=1)
+        mock_unit.days_early_for_beta = 2
+        fields = access.load_access_fields(mock_unit)
+
+        def can_load(is_staff, is_beta_tester):
+            """ Check access with fixed answers to the role checks """
+            return access.can_load_from_fields(self.student, fields, lambda: is_staff, lambda: is_beta_tester)
+
+        self.assertFalse(can_load(False, False))
+        self.assertTrue(can_load(False, True))
+        self.assertTrue(can_load(True, False))
+
+        # Detached blocks ignore their start date
+        mock_unit._class_tags = {'detached'}
+        self.assertTrue(access.can_load_from_fields(
+            self.student, access.load_access_fields(mock_unit), lambda: False, lambda: False
+        ))
+
     def test__has_access_course_desc_can_enroll(self):
         yesterday = datetime.datetime.now(pytz.utc) - datetime.timedelta(days=1)
         tomorrow = datetime.datetime.now(pytz.utc) + datetime.timedelta(days=1)
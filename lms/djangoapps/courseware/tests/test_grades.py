@@ -2,14 +2,20 @@
 Test grade calculation.
 """
 from django.http import Http404
+from django.test.client import RequestFactory
 from django.test.utils import override_settings
-from mock import patch
+from mock import MagicMock, patch
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 
+from courseware import grades as grades_module
+from courseware import module_render
 from courseware.grades import grade, iterate_grades_for
+from courseware.model_data import FieldDataCache
+from courseware.models import StudentModule, StudentSubsectionGrade
+from courseware.tests.factories import StudentModuleFactory
 from xmodule.modulestore.tests.django_utils import TEST_DATA_MOCK_MODULESTORE
 from student.tests.factories import UserFactory
-from xmodule.modulestore.tests.factories import CourseFactory
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 
 
@@ -120,3 +126,152 @@ class TestGradeIteration(ModuleStoreTestCase):
                 students_to_errors[student] = err_msg
 
         return students_to_gradesets, students_to_errors
+
+
+@override_settings(MODULESTORE=TEST_DATA_MOCK_MODULESTORE)
+@patch.dict('django.conf.settings.FEATURES', {'ENABLE_PERSISTENT_GRADES': True})
+class TestPersistentGrades(ModuleStoreTestCase):
+    """
+    Test that subsection grades are persisted and read back by grade().
+    """
+    def setUp(self):
+        super(TestPersistentGrades, self).setUp()
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent_location=self.course.location, category='chapter')
+        self.section = ItemFactory.create(
+            parent_location=chapter.location,
+            category='sequential',
+            metadata={'graded': True, 'format': 'Homework'}
+        )
+        self.problem = ItemFactory.create(parent_location=self.section.location, category='problem')
+        self.course = self.store.get_course(self.course.id)
+        self.student = UserFactory.create()
+        self.request = RequestFactory().get('/')
+        self.request.user = self.student
+        self.request.session = {}
+
+    def _answer(self, grade_value, max_grade):
+        """Record a score for the student on the problem."""
+        return StudentModuleFactory.create(
+            student=self.student,
+            course_id=self.course.id,
+            module_state_key=self.problem.location,
+            grade=grade_value,
+            max_grade=max_grade,
+        )
+
+    def test_untouched_section_not_persisted(self):
+        grade(self.student, self.request, self.course)
+        self.assertFalse(StudentSubsectionGrade.objects.exists())
+
+    def test_grade_persists_and_reads_back(self):
+        self._answer(1, 2)
+        first = grade(self.student, self.request, self.course, keep_raw_scores=True)
+        subsection_grade = StudentSubsectionGrade.objects.get(student=self.student, usage_key=self.section.location)
+        self.assertEqual(subsection_grade.earned_graded, 1)
+        self.assertEqual(subsection_grade.possible_graded, 2)
+
+        # Changing the persisted row proves the next grade() reads from it
+        StudentSubsectionGrade.update_problem_score(
+            self.student.id, self.course.id, self.section.location, self.problem.location, 2, 2, True
+        )
+        second = grade(self.student, self.request, self.course, keep_raw_scores=True)
+        self.assertEqual(first['raw_scores'][0].earned, 1)
+        self.assertEqual(second['raw_scores'][0].earned, 2)
+        self.assertGreater(second['percent'], first['percent'])
+
+    def test_stale_version_is_recomputed(self):
+        self._answer(1, 2)
+        grade(self.student, self.request, self.course)
+        StudentSubsectionGrade.objects.update(content_version='stale', scores='[]')
+        result = grade(self.student, self.request, self.course, keep_raw_scores=True)
+        self.assertEqual(result['raw_scores'][0].earned, 1)
+        self.assertNotEqual(StudentSubsectionGrade.objects.get().content_version, 'stale')
+
+    def test_unknown_problem_drops_row(self):
+        self._answer(1, 2)
+        grade(self.student, self.request, self.course)
+        StudentSubsectionGrade.update_problem_score(
+            self.student.id, self.course.id, self.section.location,
+            self.course.id.make_usage_key('problem', 'missing'), 1, 1, True
+        )
+        self.assertFalse(StudentSubsectionGrade.objects.exists())
+
+    def test_grade_event_updates_persisted_grade(self):
+        self._answer(1, 2)
+        grade(self.student, self.request, self.course)
+
+        mock_request = MagicMock()
+        mock_request.user = self.student
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(self.course.id, self.student, self.course)
+        module = module_render.get_module(self.student, mock_request, self.problem.location, field_data_cache)._xmodule
+        module.system.publish(module, 'grade', {'value': 2, 'max_value': 2, 'user_id': self.student.id})
+
+        subsection_grade = StudentSubsectionGrade.objects.get(student=self.student, usage_key=self.section.location)
+        self.assertEqual(subsection_grade.earned_graded, 2)
+        result = grade(self.student, self.request, self.course, keep_raw_scores=True)
+        self.assertEqual(result['raw_scores'][0].earned, 2)
+
+    def test_deleting_state_invalidates(self):
+        student_module = self._answer(1, 2)
+        grade(self.student, self.request, self.course)
+        self.assertTrue(StudentSubsectionGrade.objects.exists())
+        StudentModule.objects.get(id=student_module.id).delete()
+        self.assertFalse(StudentSubsectionGrade.objects.exists())
+
+
+@override_settings(MODULESTORE=TEST_DATA_MOCK_MODULESTORE)
+class TestBulkGrading(ModuleStoreTestCase):
+    """
+    Test that batched grading gives the same results as grading one student
+    at a time.
+    """
+    def setUp(self):
+        super(TestBulkGrading, self).setUp()
+        course = CourseFactory.create()
+        chapter = ItemFactory.create(parent_location=course.location, category='chapter')
+        homework = ItemFactory.create(
+            parent_location=chapter.location,
+            category='sequential',
+            metadata={'graded': True, 'format': 'Homework'}
+        )
+        self.problems = [
+            ItemFactory.create(parent_location=homework.location, category='problem'),
+            ItemFactory.create(parent_location=homework.location, category='problem'),
+        ]
+        self.course = self.store.get_course(course.id)
+        self.students = [UserFactory.create() for _ in range(5)]
+        # Give the students an increasing number of points on the first problem
+        for earned, student in enumerate(self.students[1:]):
+            StudentModuleFactory.create(
+                student=student,
+                course_id=self.course.id,
+                module_state_key=self.problems[0].location,
+                grade=earned,
+                max_grade=3,
+            )
+
+    def test_bulk_matches_individual(self):
+        individual = list(iterate_grades_for(self.course.id, self.students))
+        bulk = list(iterate_grades_for(self.course.id, self.students, batch_size=2))
+        self.assertEqual([student for student, _, _ in bulk], self.students)
+        for (_, expected, _), (_, actual, err_msg) in zip(individual, bulk):
+            self.assertEqual(err_msg, "")
+            self.assertEqual(actual['percent'], expected['percent'])
+            self.assertEqual(actual['grade'], expected['grade'])
+            self.assertEqual(actual['section_breakdown'], expected['section_breakdown'])
+
+    def test_student_error_does_not_fail_batch(self):
+        def _grade_student_with_errors(student, *args):
+            """Fail for the second student only."""
+            if student == self.students[1]:
+                raise Exception("I don't like {}".format(student.username))
+            return original(student, *args)
+
+        original = grades_module._bulk_grade_student
+        with patch('courseware.grades._bulk_grade_student', _grade_student_with_errors):
+            results = list(iterate_grades_for(self.course.id, self.students, batch_size=3))
+
+        self.assertEqual(len(results), 5)
+        errors = [err_msg for _, _, err_msg in results if err_msg]
+        self.assertEqual(errors, ["I don't like {}".format(self.students[1].username)])
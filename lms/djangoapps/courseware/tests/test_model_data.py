@@ -7,7 +7,9 @@ from functools import partial
 
 from courseware.model_data import DjangoKeyValueStore
 from courseware.model_data import InvalidScopeError, FieldDataCache
-from courseware.models import StudentModule
+from courseware.model_data import begin_buffered_writes, end_buffered_writes
+from courseware.middleware import StudentModuleWriteBufferMiddleware
+from courseware.models import StudentModule, StudentModuleHistory
 from courseware.models import XModuleStudentInfoField, XModuleStudentPrefsField
 
 from student.tests.factories import UserFactory
@@ -176,6 +178,57 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
         self.assertEquals(len(exception_context.exception.saved_field_names), 0)
 
 
+class TestBufferedStudentModuleStorage(TestCase):
+    """Tests for user_state storage while StudentModule writes are buffered"""
+
+    def setUp(self):
+        student_module = StudentModuleFactory(state=json.dumps({'a_field': 'a_value'}))
+        self.user = student_module.student
+        self.field_data_cache = FieldDataCache([mock_descriptor([mock_field(Scope.user_state, 'a_field')])], course_id, self.user)
+        self.kvs = DjangoKeyValueStore(self.field_data_cache)
+        begin_buffered_writes()
+        self.addCleanup(end_buffered_writes, discard=True)
+
+    def test_writes_coalesced(self):
+        "Test that the buffered writes to a StudentModule are made with one UPDATE, and one INSERT of its history"
+        with self.assertNumQueries(0):
+            self.kvs.set(user_state_key('a_field'), 'new_value')
+            self.kvs.set_many({user_state_key('b_field'): 'b_value', user_state_key('c_field'): 'c_value'})
+            self.kvs.delete(user_state_key('c_field'))
+        self.assertEquals({'a_field': 'a_value'}, json.loads(StudentModule.objects.get().state))
+
+        history_count = StudentModuleHistory.objects.count()
+        with self.assertNumQueries(2):
+            end_buffered_writes()
+        self.assertEquals({'a_field': 'new_value', 'b_field': 'b_value'}, json.loads(StudentModule.objects.get().state))
+        history = StudentModuleHistory.objects.order_by('id')[history_count:]
+        self.assertEquals(
+            [{'a_field': 'new_value'}, {'a_field': 'new_value', 'b_field': 'b_value', 'c_field': 'c_value'},
+             {'a_field': 'new_value', 'b_field': 'b_value'}],
+            [json.loads(entry.state) for entry in history]
+        )
+
+    def test_writes_discarded(self):
+        "Test that discarded writes don't reach the database"
+        self.kvs.set(user_state_key('a_field'), 'new_value')
+        end_buffered_writes(discard=True)
+        self.assertEquals({'a_field': 'a_value'}, json.loads(StudentModule.objects.get().state))
+
+    def test_writes_flushed_before_query(self):
+        "Test that a new FieldDataCache sees the buffered writes"
+        self.kvs.set(user_state_key('a_field'), 'new_value')
+        field_data_cache = FieldDataCache.cache_for_course(course_id, self.user)
+        self.assertEquals('new_value', DjangoKeyValueStore(field_data_cache).get(user_state_key('a_field')))
+
+    def test_failed_flush_fails_response(self):
+        "Test that a database error writing the buffered writes turns the response into a 500"
+        self.kvs.set(user_state_key('a_field'), 'new_value')
+        request = Mock(path='/courses/')
+        with patch('courseware.model_data.StudentModuleWriteBuffer.flush', side_effect=DatabaseError):
+            response = StudentModuleWriteBufferMiddleware().process_response(request, Mock(status_code=200))
+        self.assertEquals(500, response.status_code)
+
+
 class TestMissingStudentModule(TestCase):
     def setUp(self):
         self.user = UserFactory.create(username='user')
@@ -338,3 +391,67 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+class CourseScopedMixin(object):
+    """
+    Mixin running the storage tests with a FieldDataCache.cache_for_course
+    instead of one built for the mock descriptor.
+    """
+    def setUp(self):
+        super(CourseScopedMixin, self).setUp()
+        self.field_data_cache = FieldDataCache.cache_for_course(course_id, self.user)
+        self.kvs = DjangoKeyValueStore(self.field_data_cache)
+
+
+class TestCourseScopedStudentModuleStorage(CourseScopedMixin, TestStudentModuleStorage):
+    """Tests for user_state storage with a course scoped FieldDataCache"""
+
+    def test_single_query_per_table(self):
+        "Test that the user's fields are loaded with one query per table"
+        with self.assertNumQueries(3):
+            field_data_cache = FieldDataCache.cache_for_course(course_id, self.user)
+        kvs = DjangoKeyValueStore(field_data_cache)
+        with self.assertNumQueries(0):
+            self.assertEquals('a_value', kvs.get(user_state_key('a_field')))
+            self.assertFalse(kvs.has(prefs_key('a_pref')))
+            self.assertFalse(kvs.has(user_info_key('some_info')))
+
+    def test_state_parsed_once(self):
+        "Test that the state of a StudentModule is only deserialized once"
+        with patch('courseware.model_data.json.loads', wraps=json.loads) as mock_loads:
+            self.kvs.get(user_state_key('a_field'))
+            self.kvs.get(user_state_key('b_field'))
+            self.assertTrue(self.kvs.has(user_state_key('a_field')))
+        self.assertEquals(mock_loads.call_count, 1)
+
+    def test_get_returns_copies(self):
+        "Test that changing a value returned by get doesn't change the cached state"
+        self.kvs.set(user_state_key('a_list'), [1, 2])
+        self.kvs.get(user_state_key('a_list')).append(3)
+        self.assertEquals([1, 2], self.kvs.get(user_state_key('a_list')))
+
+
+class TestCourseScopedMissingStudentModule(CourseScopedMixin, TestMissingStudentModule):
+    """Tests for missing StudentModules with a course scoped FieldDataCache"""
+    pass
+
+
+class TestCourseScopedUserStateSummaryStorage(CourseScopedMixin, TestUserStateSummaryStorage):
+    """Tests for UserStateSummaryStorage with a course scoped FieldDataCache"""
+
+    def test_summary_fields_loaded_once(self):
+        "Test that the user_state_summary fields of a block are loaded by the first lookup only"
+        with self.assertNumQueries(1):
+            self.assertTrue(self.kvs.has(self.key_factory('existing_field')))
+            self.assertFalse(self.kvs.has(self.key_factory('missing_field')))
+
+
+class TestCourseScopedStudentPrefsStorage(CourseScopedMixin, TestStudentPrefsStorage):
+    """Tests for StudentPrefStorage with a course scoped FieldDataCache"""
+    pass
+
+
+class TestCourseScopedStudentInfoStorage(CourseScopedMixin, TestStudentInfoStorage):
+    """Tests for StudentInfoStorage with a course scoped FieldDataCache"""
+    pass
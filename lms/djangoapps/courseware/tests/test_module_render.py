@@ -569,6 +569,47 @@ class TestHtmlModifiers(ModuleStoreTestCase):
             result_fragment.content
         )
 
+    def test_fragment_cached(self):
+        """
+        The html's student_view is rendered once, and shared between users
+        """
+        other_user = UserFactory.create()
+        with patch('xmodule.html_module.HtmlModule.get_html', return_value=self.rewrite_link) as mock_get_html:
+            for user in (self.user, other_user, self.user):
+                self.request.user = user
+                module = render.get_module(
+                    user,
+                    self.request,
+                    self.location,
+                    self.field_data_cache,
+                )
+                result_fragment = module.render(STUDENT_VIEW)
+                self.assertIn('/c4x/{org}/{course}/asset/foo_content'.format(
+                    org=self.course.location.org,
+                    course=self.course.location.course,
+                ), result_fragment.content)
+                self.assertIn('xmodule_HtmlModule', result_fragment.content)
+
+        self.assertEqual(mock_get_html.call_count, 1)
+
+    def test_fragment_not_cached_with_user_id(self):
+        """
+        Html that includes the user's id is rendered for each user
+        """
+        descriptor = ItemFactory.create(category='html', data='<p>%%USER_ID%%</p>')
+        for user in (self.user, UserFactory.create()):
+            self.request.user = user
+            module = render.get_module(
+                user,
+                self.request,
+                descriptor.location,
+                self.field_data_cache,
+            )
+            self.assertIn(
+                anonymous_id_for_user(user, None),
+                module.render(STUDENT_VIEW).content
+            )
+
 
 class ViewInStudioTest(ModuleStoreTestCase):
     """Tests for the 'View in Studio' link visiblity."""
@@ -4,6 +4,7 @@ Integration tests for submitting problem responses and getting grades.
 """
 import json
 import os
+from datetime import timedelta
 from textwrap import dedent
 
 from django.conf import settings
@@ -18,7 +19,7 @@ from capa.tests.response_xml_factory import (
     CodeResponseXMLFactory,
 )
 from courseware import grades
-from courseware.models import StudentModule
+from courseware.models import CourseAnswerDistribution, StudentModule
 from courseware.tests.helpers import LoginEnrollmentTestCase
 from xmodule.modulestore.tests.django_utils import TEST_DATA_MOCK_MODULESTORE
 from lms.lib.xblock.runtime import quote_slashes
@@ -1048,6 +1049,60 @@ class TestAnswerDistributions(TestSubmittingProblems):
                 }
             )
 
+    @patch('courseware.grades.ANSWER_DISTRIBUTION_LAG', timedelta(0))
+    def test_incremental(self):
+        self.submit_question_answer('p1', {'2_1': u'Incorrect'})
+        self.submit_question_answer('p2', {'2_1': u'Correct'})
+        self.assertEqual(
+            grades.answer_distributions(self.course.id, incremental=True),
+            {
+                ('p1', 'p1', '{}_2_1'.format(self.p1_html_id)): {
+                    'Incorrect': 1
+                },
+                ('p2', 'p2', '{}_2_1'.format(self.p2_html_id)): {
+                    'Correct': 1
+                }
+            }
+        )
+
+        # Only p1 is counted again, without its previous answer
+        self.reset_question_answer('p1')
+        self.submit_question_answer('p1', {'2_1': u'Correct'})
+        distributions = grades.answer_distributions(self.course.id, incremental=True)
+        self.assertEqual(
+            distributions,
+            {
+                ('p1', 'p1', '{}_2_1'.format(self.p1_html_id)): {
+                    'Correct': 1
+                },
+                ('p2', 'p2', '{}_2_1'.format(self.p2_html_id)): {
+                    'Correct': 1
+                }
+            }
+        )
+        self.assertEqual(distributions, grades.answer_distributions(self.course.id))
+
+    @patch('courseware.grades.ANSWER_DISTRIBUTION_LAG', timedelta(0))
+    def test_incremental_deleted_module(self):
+        self.submit_question_answer('p1', {'2_1': u'Correct'})
+        self.submit_question_answer('p2', {'2_1': u'Correct'})
+        grades.answer_distributions(self.course.id, incremental=True)
+
+        # Deleting state drops the stored counts, which are counted afresh
+        StudentModule.objects.get(
+            course_id=self.course.id,
+            module_state_key=self.problem_location('p2'),
+        ).delete()
+        self.assertFalse(CourseAnswerDistribution.objects.filter(course_id=self.course.id).exists())
+        self.assertEqual(
+            grades.answer_distributions(self.course.id, incremental=True),
+            {
+                ('p1', 'p1', '{}_2_1'.format(self.p1_html_id)): {
+                    'Correct': 1
+                },
+            }
+        )
+
 
 class TestConditionalContent(TestSubmittingProblems):
     """
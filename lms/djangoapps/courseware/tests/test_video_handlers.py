@@ -10,6 +10,8 @@ from datetime import timedelta
 from webob import Request
 from mock import MagicMock, Mock
 
+from django.core.cache import cache
+
 from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
@@ -218,6 +220,17 @@ class TestTranscriptAvailableTranslationsDispatch(TestVideo):
         response = self.item.transcript(request=request, dispatch='available_translations')
         self.assertEqual(json.loads(response.body), ['en', 'uk'])
 
+    def test_available_translations_one_query(self):
+        _upload_file(self.non_en_file, self.item_descriptor.location, os.path.split(self.non_en_file.name)[1])
+        self.item.sub = 'not_uploaded'
+
+        store = contentstore()
+        with patch.object(store, 'find_last_modified', wraps=store.find_last_modified) as find_last_modified:
+            with patch.object(store, 'find') as find:
+                self.assertEqual(self.item.available_translations(), ['uk'])
+        self.assertEqual(find_last_modified.call_count, 1)
+        self.assertFalse(find.called)
+
 
 class TestTranscriptDownloadDispatch(TestVideo):
     """
@@ -665,6 +678,30 @@ class TestGetTranscript(TestVideo):
         self.assertEqual(filename[:-4], self.item.sub)
         self.assertEqual(mime_type, 'application/x-subrip; charset=utf-8')
 
+    def test_converted_transcript_cached(self):
+        cache.clear()
+        self.item.runtime.cache = cache
+        good_sjson = _create_file(content=json.dumps(
+            {"start": [270, 2720], "end": [2720, 5430], "text": ["Hi, welcome to Edx.", "Bye."]}
+        ))
+        _upload_sjson_file(good_sjson, self.item.location)
+        self.item.sub = _get_subs_id(good_sjson.name)
+
+        srt_text, __, __ = self.item.get_transcript()
+        txt_text, __, __ = self.item.get_transcript('txt')
+        self.assertNotEqual(srt_text, txt_text)
+
+        # Once converted, transcripts are served from the cache, per format:
+        with patch('xmodule.video_module.transcripts_utils.Transcript.convert') as convert:
+            self.assertEqual(self.item.get_transcript()[0], srt_text)
+            self.assertEqual(self.item.get_transcript('txt')[0], txt_text)
+        self.assertFalse(convert.called)
+
+        # but not once the transcript is gone:
+        _clear_assets(self.item.location)
+        with self.assertRaises(NotFoundError):
+            self.item.get_transcript()
+
     def test_good_txt_transcript(self):
         good_sjson = _create_file(content=textwrap.dedent("""\
                 {
@@ -345,8 +345,9 @@ def _index_bulk_op(request, user, course_key, chapter, section, position):
     masq = setup_masquerade(request, staff_access)
 
     try:
-        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-            course_key, user, course, depth=2)
+        # All of the user's state in the course, for the course, the accordion
+        # and the section alike.
+        field_data_cache = FieldDataCache.cache_for_course(course_key, user)
 
         course_module = get_module_for_descriptor(user, request, course, field_data_cache, course_key)
         if course_module is None:
@@ -437,11 +438,6 @@ def _index_bulk_op(request, user, course_key, chapter, section, position):
             # which will prefetch the children more efficiently than doing a recursive load
             section_descriptor = modulestore().get_item(section_descriptor.location, depth=None)
 
-            # Load all descendants of the section, because we're going to display its
-            # html, which in general will need all of its children
-            section_field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-                course_key, user, section_descriptor, depth=None)
-
             # Verify that position a string is in fact an int
             if position is not None:
                 try:
@@ -453,7 +449,7 @@ def _index_bulk_op(request, user, course_key, chapter, section, position):
                 request.user,
                 request,
                 section_descriptor,
-                section_field_data_cache,
+                field_data_cache,
                 course_key,
                 position
             )
@@ -916,9 +912,11 @@ def _progress(request, course_key, student_id):
     # additional DB lookup (this kills the Progress page in particular).
     student = User.objects.prefetch_related("groups").get(id=student.id)
 
-    courseware_summary = grades.progress_summary(student, request, course)
+    # Share the student's state in the course between the summary and the grade
+    field_data_cache = FieldDataCache.cache_for_course(course_key, student)
+    courseware_summary = grades.progress_summary(student, request, course, field_data_cache=field_data_cache)
     studio_url = get_studio_url(course, 'settings/grading')
-    grade_summary = grades.grade(student, request, course)
+    grade_summary = grades.grade(student, request, course, field_data_cache=field_data_cache)
 
     if courseware_summary is None:
         #This means the student didn't have access to the course (which the instructor requested)
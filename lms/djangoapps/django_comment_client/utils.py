@@ -4,7 +4,9 @@ from collections import defaultdict
 import logging
 from datetime import datetime
 
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.db import connection
 from django.http import HttpResponse
@@ -73,13 +75,28 @@ def _get_discussion_modules(course):
 
 
 def get_discussion_id_map(course):
+    """
+    Return a dict mapping the course's discussion ids to the locations and titles of their
+    discussion modules. Finding them means loading every discussion in the course, and every
+    forum page needs it, so it is cached for COMMENTS_SERVICE_CACHE_TIMEOUT seconds.
+    """
+    cache_timeout = getattr(settings, "COMMENTS_SERVICE_CACHE_TIMEOUT", 0)
+    cache_key = u'django_comment_client.discussion_id_map.{}'.format(course.id)
+    if cache_timeout:
+        id_map = cache.get(cache_key)
+        if id_map is not None:
+            return id_map
+
     def get_entry(module):
         discussion_id = module.discussion_id
         title = module.discussion_target
         last_category = module.discussion_category.split("/")[-1].strip()
         return (discussion_id, {"location": module.location, "title": last_category + " / " + title})
 
-    return dict(map(get_entry, _get_discussion_modules(course)))
+    id_map = dict(map(get_entry, _get_discussion_modules(course)))
+    if cache_timeout:
+        cache.set(cache_key, id_map, cache_timeout)
+    return id_map
 
 
 def _filter_unstarted_categories(category_map):
@@ -1726,7 +1726,10 @@ def get_answers_distribution(request, course_key):
     """
     course = get_course_with_access(request.user, 'staff', course_key)
 
-    dist = grades.answer_distributions(course.id)
+    dist = grades.answer_distributions(
+        course.id,
+        incremental=settings.FEATURES.get('ENABLE_INCREMENTAL_ANSWER_DISTRIBUTIONS', False)
+    )
 
     d = {}
     d['header'] = ['url_name', 'display name', 'answer id', 'answer', 'count']
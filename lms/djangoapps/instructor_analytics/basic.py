@@ -11,6 +11,7 @@ from django.db.models import Q
 from django.contrib.auth.models import User
 import xmodule.graders as xmgraders
 from django.core.exceptions import ObjectDoesNotExist
+from course_groups.cohorts import get_cohorts_for_users
 
 
 STUDENT_FEATURES = ('id', 'username', 'first_name', 'last_name', 'is_staff', 'email')
@@ -180,7 +181,7 @@ def enrolled_students_features(course_key, features):
     ).order_by('username').select_related('profile')
 
     if include_cohort_column:
-        students = students.prefetch_related('course_groups')
+        cohorts_by_user_id = get_cohorts_for_users(course_key)
 
     def extract_student(student, features):
         """ convert student to dictionary """
@@ -196,13 +197,8 @@ def enrolled_students_features(course_key, features):
             student_dict.update(profile_dict)
 
         if include_cohort_column:
-            # Note that we use student.course_groups.all() here instead of
-            # student.course_groups.filter(). The latter creates a fresh query,
-            # therefore negating the performance gain from prefetch_related().
-            student_dict['cohort'] = next(
-                (cohort.name for cohort in student.course_groups.all() if cohort.course_id == course_key),
-                "[unassigned]"
-            )
+            cohort = cohorts_by_user_id.get(student.id)
+            student_dict['cohort'] = cohort.name if cohort is not None else "[unassigned]"
         return student_dict
 
     return [extract_student(student, features) for student in students]
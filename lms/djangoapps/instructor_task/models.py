@@ -12,13 +12,13 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
-from cStringIO import StringIO
 from gzip import GzipFile
 from uuid import uuid4
 import csv
 import json
 import hashlib
 import os.path
+import tempfile
 import urllib
 
 from boto.s3.connection import S3Connection
@@ -193,9 +193,13 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Rows are passed in as an iterable and written out as they are
+    consumed, so reports can be generated without holding the whole dataset
+    in memory.
+
+    Reports that are generated in several pieces store each piece with
+    `store_partial_rows()`, and merge them with `partial_rows()` into a final
+    `store_rows()` call.
     """
     @classmethod
     def from_config(cls):
@@ -218,6 +222,14 @@ class ReportStore(object):
         for row in rows:
             yield [unicode(item).encode('utf-8') for item in row]
 
+    def _get_utf8_decoded_rows(self, csv_file):
+        """
+        Read back rows written by `_get_utf8_encoded_rows` from `csv_file`,
+        as lists of unicode strings.
+        """
+        for row in csv.reader(csv_file):
+            yield [item.decode('utf-8') for item in row]
+
 
 class S3ReportStore(ReportStore):
     """
@@ -260,14 +272,16 @@ class S3ReportStore(ReportStore):
             settings.GRADES_DOWNLOAD['ROOT_PATH']
         )
 
-    def key_for(self, course_id, filename):
+    def key_for(self, course_id, filename, partial=False):
         """Return the S3 key we would use to store and retrieve the data for the
-        given filename."""
+        given filename. Partial files are kept out of the course's directory,
+        so that they never show up in `links_for()`."""
         hashed_course_id = hashlib.sha1(course_id.to_deprecated_string())
 
         key = Key(self.bucket)
-        key.key = "{}/{}/{}".format(
+        key.key = "{}/{}{}/{}".format(
             self.root_path,
+            "partial/" if partial else "",
             hashed_course_id.hexdigest(),
             filename
         )
@@ -307,19 +321,63 @@ class S3ReportStore(ReportStore):
     def store_rows(self, course_id, filename, rows):
         """
         Given a `course_id`, `filename`, and `rows` (each row is an iterable of
-        strings), create a buffer that is a gzip'd csv file, and then `store()`
-        that buffer.
+        strings), write a gzip'd csv file and upload it.
 
         Even though we store it in gzip format, browsers will transparently
         download and decompress it. Filenames should end in `.csv`, not `.gz`.
+
+        `rows` can be a generator: it is consumed as the file is written, and
+        the file is spooled to disk rather than kept in memory.
+        """
+        self._store_rows_for_key(self.key_for(course_id, filename), rows)
+
+    def store_partial_rows(self, course_id, filename, rows):
+        """
+        Like `store_rows()`, but for intermediate files that are later merged
+        into a report with `partial_rows()`, and aren't listed for download.
         """
-        output_buffer = StringIO()
-        gzip_file = GzipFile(fileobj=output_buffer, mode="wb")
-        csvwriter = csv.writer(gzip_file)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        gzip_file.close()
+        self._store_rows_for_key(self.key_for(course_id, filename, partial=True), rows)
 
-        self.store(course_id, filename, output_buffer)
+    def partial_rows(self, course_id, filename):
+        """
+        Yield the rows of a partial file stored with `store_partial_rows()`,
+        as lists of unicode strings. Yields nothing if there is no such file.
+        """
+        key = self.key_for(course_id, filename, partial=True)
+        if not key.exists():
+            return
+
+        with tempfile.TemporaryFile() as partial_file:
+            key.get_contents_to_file(partial_file)
+            partial_file.seek(0)
+            for row in self._get_utf8_decoded_rows(GzipFile(fileobj=partial_file, mode="rb")):
+                yield row
+
+    def delete_partial(self, course_id, filename):
+        """Delete a partial file stored with `store_partial_rows()`."""
+        self.key_for(course_id, filename, partial=True).delete()
+
+    def _store_rows_for_key(self, key, rows):
+        """
+        Write `rows` as a gzip'd csv file to a temporary file, and upload it
+        to `key`.
+        """
+        with tempfile.TemporaryFile() as output_file:
+            gzip_file = GzipFile(fileobj=output_file, mode="wb")
+            csvwriter = csv.writer(gzip_file)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+            gzip_file.close()
+
+            key.content_encoding = "gzip"
+            key.content_type = "text/csv"
+            key.set_contents_from_file(
+                output_file,
+                headers={
+                    "Content-Encoding": "gzip",
+                    "Content-Type": "text/csv",
+                },
+                rewind=True,
+            )
 
     def links_for(self, course_id):
         """
@@ -369,9 +427,12 @@ class LocalFSReportStore(ReportStore):
         """
         return cls(settings.GRADES_DOWNLOAD['ROOT_PATH'])
 
-    def path_to(self, course_id, filename):
-        """Return the full path to a given file for a given course."""
-        return os.path.join(self.root_path, urllib.quote(course_id.to_deprecated_string(), safe=''), filename)
+    def path_to(self, course_id, filename, partial=False):
+        """Return the full path to a given file for a given course. Partial
+        files are kept out of the course's directory, so that they never show
+        up in `links_for()`."""
+        root_path = os.path.join(self.root_path, "partial") if partial else self.root_path
+        return os.path.join(root_path, urllib.quote(course_id.to_deprecated_string(), safe=''), filename)
 
     def store(self, course_id, filename, buff):
         """
@@ -391,13 +452,49 @@ class LocalFSReportStore(ReportStore):
     def store_rows(self, course_id, filename, rows):
         """
         Given a course_id, filename, and rows (each row is an iterable of strings),
-        write this data out.
+        write this data out. `rows` can be a generator, it is consumed as the
+        file is written.
         """
-        output_buffer = StringIO()
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+        self._store_rows_to_path(self.path_to(course_id, filename), rows)
 
-        self.store(course_id, filename, output_buffer)
+    def store_partial_rows(self, course_id, filename, rows):
+        """
+        Like `store_rows()`, but for intermediate files that are later merged
+        into a report with `partial_rows()`, and aren't listed for download.
+        """
+        self._store_rows_to_path(self.path_to(course_id, filename, partial=True), rows)
+
+    def partial_rows(self, course_id, filename):
+        """
+        Yield the rows of a partial file stored with `store_partial_rows()`,
+        as lists of unicode strings. Yields nothing if there is no such file.
+        """
+        full_path = self.path_to(course_id, filename, partial=True)
+        if not os.path.exists(full_path):
+            return
+
+        with open(full_path, "rb") as partial_file:
+            for row in self._get_utf8_decoded_rows(partial_file):
+                yield row
+
+    def delete_partial(self, course_id, filename):
+        """Delete a partial file stored with `store_partial_rows()`."""
+        full_path = self.path_to(course_id, filename, partial=True)
+        if os.path.exists(full_path):
+            os.remove(full_path)
+
+    def _store_rows_to_path(self, full_path, rows):
+        """
+        Write `rows` out as a csv file at `full_path`, overwriting anything
+        that was there previously.
+        """
+        directory = os.path.dirname(full_path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        with open(full_path, "wb") as f:
+            csvwriter = csv.writer(f)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
 
     def links_for(self, course_id):
         """
@@ -140,6 +140,8 @@ class SubtaskStatus(object):
           should not have a maximum count applied
       'retried_withmax' : number of times the subtask has been retried for conditions that
           should have a maximum count applied
+      'batches' : number of batches of items the subtask has processed
+      'send_duration_ms' : milliseconds spent processing those batches
       'state' : celery state of the subtask (e.g. QUEUING, PROGRESS, RETRY, FAILURE, SUCCESS)
 
     Object is not JSON-serializable, so to_dict and from_dict methods are provided so that
@@ -150,7 +152,8 @@ class SubtaskStatus(object):
     Also, we should count up "not attempted" separately from attempted/failed.
     """
 
-    def __init__(self, task_id, attempted=None, succeeded=0, failed=0, skipped=0, retried_nomax=0, retried_withmax=0, state=None):
+    def __init__(self, task_id, attempted=None, succeeded=0, failed=0, skipped=0, retried_nomax=0, retried_withmax=0,
+                 batches=0, send_duration_ms=0, state=None):
         """Construct a SubtaskStatus object."""
         self.task_id = task_id
         if attempted is not None:
@@ -162,6 +165,8 @@ class SubtaskStatus(object):
         self.skipped = skipped
         self.retried_nomax = retried_nomax
         self.retried_withmax = retried_withmax
+        self.batches = batches
+        self.send_duration_ms = send_duration_ms
         self.state = state if state is not None else QUEUING
 
     @classmethod
@@ -185,7 +190,8 @@ class SubtaskStatus(object):
         """
         return self.__dict__
 
-    def increment(self, succeeded=0, failed=0, skipped=0, retried_nomax=0, retried_withmax=0, state=None):
+    def increment(self, succeeded=0, failed=0, skipped=0, retried_nomax=0, retried_withmax=0,
+                  batches=0, send_duration_ms=0, state=None):
         """
         Update the result of a subtask with additional results.
 
@@ -198,6 +204,8 @@ class SubtaskStatus(object):
         self.skipped += skipped
         self.retried_nomax += retried_nomax
         self.retried_withmax += retried_withmax
+        self.batches += batches
+        self.send_duration_ms += send_duration_ms
         if state is not None:
             self.state = state
 
@@ -275,7 +283,15 @@ def initialize_subtask_info(entry, action_name, total_num, subtask_id_list):
     return task_progress
 
 
-def queue_subtasks_for_query(entry, action_name, create_subtask_fcn, item_queryset, item_fields, items_per_task):
+def queue_subtasks_for_query(
+    entry,
+    action_name,
+    create_subtask_fcn,
+    item_queryset,
+    item_fields,
+    items_per_task,
+    final_subtask_id=None,
+):
     """
     Generates and queues subtasks to each execute a chunk of "items" generated by a queryset.
 
@@ -289,6 +305,10 @@ def queue_subtasks_for_query(entry, action_name, create_subtask_fcn, item_querys
         `item_fields` : the fields that should be included in the dict that is returned.
             These are in addition to the 'pk' field.
         `items_per_task` : maximum size of chunks to break each query chunk into for use by a subtask.
+        `final_subtask_id` : optional id of one more subtask, that is not queued here but is
+            tracked with the others.  It is meant to be queued by the subtask that sees that it is
+            the only one remaining (see `update_subtask_status()`), e.g. to merge the work of the
+            others.  The InstructorTask is only marked as done once it has completed too.
 
     Returns:  the task progress as stored in the InstructorTask object.
 
@@ -308,7 +328,8 @@ def queue_subtasks_for_query(entry, action_name, create_subtask_fcn, item_querys
         total_num_subtasks,
         total_num_items,
     )  # pylint: disable=no-member
-    progress = initialize_subtask_info(entry, action_name, total_num_items, subtask_id_list)
+    tracked_subtask_ids = subtask_id_list + ([final_subtask_id] if final_subtask_id is not None else [])
+    progress = initialize_subtask_info(entry, action_name, total_num_items, tracked_subtask_ids)
 
     # Construct a generator that will return the recipients to use for each subtask.
     # Pass in the desired fields to fetch for each recipient.
@@ -462,9 +483,11 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 
     The subtask lock acquired in the call to check_subtask_is_valid() is released here, only when
     the attempting of retries has concluded.
+
+    Returns the number of subtasks that have not completed yet, once this update is applied.
     """
     try:
-        _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        return _update_subtask_status(entry_id, current_task_id, new_subtask_status)
     except DatabaseError:
         # If we fail, try again recursively.
         retry_count += 1
@@ -472,7 +495,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
             TASK_LOG.info("Retrying to update status for subtask %s of instructor task %d with status %s:  retry %d",
                           current_task_id, entry_id, new_subtask_status, retry_count)
             dog_stats_api.increment('instructor_task.subtask.retry_after_failed_update')
-            update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count)
+            return update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count)
         else:
             TASK_LOG.info("Failed to update status after %d retries for subtask %s of instructor task %d with status %s",
                           retry_count, current_task_id, entry_id, new_subtask_status)
@@ -512,6 +535,8 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     information for each subtask.  At the moment, the value for each subtask (keyed by its task_id)
     is the value of the SubtaskStatus.to_dict(), but could be expanded in future to store information
     about failure messages, progress made, etc.
+
+    Returns the number of subtasks that have not completed yet.
     """
     TASK_LOG.info("Preparing to update status for subtask %s for instructor task %d with status %s",
                   current_task_id, entry_id, new_subtask_status)
@@ -579,3 +604,4 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     else:
         TASK_LOG.debug("about to commit....")
         transaction.commit()
+        return num_remaining
@@ -31,7 +31,9 @@ from instructor_task.tasks_helper import (
     reset_attempts_module_state,
     delete_problem_module_state,
     upload_grades_csv,
-    upload_students_csv
+    upload_students_csv,
+    generate_grade_report_shard,
+    merge_grade_report_shards,
 )
 from bulk_email.tasks import perform_delegate_email_batches
 
@@ -139,10 +141,29 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('graded')
-    task_fn = partial(upload_grades_csv, xmodule_instance_args)
+    task_fn = partial(upload_grades_csv, xmodule_instance_args, shard_task=calculate_grades_csv_shard)
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def calculate_grades_csv_shard(entry_id, course_id, shard_index, student_ids, report_info, subtask_status_dict):
+    """
+    Grade a range of the students of a course into a partial grade report.
+    """
+    return generate_grade_report_shard(
+        entry_id, course_id, shard_index, student_ids, report_info, subtask_status_dict,
+        merge_task=merge_grades_csv_shards,
+    )
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def merge_grades_csv_shards(entry_id, course_id, report_info, subtask_status_dict):
+    """
+    Merge the partial grade reports of all shards into the final grade report.
+    """
+    return merge_grade_report_shards(entry_id, course_id, report_info, subtask_status_dict)
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
     """
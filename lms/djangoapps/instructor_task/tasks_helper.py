@@ -4,13 +4,16 @@ running state of a course.
 
 """
 import json
+import traceback
 import urllib
 from datetime import datetime
 from time import time
+from uuid import uuid4
 
 from celery import Task, current_task
 from celery.utils.log import get_task_logger
 from celery.states import SUCCESS, FAILURE
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import transaction, reset_queries
 import dogstats_wrapper as dog_stats_api
@@ -26,7 +29,15 @@ from courseware.module_render import get_module_for_descriptor_internal
 from instructor_analytics.basic import enrolled_students_features
 from instructor_analytics.csvs import format_dictlist
 from instructor_task.models import ReportStore, InstructorTask, PROGRESS
+from instructor_task.subtasks import (
+    SubtaskStatus,
+    queue_subtasks_for_query,
+    check_subtask_is_valid,
+    update_subtask_status,
+)
+from opaque_keys.edx.keys import CourseKey
 from student.models import CourseEnrollment
+from util.query import use_read_replica_if_available
 
 # define different loggers for use within tasks and on client side
 TASK_LOG = get_task_logger(__name__)
@@ -39,6 +50,9 @@ UPDATE_STATUS_SUCCEEDED = 'succeeded'
 UPDATE_STATUS_FAILED = 'failed'
 UPDATE_STATUS_SKIPPED = 'skipped'
 
+# define number of students to grade together when generating grade reports
+GRADE_REPORT_BATCH_SIZE = 100
+
 
 class BaseInstructorTask(Task):
     """
@@ -135,6 +149,14 @@ class UpdateProblemModuleStateError(Exception):
     pass
 
 
+class GradeReportShardError(Exception):
+    """
+    Error signaling that a grade report can't be merged because some of its
+    shards failed.
+    """
+    pass
+
+
 def _get_current_task():
     """
     Stub to make it easier to test without actually running Celery.
@@ -497,6 +519,26 @@ def delete_problem_module_state(xmodule_instance_args, _module_descriptor, stude
     return UPDATE_STATUS_SUCCEEDED
 
 
+def _report_filename(csv_name, course_id, timestamp_str):
+    """
+    Return the name under which the `csv_name` report of `course_id`
+    generated at `timestamp_str` is stored.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=urllib.quote(unicode(course_id).replace("/", "_")),
+        csv_name=csv_name,
+        timestamp_str=timestamp_str
+    )
+
+
+def _partial_report_filename(csv_name, course_id, timestamp_str, shard_index):
+    """
+    Return the name of the partial file holding the `shard_index`th piece of
+    a report.
+    """
+    return u"{}.{:05d}".format(_report_filename(csv_name, course_id, timestamp_str), shard_index)
+
+
 def upload_csv_to_report_store(rows, csv_name, course_id, timestamp):
     """
     Upload data as a CSV using ReportStore.
@@ -508,46 +550,29 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp):
                 [row1_colum1, row1_colum2, ...],
                 ...
             ]
+            This can also be a generator of rows.
         csv_name: Name of the resulting CSV
         course_id: ID of the course
     """
     report_store = ReportStore.from_config()
     report_store.store_rows(
         course_id,
-        u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-            course_prefix=urllib.quote(unicode(course_id).replace("/", "_")),
-            csv_name=csv_name,
-            timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-        ),
+        _report_filename(csv_name, course_id, timestamp.strftime("%Y-%m-%d-%H%M")),
         rows
     )
 
 
-def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+def _grade_report_rows(course_id, students, task_progress, err_rows, status_interval=100):
     """
-    For a given `course_id`, generate a grades CSV file for all students that
-    are enrolled, and store using a `ReportStore`. Once created, the files can
-    be accessed by instantiating another `ReportStore` (via
-    `ReportStore.from_config()`) and calling `link_for()` on it. Writes are
-    buffered, so we'll never write part of a CSV file to S3 -- i.e. any files
-    that are visible in ReportStore will be complete ones.
-
-    As we start to add more CSV downloads, it will probably be worthwhile to
-    make a more general CSVDoc class instead of building out the rows like we
-    do here.
+    Grade `students` and yield the rows of their grade report, starting with
+    the header row once a first student has been graded. Students that can't
+    be graded are appended to `err_rows` instead, and progress is recorded in
+    `task_progress`.
     """
-    start_time = time()
-    start_date = datetime.now(UTC)
-    status_interval = 100
-    enrolled_students = CourseEnrollment.users_enrolled_in(course_id)
-    task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
-
-    # Loop over all our students and build our CSV lists in memory
     header = None
-    rows = []
-    err_rows = [["id", "username", "error_msg"]]
     current_step = {'step': 'Calculating Grades'}
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
+    grades = iterate_grades_for(course_id, students, batch_size=GRADE_REPORT_BATCH_SIZE)
+    for student, gradeset, err_msg in grades:
         # Periodically update task status (this is a cache write)
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
@@ -559,7 +584,7 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             if not header:
                 # Encode the header row in utf-8 encoding in case there are unicode characters
                 header = [section['label'].encode('utf-8') for section in gradeset[u'section_breakdown']]
-                rows.append(["id", "email", "username", "grade"] + header)
+                yield ["id", "email", "username", "grade"] + header
 
             percents = {
                 section['label']: section.get('percent', 0.0)
@@ -574,18 +599,51 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             # possible for a student to have a 0.0 show up in their row but
             # still have 100% for the course.
             row_percents = [percents.get(label, 0.0) for label in header]
-            rows.append([student.id, student.email, student.username, gradeset['percent']] + row_percents)
+            yield [student.id, student.email, student.username, gradeset['percent']] + row_percents
         else:
             # An empty gradeset means we failed to grade a student.
             task_progress.failed += 1
             err_rows.append([student.id, student.username, err_msg])
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
-    current_step = {'step': 'Uploading CSVs'}
-    task_progress.update_task_state(extra_meta=current_step)
+    # Every student is graded, all that's left is storing the rows
+    task_progress.update_task_state(extra_meta={'step': 'Uploading CSVs'})
+
 
-    # Perform the actual upload
+def upload_grades_csv(_xmodule_instance_args, entry_id, course_id, _task_input, action_name, shard_task=None):
+    """
+    For a given `course_id`, generate a grades CSV file for all students that
+    are enrolled, and store using a `ReportStore`. Once created, the files can
+    be accessed by instantiating another `ReportStore` (via
+    `ReportStore.from_config()`) and calling `link_for()` on it. Rows are
+    streamed to a temporary file as students are graded, and only uploaded
+    once complete, so we'll never write part of a CSV file to S3 -- i.e. any
+    files that are visible in ReportStore will be complete ones.
+
+    If `shard_task` is given and there are more than
+    `settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK` students, the report is
+    instead split into `shard_task` subtasks over ranges of enrolled
+    students, see `queue_grade_report_shards()`.
+
+    As we start to add more CSV downloads, it will probably be worthwhile to
+    make a more general CSVDoc class instead of building out the rows like we
+    do here.
+    """
+    start_time = time()
+    start_date = datetime.now(UTC)
+    enrolled_students = CourseEnrollment.users_enrolled_in(course_id)
+    total_students = enrolled_students.count()
+
+    students_per_task = settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK
+    if shard_task is not None and students_per_task and total_students > students_per_task:
+        return queue_grade_report_shards(entry_id, course_id, action_name, start_date, shard_task)
+
+    task_progress = TaskProgress(action_name, total_students, start_time)
+
+    # Grade our students as the CSV file is written out
+    err_rows = [["id", "username", "error_msg"]]
+    rows = _grade_report_rows(course_id, enrolled_students, task_progress, err_rows)
     upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
+    current_step = {'step': 'Uploading CSVs'}
 
     # If there are any error rows (don't count the header), write them out as well
     if len(err_rows) > 1:
@@ -595,6 +653,214 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     return task_progress.update_task_state(extra_meta=current_step)
 
 
+def queue_grade_report_shards(entry_id, course_id, action_name, start_date, shard_task):
+    """
+    Split the grade report of `course_id` into `shard_task` subtasks, each
+    grading a range of `settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK` enrolled
+    students (ordered by id) into a partial file. Once they have all run, the
+    partial files are merged into the report by a final subtask, see
+    `generate_grade_report_shard()`.
+
+    Progress is tracked through the subtask information of the InstructorTask.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    report_info = {
+        'timestamp': start_date.strftime("%Y-%m-%d-%H%M"),
+        'merge_subtask_id': str(uuid4()),
+        'num_shards': 0,
+        'action_name': action_name,
+    }
+    students = use_read_replica_if_available(CourseEnrollment.users_enrolled_in(course_id).order_by('id'))
+
+    shard_index = [0]
+
+    def _create_grade_report_shard(to_list, initial_subtask_status):
+        """Creates a subtask to grade a given range of students."""
+        new_subtask = shard_task.subtask(
+            (
+                entry_id,
+                unicode(course_id),
+                shard_index[0],
+                [student['pk'] for student in to_list],
+                report_info,
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+        )
+        shard_index[0] += 1
+        return new_subtask
+
+    num_students = students.count()
+    num_shards, remainder = divmod(num_students, settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK)
+    report_info['num_shards'] = num_shards + (1 if remainder else 0)
+
+    TASK_LOG.info(
+        u"Task %s: queuing %s grade report shards for course %s",
+        entry.task_id, report_info['num_shards'], course_id
+    )
+    return queue_subtasks_for_query(
+        entry,
+        action_name,
+        _create_grade_report_shard,
+        students,
+        [],
+        settings.GRADES_DOWNLOAD_STUDENTS_PER_TASK,
+        final_subtask_id=report_info['merge_subtask_id'],
+    )
+
+
+def generate_grade_report_shard(entry_id, course_id, shard_index, student_ids, report_info, subtask_status_dict,
+                                merge_task):
+    """
+    Grade the students with the given ids, and store their rows of the grade
+    report as a partial file. The shard that completes last queues
+    `merge_task` to merge all of the partial files into the report.
+
+    Returns the subtask status, in a form that can be serialized by Celery.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    course_key = CourseKey.from_string(course_id)
+
+    # Rejects duplicate runs of the same shard
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    task_progress = TaskProgress(report_info['action_name'], len(student_ids), time())
+    report_store = ReportStore.from_config()
+    try:
+        with dog_stats_api.timer('instructor_tasks.grade_report.shard', tags=[u'course:{}'.format(course_id)]):
+            err_rows = []
+            students = User.objects.filter(id__in=student_ids).order_by('id')
+            report_store.store_partial_rows(
+                course_key,
+                _partial_report_filename('grade_report', course_key, report_info['timestamp'], shard_index),
+                _grade_report_rows(course_key, students, task_progress, err_rows),
+            )
+            report_store.store_partial_rows(
+                course_key,
+                _partial_report_filename('grade_report_err', course_key, report_info['timestamp'], shard_index),
+                err_rows,
+            )
+    except Exception:
+        TASK_LOG.exception(u"Grade report shard %s of instructor task %s failed", current_task_id, entry_id)
+        # Count every student that wasn't processed as failed, to keep counts consistent
+        subtask_status.increment(
+            succeeded=task_progress.succeeded,
+            failed=len(student_ids) - task_progress.succeeded,
+            state=FAILURE,
+        )
+        _complete_grade_report_shard(entry_id, course_id, report_info, subtask_status, merge_task)
+        raise
+
+    subtask_status.increment(succeeded=task_progress.succeeded, failed=task_progress.failed, state=SUCCESS)
+    _complete_grade_report_shard(entry_id, course_id, report_info, subtask_status, merge_task)
+    return subtask_status.to_dict()
+
+
+def _complete_grade_report_shard(entry_id, course_id, report_info, subtask_status, merge_task):
+    """
+    Record the final status of a shard, and queue the merge if it is the only
+    subtask left.
+    """
+    num_remaining = update_subtask_status(entry_id, subtask_status.task_id, subtask_status)
+    if num_remaining == 1:
+        merge_status = SubtaskStatus.create(report_info['merge_subtask_id'])
+        merge_task.subtask(
+            (entry_id, course_id, report_info, merge_status.to_dict()),
+            task_id=merge_status.task_id,
+            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+        ).apply_async()
+
+
+def merge_grade_report_shards(entry_id, course_id, report_info, subtask_status_dict):
+    """
+    Merge the partial files written by `generate_grade_report_shard()` into
+    the grade report (and error report, if any student couldn't be graded),
+    then delete them.
+
+    Returns the subtask status, in a form that can be serialized by Celery.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    course_key = CourseKey.from_string(course_id)
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    report_store = ReportStore.from_config()
+    timestamp_str = report_info['timestamp']
+    shard_indexes = range(report_info['num_shards'])
+
+    def delete_partials():
+        """Delete the partial files of every shard."""
+        for csv_name in ('grade_report', 'grade_report_err'):
+            for shard_index in shard_indexes:
+                report_store.delete_partial(
+                    course_key, _partial_report_filename(csv_name, course_key, timestamp_str, shard_index)
+                )
+
+    def merged_rows(csv_name, header=None):
+        """
+        Chain the rows of every shard. Grade report shards start with their
+        own header row, of which only the first is kept; error report shards
+        have none, so the given `header` is written first instead. Nothing is
+        written if no shard has any rows.
+        """
+        shards_have_header = header is None
+        header_written = False
+        for shard_index in shard_indexes:
+            rows = report_store.partial_rows(
+                course_key, _partial_report_filename(csv_name, course_key, timestamp_str, shard_index)
+            )
+            if shards_have_header:
+                shard_header = next(rows, None)
+                header = header or shard_header
+            for row in rows:
+                if not header_written:
+                    header_written = True
+                    yield header
+                yield row
+
+    try:
+        # The merge is the last subtask, so every shard has completed by now. A report
+        # missing the students of a failed shard mustn't be published as complete.
+        num_failed_shards = json.loads(InstructorTask.objects.get(pk=entry_id).subtasks)['failed']
+        if num_failed_shards:
+            raise GradeReportShardError(
+                u"{} grade report shards failed, the report was not published".format(num_failed_shards)
+            )
+        with dog_stats_api.timer('instructor_tasks.grade_report.merge', tags=[u'course:{}'.format(course_id)]):
+            report_store.store_rows(
+                course_key,
+                _report_filename('grade_report', course_key, timestamp_str),
+                merged_rows('grade_report'),
+            )
+            err_rows = list(merged_rows('grade_report_err', ["id", "username", "error_msg"]))
+            if err_rows:
+                report_store.store_rows(
+                    course_key, _report_filename('grade_report_err', course_key, timestamp_str), err_rows
+                )
+            delete_partials()
+    except Exception as exception:
+        TASK_LOG.exception(u"Merging grade report of instructor task %s failed", entry_id)
+        subtask_status.increment(state=FAILURE)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        # update_subtask_status marks the InstructorTask as succeeded once its last
+        # subtask is done, whatever the state of the subtasks
+        entry = InstructorTask.objects.get(pk=entry_id)
+        entry.task_state = FAILURE
+        entry.task_output = InstructorTask.create_output_for_failure(exception, traceback.format_exc())
+        entry.save_now()
+        try:
+            delete_partials()
+        except Exception:  # pylint: disable=broad-except
+            TASK_LOG.exception(u"Could not delete the partial grade reports of instructor task %s", entry_id)
+        raise
+
+    subtask_status.increment(state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    return subtask_status.to_dict()
+
+
 def upload_students_csv(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
     """
     For a given `course_id`, generate a CSV file containing profile
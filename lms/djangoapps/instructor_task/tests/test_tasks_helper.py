@@ -4,18 +4,30 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 Tests that CSV grade report generation works with unicode emails.
 
 """
+import csv
+import json
+
 import ddt
+from celery.states import SUCCESS, FAILURE
 from mock import Mock, patch
 
 from django.test.testcases import TestCase
+from django.test.utils import override_settings
 
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
 
-from instructor_task.models import ReportStore
-from instructor_task.tasks_helper import upload_grades_csv, upload_students_csv
+from instructor_task.models import ReportStore, InstructorTask
+from instructor_task.tasks_helper import (
+    iterate_grades_for,
+    upload_grades_csv,
+    upload_students_csv,
+    generate_grade_report_shard,
+    merge_grade_report_shards,
+)
+from instructor_task.tests.factories import InstructorTaskFactory
 from instructor_task.tests.test_base import InstructorTaskCourseTestCase, TestReportMixin
 
 
@@ -61,6 +73,83 @@ class TestInstructorGradeReport(TestReportMixin, InstructorTaskCourseTestCase):
         self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
 
 
+class EagerTask(object):
+    """
+    Stands in for a celery task, running its subtasks as soon as they are queued.
+    """
+    def __init__(self, func):
+        self.func = func
+
+    def subtask(self, args, **_kwargs):
+        """Return a subtask whose apply_async() runs the task function synchronously."""
+        return Mock(apply_async=lambda: self.func(*args))
+
+
+@override_settings(GRADES_DOWNLOAD_STUDENTS_PER_TASK=2)
+class TestShardedGradeReport(TestReportMixin, InstructorTaskCourseTestCase):
+    """
+    Tests that grade reports split over several subtasks are merged correctly.
+    """
+    def setUp(self):
+        self.course = CourseFactory.create()
+        self.entry = InstructorTaskFactory.create(
+            course_id=self.course.id, task_type='grade_course', task_id='grade-report-task'
+        )
+        merge_task = EagerTask(merge_grade_report_shards)
+        self.shard_task = EagerTask(
+            lambda *args: generate_grade_report_shard(*args, merge_task=merge_task)
+        )
+
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_sharded_report(self, _mock_current_task):
+        students = [self.create_student(u'studentì{}'.format(i)) for i in range(5)]
+        upload_grades_csv(None, self.entry.id, self.course.id, None, 'graded', shard_task=self.shard_task)
+
+        report_store = ReportStore.from_config()
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        self.assertIn('grade_report', links[0][0])
+
+        with open(report_store.path_to(self.course.id, links[0][0])) as csv_file:
+            rows = list(csv.reader(csv_file))
+        # A single header row, followed by every student in order
+        self.assertEqual(rows[0][:4], ["id", "email", "username", "grade"])
+        self.assertEqual([int(row[0]) for row in rows[1:]], [student.id for student in students])
+
+        entry = InstructorTask.objects.get(id=self.entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        # Three shards of students, plus the merge
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], 4)
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5}, json.loads(entry.task_output))
+
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_failed_shard_fails_report(self, _mock_current_task):
+        students = [self.create_student(u'student{}'.format(i)) for i in range(5)]
+
+        def failing_iterate_grades_for(course_id, shard_students, **kwargs):
+            """Fail to grade the last shard."""
+            if students[-1] in shard_students:
+                raise ValueError("Cannot grade shard")
+            return iterate_grades_for(course_id, shard_students, **kwargs)
+
+        with patch('instructor_task.tasks_helper.iterate_grades_for', failing_iterate_grades_for):
+            with self.assertRaises(Exception):
+                upload_grades_csv(None, self.entry.id, self.course.id, None, 'graded', shard_task=self.shard_task)
+
+        # Nothing is published, not even a report missing the last shard's students
+        self.assertEqual(ReportStore.from_config().links_for(self.course.id), [])
+        entry = InstructorTask.objects.get(id=self.entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['exception'], 'GradeReportShardError')
+
+    @patch('instructor_task.tasks_helper._get_current_task')
+    def test_small_course_not_sharded(self, _mock_current_task):
+        self.create_student('student')
+        result = upload_grades_csv(None, self.entry.id, self.course.id, None, 'graded', shard_task=self.shard_task)
+        self.assertDictContainsSubset({'attempted': 1, 'succeeded': 1, 'failed': 0}, result)
+        self.assertEqual(InstructorTask.objects.get(id=self.entry.id).subtasks, "")
+
+
 @ddt.ddt
 class TestStudentReport(TestReportMixin, InstructorTaskCourseTestCase):
     """
@@ -1,32 +1,33 @@
 """
 Serializer for video outline
 """
-from rest_framework.reverse import reverse
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
 
-from courseware.access import has_access
+from courseware.access import can_load_from_fields, has_access, load_access_fields
+from student.roles import CourseBetaTesterRole
+from xmodule.modulestore.django import modulestore
 
 from edxval.api import (
     get_video_info_for_course_and_profile, ValInternalError
 )
 
+# How long a course's video outline stays cached. Outlines are cached per version of the
+# course, so a publish is picked up right away; this only bounds how long old versions linger.
+VIDEO_OUTLINE_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 class BlockOutline(object):
     """
-    Serializes course videos, pulling data from VAL and the video modules.
+    Walks the course tree, producing for each block of the outlined categories its path through
+    the course, the urls of its section and unit, the fields needed to check a user's access to
+    it, and its summary. None of it depends on the user or the request, so it can be cached.
     """
-    def __init__(self, course_id, start_block, categories_to_outliner, request):
+    def __init__(self, course_id, start_block, categories_to_outliner):
         """Create a BlockOutline using `start_block` as a starting point."""
         self.start_block = start_block
         self.categories_to_outliner = categories_to_outliner
         self.course_id = course_id
-        self.request = request  # needed for making full URLS
-        self.local_cache = {}
-        try:
-            self.local_cache['course_videos'] = get_video_info_for_course_and_profile(
-                unicode(course_id), "mobile_low"
-            )
-        except ValInternalError:  # pragma: nocover
-            self.local_cache['course_videos'] = {}
 
     def __iter__(self):
         child_to_parent = {}
@@ -48,7 +49,7 @@ class BlockOutline(object):
             return reversed(block_path)
 
         def find_urls(block):
-            """section and unit urls for block"""
+            """section and unit urls (without the host) for block"""
             block_path = []
             while block in child_to_parent:
                 block = child_to_parent[block]
@@ -67,21 +68,11 @@ class BlockOutline(object):
                 chapter=chapter.url_name,
                 section=section.url_name
             )
-            section_url = reverse(
-                "courseware_section",
-                kwargs=kwargs,
-                request=self.request,
-            )
+            section_url = reverse("courseware_section", kwargs=kwargs)
             kwargs['position'] = position
-            unit_url = reverse(
-                "courseware_position",
-                kwargs=kwargs,
-                request=self.request,
-            )
+            unit_url = reverse("courseware_position", kwargs=kwargs)
             return unit_url, section_url, block_path
 
-        user = self.request.user
-
         while stack:
             curr_block = stack.pop()
 
@@ -95,9 +86,6 @@ class BlockOutline(object):
                 continue
 
             if curr_block.category in self.categories_to_outliner:
-                if not has_access(user, 'load', curr_block, course_key=self.course_id):
-                    continue
-
                 summary_fn = self.categories_to_outliner[curr_block.category]
                 block_path = list(path(curr_block))
                 unit_url, section_url, _ = find_urls(curr_block)
@@ -107,7 +95,8 @@ class BlockOutline(object):
                     "named_path": [b["name"] for b in block_path[:-1]],
                     "unit_url": unit_url,
                     "section_url": section_url,
-                    "summary": summary_fn(self.course_id, curr_block, self.request, self.local_cache)
+                    "access": load_access_fields(curr_block),
+                    "summary": summary_fn(self.course_id, curr_block),
                 }
 
             if curr_block.has_children:
@@ -116,24 +105,77 @@ class BlockOutline(object):
                     child_to_parent[block] = curr_block
 
 
-def video_summary(course, course_id, video_descriptor, request, local_cache):
+def get_video_outline(course):
     """
-    returns summary dict for the given video module
+    Return the BlockOutline of the course's videos, from the cache if it has been built since
+    the course was last changed.
     """
-    # First try to check VAL for the URLs we want.
-    val_video_info = local_cache['course_videos'].get(video_descriptor.edx_video_id, {})
-    if val_video_info:
-        video_url = val_video_info['url']
-    # Then fall back to VideoDescriptor fields for video URLs
-    elif video_descriptor.html5_sources:
-        video_url = video_descriptor.html5_sources[0]
-    else:
-        video_url = video_descriptor.source
+    version = course_version(course)
+    if version is None:
+        return _build_video_outline(course.id)
+
+    cache_key = u'mobile_api.video_outline.{}.{}'.format(course.id, version.isoformat())
+    video_outline = cache.get(cache_key)
+    if video_outline is None:
+        video_outline = _build_video_outline(course.id)
+        cache.set(cache_key, video_outline, VIDEO_OUTLINE_CACHE_TIMEOUT)
+    return video_outline
+
+
+def course_version(course):
+    """
+    Return when the course's content was last edited or published, or None if its modulestore
+    doesn't track that (xml courses only change when they are reloaded).
+    """
+    get_subtree_edited_on = getattr(course.runtime, 'get_subtree_edited_on', None)
+    if get_subtree_edited_on is None:
+        return None
+    return get_subtree_edited_on(course)
+
+
+def _build_video_outline(course_id):
+    """
+    Walk the whole course to make its video outline
+    """
+    course = modulestore().get_course(course_id, depth=None)
+    return list(BlockOutline(course_id, course, {"video": video_summary}))
+
 
-    # If we have the video information from VAL, we also have duration and size.
-    duration = val_video_info.get('duration', None)
-    size = val_video_info.get('file_size', 0)
+def video_outline_for_user(video_outline, course, request):
+    """
+    Yields the entries of the video outline which the requesting user can load, with the
+    videos' urls, durations and sizes from VAL, and full urls.
+
+    This does what has_access(user, 'load', video) does for each video, from the fields the
+    outline keeps, checking the user's roles once rather than once per video.
+    """
+    user = request.user
+    is_staff = has_access(user, 'staff', course)
+    is_beta_tester = CourseBetaTesterRole(course.id).has_user(user)
+
+    try:
+        course_videos = get_video_info_for_course_and_profile(unicode(course.id), "mobile_low")
+    except ValInternalError:  # pragma: nocover
+        course_videos = {}
+
+    for entry in video_outline:
+        if not can_load_from_fields(user, entry["access"], lambda: is_staff, lambda: is_beta_tester):
+            continue
+
+        yield {
+            "path": entry["path"],
+            "named_path": entry["named_path"],
+            "unit_url": request.build_absolute_uri(entry["unit_url"]),
+            "section_url": request.build_absolute_uri(entry["section_url"]),
+            "summary": _summary_for_request(entry["summary"], course_videos, request),
+        }
 
+
+def video_summary(course_id, video_descriptor):
+    """
+    returns summary dict for the given video module, without anything from VAL,
+    and with the transcripts' urls without the host
+    """
     # Transcripts...
     transcript_langs = video_descriptor.available_translations(verify_assets=False)
 
@@ -145,19 +187,44 @@ def video_summary(course, course_id, video_descriptor, request, local_cache):
                 'block_id': video_descriptor.scope_ids.usage_id.block_id,
                 'lang': lang
             },
-            request=request,
         )
         for lang in transcript_langs
     }
 
+    # Fall back to VideoDescriptor fields for video URLs if VAL doesn't have the video
+    if video_descriptor.html5_sources:
+        video_url = video_descriptor.html5_sources[0]
+    else:
+        video_url = video_descriptor.source
+
     return {
+        "edx_video_id": video_descriptor.edx_video_id,
         "video_url": video_url,
         "video_thumbnail_url": None,
-        "duration": duration,
-        "size": size,
+        "duration": None,
+        "size": 0,
         "name": video_descriptor.display_name,
         "transcripts": transcripts,
         "language": video_descriptor.get_default_transcript_language(),
         "category": video_descriptor.category,
         "id": unicode(video_descriptor.scope_ids.usage_id),
     }
+
+
+def _summary_for_request(summary, course_videos, request):
+    """
+    Fill in a video summary from the outline with what VAL has for the video, and full urls
+    """
+    summary = dict(summary)
+    # First try to check VAL for the URLs we want.
+    val_video_info = course_videos.get(summary.pop("edx_video_id"), {})
+    if val_video_info:
+        summary["video_url"] = val_video_info['url']
+        # If we have the video information from VAL, we also have duration and size.
+        summary["duration"] = val_video_info.get('duration', None)
+        summary["size"] = val_video_info.get('file_size', 0)
+
+    summary["transcripts"] = {
+        lang: request.build_absolute_uri(url) for lang, url in summary["transcripts"].iteritems()
+    }
+    return summary
@@ -3,6 +3,9 @@ Tests for video outline API
 """
 import copy
 import ddt
+from datetime import datetime, timedelta
+from mock import patch
+from pytz import UTC
 from uuid import uuid4
 
 from django.core.urlresolvers import reverse
@@ -19,6 +22,8 @@ from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.django import modulestore
 
 from mobile_api.tests import ROLE_CASES
+from mobile_api.video_outlines import serializers
+from student.roles import CourseStaffRole
 
 TEST_DATA_CONTENTSTORE = copy.deepcopy(settings.CONTENTSTORE)
 TEST_DATA_CONTENTSTORE['DOC_STORE_CONFIG']['db'] = 'test_xcontent_%s' % uuid4().hex
@@ -232,6 +237,39 @@ class TestVideoOutline(ModuleStoreTestCase, APITestCase):
         course_outline = self._get_video_summary_list()
         self.assertEqual(len(course_outline), 0)
 
+    def test_course_list_cached(self):
+        self._create_video_with_subs()
+        self.assertEqual(len(self._get_video_summary_list()), 1)
+
+        with patch.object(serializers, '_build_video_outline', wraps=serializers._build_video_outline) as build:
+            self.assertEqual(len(self._get_video_summary_list()), 1)
+            self.assertFalse(build.called)
+
+            # changing the course makes a new outline
+            ItemFactory.create(
+                parent_location=self.other_unit.location,
+                category="video",
+                display_name=u"test video omega 2 \u03a9",
+                html5_sources=[self.html5_video_url]
+            )
+            self.assertEqual(len(self._get_video_summary_list()), 2)
+            self.assertTrue(build.called)
+
+    def test_course_list_unstarted_video(self):
+        ItemFactory.create(
+            parent_location=self.unit.location,
+            category="video",
+            edx_video_id=self.edx_video_id,
+            display_name=u"test future video omega \u03a9",
+            start=datetime.now(UTC) + timedelta(days=2),
+        )
+        with patch.dict('django.conf.settings.FEATURES', {'DISABLE_START_DATES': False}):
+            self.assertEqual(len(self._get_video_summary_list()), 0)
+
+            # the same cached outline still shows the video to staff
+            CourseStaffRole(self.course.id).add_users(self.user)
+            self.assertEqual(len(self._get_video_summary_list()), 1)
+
     def test_course_list_transcripts(self):
         video = ItemFactory.create(
             parent_location=self.nameless_unit.location,
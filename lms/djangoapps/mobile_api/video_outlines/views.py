@@ -6,8 +6,6 @@ only displayed at the course level. This is because it makes it a lot easier to
 optimize and reason about, and it avoids having to tackle the bigger problem of
 general XBlock representation in this rather specialized formatting.
 """
-from functools import partial
-
 from django.http import Http404, HttpResponse
 
 from rest_framework import generics, permissions
@@ -22,7 +20,7 @@ from xmodule.modulestore.django import modulestore
 
 from mobile_api.utils import mobile_available_when_enrolled
 
-from .serializers import BlockOutline, video_summary
+from .serializers import get_video_outline, video_outline_for_user
 
 
 class VideoSummaryList(generics.ListAPIView):
@@ -85,14 +83,9 @@ class VideoSummaryList(generics.ListAPIView):
         course_id = CourseKey.from_string(kwargs['course_id'])
         course = get_mobile_course(course_id, request.user)
 
-        video_outline = list(
-            BlockOutline(
-                course_id,
-                course,
-                {"video": partial(video_summary, course)},
-                request,
-            )
-        )
+        # The outline is built once per version of the course; only the access checks
+        # and VAL's video urls are done per request.
+        video_outline = list(video_outline_for_user(get_video_outline(course), course, request))
         return Response(video_outline)
 
 
@@ -139,7 +132,7 @@ def get_mobile_course(course_id, user):
     Return only a CourseDescriptor if the course is mobile-ready or if the
     requesting user is a staff member.
     """
-    course = modulestore().get_course(course_id, depth=None)
+    course = modulestore().get_course(course_id)
     if mobile_available_when_enrolled(course, user):
         return course
 
@@ -56,6 +56,18 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# How many seconds responses from the comments service (such as a user's subscriptions
+# and counts) and each course's map of discussion ids are cached; 0 turns caching off
+COMMENTS_SERVICE_CACHE_TIMEOUT = 10
+
+# How many requests to the comments service a process makes at the same time, for views
+# that make several independent ones
+COMMENTS_SERVICE_MAX_CONCURRENCY = 4
+
+# How many seconds each user's cohort in a course is cached across requests; 0 only caches
+# it for the rest of the request
+COHORT_MEMBERSHIP_CACHE_TIMEOUT = 60 * 60
+
 
 # Features
 FEATURES = {
@@ -299,6 +311,14 @@ FEATURES = {
 
     # Separate the verification flow from the payment flow
     'SEPARATE_VERIFICATION_FROM_PAYMENT': False,
+
+    # Read and maintain per-subsection grades in the StudentSubsectionGrade
+    # table instead of re-scoring every problem on each grade() call
+    'ENABLE_PERSISTENT_GRADES': False,
+
+    # Count the answer distributions of the legacy instructor dashboard from the
+    # stored counts, only reading the StudentModules modified since they were stored
+    'ENABLE_INCREMENTAL_ANSWER_DISTRIBUTIONS': False,
 }
 
 # Ignore static asset files on import which match this pattern
@@ -575,6 +595,11 @@ XBLOCK_SELECT_FUNCTION = prefer_xmodules
 
 MODULESTORE_BRANCH = 'published-only'
 CONTENTSTORE = None
+
+# Local disk cache for course assets too big for memcached (1MB and up). Set to something like
+# {'ROOT': '/edx/var/edxapp/asset_cache', 'MAX_SIZE': 10 * 1024 ** 3} to enable it. An optional
+# 'ACCEL_REDIRECT_PREFIX' names an nginx internal location aliased to ROOT, which then sends the files.
+STATIC_CONTENT_DISK_CACHE = None
 DOC_STORE_CONFIG = {
     'host': 'localhost',
     'db': 'xmodule',
@@ -635,6 +660,17 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Warm sandbox processes to run code in, instead of starting a new one
+    # for each execution.  Only used when python_bin is set.
+    'pool': {
+        # How many workers each LMS process can have.  0 means no pool.
+        'SIZE': 0,
+        # How many executions a worker runs before it is replaced.
+        'MAX_RUNS': 100,
+        # Peak memory use (in bytes) past which a worker is replaced.
+        'MAX_MEMORY': None,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -951,6 +987,8 @@ MIDDLEWARE_CLASSES = (
     'django.middleware.locale.LocaleMiddleware',
 
     'django.middleware.transaction.TransactionMiddleware',
+    # Writes the StudentModules saved by the request, inside its transaction
+    'courseware.middleware.StudentModuleWriteBufferMiddleware',
     # 'debug_toolbar.middleware.DebugToolbarMiddleware',
 
     'django_comment_client.utils.ViewNameMiddleware',
@@ -1372,6 +1410,13 @@ BULK_EMAIL_LOG_SENT_EMAILS = False
 # parallel, and what the SES rate is.
 BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 
+# Number of messages sent by a bulk email task between reports of its sending rate.
+BULK_EMAIL_SEND_BATCH_SIZE = 25
+
+# Seconds a worker keeps its connection to the email backend open between bulk email
+# tasks, so that the next task can send over it.  0 closes it at the end of each task.
+BULK_EMAIL_CONNECTION_MAX_IDLE = 60
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -1604,6 +1649,11 @@ GRADES_DOWNLOAD = {
     'ROOT_PATH': '/tmp/edx-s3/grades',
 }
 
+# Grade reports of courses with more enrolled students than this are split
+# into subtasks grading this many students each. Set to None to always
+# generate grade reports in a single task.
+GRADES_DOWNLOAD_STUDENTS_PER_TASK = 1000
+
 ######################## PROGRESS SUCCESS BUTTON ##############################
 # The following fields are available in the URL: {course_id} {student_id}
 PROGRESS_SUCCESS_BUTTON_URL = 'http://<domain>/<path>/{course_id}'
@@ -36,6 +36,18 @@ FEATURES['DISABLE_START_DATES'] = True
 # the one in cms/envs/test.py
 FEATURES['ENABLE_DISCUSSION_SERVICE'] = False
 
+# Tests mock the comments service's responses, and change the course's discussions, from one
+# request to the next, so don't cache them
+COMMENTS_SERVICE_CACHE_TIMEOUT = 0
+
+# Test databases are rolled back, without signals, between tests, so don't cache users' cohorts
+# across them
+COHORT_MEMBERSHIP_CACHE_TIMEOUT = 0
+
+# Tests mock the email backend connection of each bulk email task, so don't keep it open
+# for the next one
+BULK_EMAIL_CONNECTION_MAX_IDLE = 0
+
 FEATURES['ENABLE_SERVICE_STATUS'] = True
 
 FEATURES['ENABLE_HINTER_INSTRUCTOR_VIEW'] = True
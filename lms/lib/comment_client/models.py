@@ -1,6 +1,7 @@
 import logging
 
-from .utils import extract, perform_request, CommentClientRequestError
+from .utils import extract, perform_request, clear_cached_responses, CommentClientRequestError
+import settings
 
 
 log = logging.getLogger(__name__)
@@ -146,6 +147,7 @@ class Model(object):
             )
         self.retrieved = True
         self._update_from_response(response)
+        self._clear_cached_author()
         self.after_save(self)
 
     def delete(self):
@@ -153,6 +155,16 @@ class Model(object):
         response = perform_request('delete', url, metric_tags=self._metric_tags, metric_action='model.delete')
         self.retrieved = True
         self._update_from_response(response)
+        self._clear_cached_author()
+
+    def _clear_cached_author(self):
+        """
+        Forget the cached responses to retrieving the user who wrote this content, whose
+        counts and subscriptions may have changed along with it
+        """
+        user_id = self.attributes.get('user_id')
+        if user_id is not None:
+            clear_cached_responses("{prefix}/users/{user_id}".format(prefix=settings.PREFIX, user_id=user_id))
 
     @classmethod
     def url_with_id(cls, params={}):
@@ -1,4 +1,4 @@
-from .utils import merge_dict, perform_request, CommentClientRequestError
+from .utils import merge_dict, perform_request, clear_cached_responses, CommentClientRequestError
 
 import models
 import settings
@@ -38,6 +38,7 @@ class User(models.Model):
             metric_action='user.follow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
         )
+        self.clear_cached_retrieve()
 
     def unfollow(self, source):
         params = {'source_type': source.type, 'source_id': source.id}
@@ -48,6 +49,7 @@ class User(models.Model):
             metric_action='user.unfollow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
         )
+        self.clear_cached_retrieve()
 
     def vote(self, voteable, value):
         if voteable.type == 'thread':
@@ -65,6 +67,7 @@ class User(models.Model):
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
         )
         voteable._update_from_response(response)
+        self.clear_cached_retrieve()
 
     def unvote(self, voteable):
         if voteable.type == 'thread':
@@ -82,6 +85,7 @@ class User(models.Model):
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
         )
         voteable._update_from_response(response)
+        self.clear_cached_retrieve()
 
     def active_threads(self, query_params={}):
         if not self.course_id:
@@ -115,6 +119,16 @@ class User(models.Model):
         )
         return response.get('collection', []), response.get('page', 1), response.get('num_pages', 1)
 
+    def save(self):
+        super(User, self).save()
+        self.clear_cached_retrieve()
+
+    def clear_cached_retrieve(self):
+        """
+        Forget the cached responses to retrieving this user, which has just been changed
+        """
+        clear_cached_responses(self.url(action='get', params=self.attributes))
+
     def _retrieve(self, *args, **kwargs):
         url = self.url(action='get', params=self.attributes)
         retrieve_params = self.default_retrieve_params.copy()
@@ -130,6 +144,7 @@ class User(models.Model):
                 retrieve_params,
                 metric_action='model.retrieve',
                 metric_tags=self._metric_tags,
+                cache_timeout=True,
             )
         except CommentClientRequestError as e:
             if e.status_code == 404:
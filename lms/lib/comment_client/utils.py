@@ -1,14 +1,27 @@
 from contextlib import contextmanager
 import dogstats_wrapper as dog_stats_api
+import hashlib
 import logging
 import requests
+import threading
 from django.conf import settings
+from django.core.cache import cache
+from multiprocessing.pool import ThreadPool
 from time import time
 from uuid import uuid4
+from django.utils import translation
 from django.utils.translation import get_language
 
 log = logging.getLogger(__name__)
 
+# Each thread keeps its own session, so that the connections to the comments
+# service are kept alive and reused from one request to the next.
+_local = threading.local()
+
+# The threads used by run_concurrently, created the first time they are needed.
+_pool = None
+_pool_lock = threading.Lock()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -31,6 +44,73 @@ def merge_dict(dic1, dic2):
     return dict(dic1.items() + dic2.items())
 
 
+def _get_session():
+    """
+    Return this thread's requests session, creating it if need be
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def _get_pool():
+    """
+    Return the pool of threads used by run_concurrently, creating it if need be
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPool(getattr(settings, "COMMENTS_SERVICE_MAX_CONCURRENCY", 4))
+    return _pool
+
+
+def run_concurrently(*funcs):
+    """
+    Call each of the given functions, which take no arguments, in its own thread, and
+    return their results in order. If any of them raises an exception, the first such
+    exception is raised once they have all finished.
+
+    This is meant for independent requests to the comments service made by one view;
+    each function makes its requests in the language of the calling thread.
+    """
+    if len(funcs) < 2:
+        return [func() for func in funcs]
+
+    language = get_language()
+
+    def call(func):
+        with translation.override(language):
+            return func()
+
+    return _get_pool().map(call, funcs)
+
+
+def _generation_key(url):
+    return u'comment_client.generation.{}'.format(hashlib.md5(url.encode('utf-8')).hexdigest())
+
+
+def _response_cache_key(url, params):
+    """
+    The key under which the response to a GET of url with params is cached. It includes
+    the url's generation, so that clear_cached_responses can drop every cached response
+    for the url at once, whatever its params.
+    """
+    generation = cache.get(_generation_key(url), 0)
+    request_key = repr((url, sorted(params.items()), get_language()))
+    return u'comment_client.response.{}.{}'.format(
+        generation,
+        hashlib.md5(request_key.encode('utf-8')).hexdigest()
+    )
+
+
+def clear_cached_responses(url):
+    """
+    Forget the cached responses to GETs of url, after something has changed it
+    """
+    cache.set(_generation_key(url), uuid4().hex)
+
+
 @contextmanager
 def request_timer(request_id, method, url, tags=None):
     start = time()
@@ -51,11 +131,30 @@ def request_timer(request_id, method, url, tags=None):
 
 
 def perform_request(method, url, data_or_params=None, raw=False,
-                    metric_action=None, metric_tags=None, paged_results=False):
-
+                    metric_action=None, metric_tags=None, paged_results=False,
+                    cache_timeout=None):
+    """
+    Make a request to the comments service, and return its response.
+
+    If cache_timeout is given for a GET, the response is cached for that many seconds;
+    passing True uses settings.COMMENTS_SERVICE_CACHE_TIMEOUT. Only pass it for requests
+    whose responses can be a little stale, and call clear_cached_responses(url) when
+    something the response depends on changes.
+    """
     if metric_tags is None:
         metric_tags = []
 
+    if cache_timeout is True:
+        cache_timeout = getattr(settings, "COMMENTS_SERVICE_CACHE_TIMEOUT", 0)
+    if method != 'get' or raw:
+        cache_timeout = None
+    if cache_timeout:
+        cache_key = _response_cache_key(url, data_or_params or {})
+        cached_response = cache.get(cache_key)
+        if cached_response is not None:
+            dog_stats_api.increment('comment_client.request.cache_hit', tags=metric_tags)
+            return cached_response
+
     metric_tags.append(u'method:{}'.format(method))
     if metric_action:
         metric_tags.append(u'action:{}'.format(metric_action))
@@ -76,7 +175,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = _get_session().request(
             method,
             url,
             data=data,
@@ -129,6 +228,8 @@ def perform_request(method, url, data_or_params=None, raw=False,
                     value=data.get('num_pages', 1),
                     tags=metric_tags
                 )
+            if cache_timeout:
+                cache.set(cache_key, data, cache_timeout)
             return data
 
 
@@ -2,16 +2,24 @@
 Module implementing `xblock.runtime.Runtime` functionality for the LMS
 """
 
+import hashlib
 import re
 import xblock.reference.plugins
 
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.conf import settings
+from django.utils.translation import get_language
 from user_api.api import course_tag as user_course_tag_api
 from xmodule.modulestore.django import modulestore
-from xmodule.x_module import ModuleSystem
+from xmodule.x_module import ModuleSystem, STUDENT_VIEW
 from xmodule.partitions.partitions_service import PartitionService
 
+# How long a rendered student_view fragment stays cached. The cache key includes when the
+# block was last edited, so publishing a new version of the block is picked up right away;
+# this only bounds how long fragments of old versions linger.
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
 
 def _quote_slashes(match):
     """
@@ -190,7 +198,13 @@ class LmsModuleSystem(LmsHandlerUrls, ModuleSystem):  # pylint: disable=abstract
     """
     ModuleSystem specialized to the LMS
     """
-    def __init__(self, **kwargs):
+    def __init__(self, user_independent_wrappers=None, **kwargs):
+        """
+        user_independent_wrappers: wrappers, like those in `wrappers`, whose changes to a
+            fragment don't depend on the user or the request. They are applied before
+            `wrappers`, and for blocks with has_user_independent_student_view, their output
+            is cached, so that later renders of the block skip them and the view itself.
+        """
         services = kwargs.setdefault('services', {})
         services['user_tags'] = UserTagsService(self)
         services['partitions'] = LmsPartitionService(
@@ -200,3 +214,73 @@ class LmsModuleSystem(LmsHandlerUrls, ModuleSystem):  # pylint: disable=abstract
         )
         services['fs'] = xblock.reference.plugins.FSService()
         super(LmsModuleSystem, self).__init__(**kwargs)
+        self.user_independent_wrappers = user_independent_wrappers or []
+
+    def render(self, block, view_name, context=None):
+        """
+        See :meth:`xblock.runtime.Runtime.render`. Uses the cached fragment of the block's
+        view, if there is one, and applies `wrappers` to it.
+        """
+        cache_key = self._fragment_cache_key(block, view_name)
+        if cache_key is not None:
+            frag = cache.get(cache_key)
+            if frag is not None:
+                return super(LmsModuleSystem, self).wrap_child(block, view_name, frag, context)
+        return super(LmsModuleSystem, self).render(block, view_name, context)
+
+    def wrap_child(self, block, view, frag, context):
+        """
+        See :meth:`xblock.runtime.Runtime.wrap_child`. Applies `user_independent_wrappers`,
+        then caches the fragment if the block's view can be, then applies `wrappers`.
+        """
+        for wrapper in self.user_independent_wrappers:
+            frag = wrapper(block, view, frag, context)
+
+        cache_key = self._fragment_cache_key(block, view)
+        if cache_key is not None:
+            cache.set(cache_key, frag, FRAGMENT_CACHE_TIMEOUT)
+
+        return super(LmsModuleSystem, self).wrap_child(block, view, frag, context)
+
+    def _fragment_cache_key(self, block, view_name):
+        """
+        The key to cache the block's rendered view under, or None if it can't be cached:
+        if the view isn't the student_view, if the block doesn't declare that its
+        student_view is independent of the user, or if its modulestore doesn't say when
+        it was last edited.
+        """
+        if view_name != STUDENT_VIEW or not getattr(block, 'has_user_independent_student_view', False):
+            return None
+
+        descriptor = getattr(block, 'descriptor', block)
+        get_edited_on = getattr(descriptor.runtime, 'get_edited_on', None)
+        edited_on = get_edited_on(descriptor) if get_edited_on is not None else None
+        if edited_on is None:
+            return None
+
+        # The output of the wrappers depends on what they were given (such as the course's
+        # static asset path), so that is part of the key too.
+        wrappers_key = hashlib.md5(repr([
+            _wrapper_cache_key(wrapper) for wrapper in self.user_independent_wrappers
+        ])).hexdigest()
+        return u'lms.fragment.{}.{}.{}.{}.{}'.format(
+            block.location.to_deprecated_string(),
+            edited_on.isoformat(),
+            view_name,
+            get_language(),
+            wrappers_key,
+        )
+
+
+def _wrapper_cache_key(wrapper):
+    """
+    Describe a wrapper, usually a functools.partial, by its function and arguments, the same way
+    in every process
+    """
+    func = getattr(wrapper, 'func', wrapper)
+    return (
+        func.__module__,
+        func.__name__,
+        getattr(wrapper, 'args', ()),
+        sorted((getattr(wrapper, 'keywords', None) or {}).items()),
+    )
@@ -35,6 +35,8 @@ def run():
     if settings.FEATURES.get('ENABLE_THIRD_PARTY_AUTH', False):
         enable_third_party_auth()
 
+    configure_sandbox_pool()
+
     # Initialize Segment.io analytics module. Flushes first time a message is received and
     # every 50 messages thereafter, or if 10 seconds have passed since last flush
     if settings.FEATURES.get('SEGMENT_IO_LMS') and hasattr(settings, 'SEGMENT_IO_LMS_KEY'):
@@ -55,6 +57,21 @@ def add_mimetypes():
     mimetypes.add_type('application/font-woff', '.woff')
 
 
+def configure_sandbox_pool():
+    """
+    Set up the pool of warm sandbox processes that capa's safe_exec runs
+    code in, from the "pool" key of the CODE_JAIL setting.
+    """
+    from capa.safe_exec import pool
+
+    pool_settings = settings.CODE_JAIL.get('pool', {})
+    pool.configure(
+        pool_settings.get('SIZE', 0),
+        max_runs=pool_settings.get('MAX_RUNS', 100),
+        max_memory=pool_settings.get('MAX_MEMORY'),
+    )
+
+
 def enable_theme():
     """
     Enable the settings for a custom theme, whose files should be stored